@@ -1,6 +1,11 @@
 """
 Vercel Serverless Function Entry Point
 This file is required for Vercel deployment
+
+Serverless functions cannot keep the job worker processes running, so this
+entry point serves the UI and the read-only API only: /api/generate answers
+503 here (config.SERVERLESS). Deploy main_final.py on a long-running host
+(Render, Railway) to generate videos.
 """
 import sys
 from pathlib import Path
@@ -0,0 +1,286 @@
+"""
+مكتبة الخلفيات المُطبَّعة
+Normalized background library (transcode once, reuse forever)
+
+كل فيديو في BACKGROUNDS_DIR يُحوَّل مرة واحدة إلى نسخة:
+- بأبعاد VIDEO_WIDTH x VIDEO_HEIGHT (scale + crop)
+- بمعدل VIDEO_FPS ثابت
+- مع keyframe كل BACKGROUND_GOP_SECONDS ثانية (GOP ثابت)
+- بدون صوت
+
+وتُحفظ في NORMALIZED_BACKGROUNDS_DIR مع manifest.json، فلا يحتاج توليد
+الفيديو إلى scale/crop في كل مرة.
+
+التشغيل:
+    python background_library.py
+"""
+
+import json
+import os
+import random
+import subprocess
+import threading
+from pathlib import Path
+from encoder_profiles import resolve_profile, video_codec_args
+from config import (
+    BACKGROUNDS_DIR, NORMALIZED_BACKGROUNDS_DIR, BACKGROUND_GOP_SECONDS,
+    VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS
+)
+
+
+class BackgroundLibrary:
+    """
+    مكتبة خلفيات جاهزة للاستخدام المباشر
+    Library of pre-normalized background videos described by a manifest
+    """
+
+    def __init__(self, source_dir=BACKGROUNDS_DIR, library_dir=NORMALIZED_BACKGROUNDS_DIR,
+                 encoder_profile=None):
+        self.source_dir = Path(source_dir)
+        self.library_dir = Path(library_dir)
+        self.encoder_profile = encoder_profile
+        self.manifest_path = self.library_dir / "manifest.json"
+        self._lock = threading.Lock()
+
+        self.library_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def gop(self):
+        """Keyframe interval in frames"""
+        return int(VIDEO_FPS * BACKGROUND_GOP_SECONDS)
+
+    def load_manifest(self):
+        """
+        Load the manifest
+
+        Returns:
+            Dictionary {source_name: entry}
+        """
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self, manifest):
+        """Write the manifest atomically"""
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def get_duration(self, video_path):
+        """Get video duration in seconds using ffprobe (0.0 on failure)"""
+        cmd = [
+            'ffprobe', '-v', 'error',
+            '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1',
+            str(video_path)
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True,
+                                  encoding='utf-8', errors='ignore', timeout=30)
+            return float(result.stdout.strip())
+        except Exception:
+            return 0.0
+
+    def normalize(self, source_path):
+        """
+        Transcode one background into the normalized mezzanine format
+
+        Args:
+            source_path: Raw background video (e.g. pexels_123.mp4)
+
+        Returns:
+            Manifest entry (dict) or None
+        """
+        source_path = Path(source_path)
+        output_path = self.library_dir / source_path.name
+        tmp_path = self.library_dir / f"{source_path.stem}.tmp.mp4"
+        profile_name, profile = resolve_profile(self.encoder_profile)
+
+        cmd = [
+            'ffmpeg', '-y',
+            '-i', str(source_path),
+            '-an',
+            '-vf',
+            f'scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=increase,'
+            f'crop={VIDEO_WIDTH}:{VIDEO_HEIGHT},setsar=1,fps={VIDEO_FPS}',
+            # keyframes only on the fixed GOP grid
+            *video_codec_args(profile, gop=self.gop),
+            '-movflags', '+faststart',
+            str(tmp_path)
+        ]
+
+        try:
+            subprocess.run(cmd, check=True, capture_output=True,
+                         encoding='utf-8', errors='ignore', timeout=600)
+            os.replace(tmp_path, output_path)
+        except Exception as e:
+            print(f"  ✗ Failed to normalize {source_path.name}: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return None
+
+        stat = source_path.stat()
+        return {
+            'source': source_path.name,
+            'source_size': stat.st_size,
+            'source_mtime': stat.st_mtime,
+            'path': output_path.name,
+            'duration': self.get_duration(output_path),
+            'width': VIDEO_WIDTH,
+            'height': VIDEO_HEIGHT,
+            'fps': VIDEO_FPS,
+            'gop': self.gop,
+            'profile': profile_name,
+            'codec': profile['codec']
+        }
+
+    def is_current(self, entry, source_path):
+        """Check if a manifest entry still matches its source and settings"""
+        try:
+            stat = Path(source_path).stat()
+        except OSError:
+            return False  # المصدر حُذف (مثلاً رفضته المراجعة)
+        return (
+            entry.get('source_size') == stat.st_size
+            and entry.get('source_mtime') == stat.st_mtime
+            and entry.get('width') == VIDEO_WIDTH
+            and entry.get('height') == VIDEO_HEIGHT
+            and entry.get('fps') == VIDEO_FPS
+            and entry.get('gop') == self.gop
+            and entry.get('profile') == resolve_profile(self.encoder_profile)[0]
+            and (self.library_dir / entry['path']).exists()
+        )
+
+    def pending(self):
+        """
+        Raw backgrounds that are new or changed since they were normalized
+
+        Returns:
+            List of source paths (sorted by name)
+        """
+        with self._lock:
+            manifest = self.load_manifest()
+        return [
+            source_path for source_path in sorted(self.source_dir.glob("*.mp4"))
+            if not (source_path.name in manifest
+                    and self.is_current(manifest[source_path.name], source_path))
+        ]
+
+    def ingest(self, source_paths=None):
+        """
+        Normalize every new or changed background
+
+        Args:
+            source_paths: Optional list of files (default: all *.mp4 in source_dir)
+
+        Returns:
+            Number of newly normalized backgrounds
+        """
+        if source_paths is None:
+            source_paths = self.pending()
+
+        count = 0
+        for source_path in source_paths:
+            source_path = Path(source_path)
+
+            with self._lock:
+                entry = self.load_manifest().get(source_path.name)
+            if entry and self.is_current(entry, source_path):
+                continue
+
+            print(f"  Normalizing {source_path.name}...")
+            entry = self.normalize(source_path)
+            if not entry:
+                continue
+
+            with self._lock:
+                manifest = self.load_manifest()
+                manifest[source_path.name] = entry
+                self.save_manifest(manifest)
+
+            count += 1
+            print(f"  ✓ {entry['path']} ({entry['duration']:.1f}s)")
+
+        return count
+
+    def entries(self):
+        """
+        Get usable library entries
+
+        Entries whose raw source was deleted or changed (or that were built
+        with other settings) are pruned from the manifest, and the
+        normalized copies of deleted sources are removed.
+
+        Returns:
+            List of manifest entries that are current
+        """
+        with self._lock:
+            manifest = self.load_manifest()
+            current = {
+                name: entry for name, entry in manifest.items()
+                if self.is_current(entry, self.source_dir / name)
+            }
+            if len(current) == len(manifest):
+                return list(current.values())
+
+            for name, entry in manifest.items():
+                if name in current:
+                    continue
+                print(f"  Removing stale background {entry['path']}")
+                # النسخة القديمة لمصدر تغيّر يستبدلها ingest في نفس المسار
+                if not (self.source_dir / name).exists():
+                    self.path_of(entry).unlink(missing_ok=True)
+            self.save_manifest(current)
+
+        return list(current.values())
+
+    def path_of(self, entry):
+        """Full path of a manifest entry's normalized file"""
+        return self.library_dir / entry['path']
+
+    def entry_for(self, video_path):
+        """
+        Get the manifest entry of a normalized file
+
+        Returns:
+            Manifest entry or None
+        """
+        name = Path(video_path).name
+        for entry in self.load_manifest().values():
+            if entry['path'] == name:
+                return entry
+        return None
+
+    def is_normalized(self, video_path):
+        """Check if a video path belongs to this library"""
+        return video_path is not None and Path(video_path).parent == self.library_dir
+
+    def pick(self, exclude=()):
+        """
+        Pick a random normalized background
+
+        Args:
+            exclude: Paths already used (to keep backgrounds unique per verse)
+
+        Returns:
+            Path or None if the library has nothing left
+        """
+        exclude = {Path(path) for path in exclude}
+        candidates = [
+            self.path_of(entry) for entry in self.entries()
+            if self.path_of(entry) not in exclude
+        ]
+        if not candidates:
+            return None
+        return random.choice(candidates)
+
+
+if __name__ == "__main__":
+    print("Building normalized background library...")
+    library = BackgroundLibrary()
+    added = library.ingest()
+    print(f"\n✓ {added} backgrounds normalized, {len(library.entries())} in library")
+    print(f"📁 {library.library_dir}")
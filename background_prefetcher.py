@@ -0,0 +1,184 @@
+"""
+تعبئة مخزون الخلفيات مسبقاً
+Background prefetcher: keeps a pool of normalized backgrounds ready
+
+- يحمّل خلفيات آمنة جديدة من Pexels إلى BACKGROUNDS_DIR
+- يفحصها بالرؤية (VideoReviewer + مخزن النتائج)؛ المقبول فقط يدخل المخزون
+- يُطبّعها مباشرة في مكتبة الخلفيات (background_library)
+- يتوقف عند BACKGROUND_POOL_SIZE خلفية أو عند بلوغ حصة القرص
+
+بهذا لا ينتظر توليد الفيديو أي تحميل من الشبكة: كل آية تأخذ خلفية جاهزة.
+
+التشغيل مرة واحدة (بدون حلقة):
+    python background_prefetcher.py
+"""
+
+import multiprocessing
+import re
+import time
+from background_library import BackgroundLibrary
+from pexels_api import PexelsAPI
+from review_videos import VideoReviewer
+from verdict_store import pexels_id_from_path
+from config import (
+    BACKGROUND_POOL_SIZE, BACKGROUND_POOL_MAX_BYTES, BACKGROUND_PREFETCH_INTERVAL,
+    USE_BACKGROUND_LIBRARY
+)
+
+
+class BackgroundPrefetcher:
+    """
+    معبّئ مخزون الخلفيات
+    Fills the normalized background library up to a target size and disk quota
+    """
+
+    def __init__(self, library=None, pexels_api=None, reviewer=None,
+                 pool_size=BACKGROUND_POOL_SIZE, max_bytes=BACKGROUND_POOL_MAX_BYTES):
+        self.library = library or BackgroundLibrary()
+        self.pexels_api = pexels_api or PexelsAPI()
+        self.reviewer = reviewer or VideoReviewer()
+        self.pool_size = pool_size
+        self.max_bytes = max_bytes
+        # تحميلات رفضها الفحص (حُذفت، فلا تُحمَّل مرة أخرى)
+        self.rejected_ids = set()
+
+    def disk_usage(self):
+        """Total bytes used by raw and normalized backgrounds"""
+        files = [*self.library.source_dir.glob("*.mp4"), *self.library.library_dir.glob("*.mp4")]
+        return sum(path.stat().st_size for path in files if path.exists())
+
+    def known_ids(self):
+        """Pexels ids already downloaded (pexels_{id}.mp4)"""
+        ids = set()
+        for path in self.library.source_dir.glob("pexels_*.mp4"):
+            match = re.fullmatch(r"pexels_(\d+)", path.stem)
+            if match:
+                ids.add(int(match.group(1)))
+        return ids | self.rejected_ids
+
+    def screen(self, source_path):
+        """
+        Vision-check a raw background before it enters the pool
+
+        Uses the stored verdict for the same content when there is one.
+
+        Returns:
+            True only for an acceptable (final) verdict
+        """
+        result = self.reviewer.review_video(source_path)
+        return bool(result and result['acceptable'])
+
+    def admit(self, source_path, downloaded=False):
+        """
+        Screen and normalize one raw background
+
+        Args:
+            source_path: Raw background video
+            downloaded: True if the prefetcher downloaded it (deleted when rejected)
+
+        Returns:
+            Number of backgrounds added (0 or 1)
+        """
+        if self.screen(source_path):
+            return self.library.ingest([source_path])
+
+        print(f"[prefetcher] ✗ {source_path.name} not accepted by the vision check")
+        if downloaded:
+            video_id = pexels_id_from_path(source_path)
+            if video_id:
+                self.rejected_ids.add(int(video_id))
+            source_path.unlink(missing_ok=True)
+        return 0
+
+    def needs_more(self):
+        """Check if the pool is below its target size and within quotas"""
+        return (
+            len(self.library.entries()) < self.pool_size
+            and self.disk_usage() < self.max_bytes
+            # لا نستهلك حصة Pexels التي تحتاجها المهام
+            and not self.pexels_api.rate_limiter.quota_low()
+        )
+
+    def fill(self):
+        """
+        Top up the pool
+
+        Raw backgrounds that were downloaded but never normalized are
+        ingested first, then new ones are downloaded. Both happen one file
+        at a time and stop as soon as the pool is full, the quota is reached
+        or Pexels has nothing new. Every clip must pass the vision check
+        first; nothing is downloaded while the classifier cannot give final
+        verdicts, and at most pool_size downloads are rejected per call.
+
+        Returns:
+            Number of backgrounds added to the library
+        """
+        added = 0
+        for source_path in self.library.pending():
+            if not self.needs_more():
+                return added
+            added += self.admit(source_path)
+
+        # مُصنِّف غير جاهز أو مؤقت (heuristic) لا يقبل أي مقطع: لا فائدة من التحميل
+        classifier = self.reviewer.classifier
+        if not classifier.is_ready() or classifier.provisional:
+            print(f"[prefetcher] ⚠ {classifier.name} classifier cannot accept clips, "
+                  f"not downloading new backgrounds")
+            return added
+
+        rejected = 0
+        while self.needs_more() and rejected < self.pool_size:
+            video_path = self.pexels_api.download_random_video(
+                save_dir=self.library.source_dir,
+                exclude_ids=self.known_ids()
+            )
+            if not video_path:
+                break
+
+            admitted = self.admit(video_path, downloaded=True)
+            added += admitted
+            rejected += 1 - admitted
+
+        return added
+
+    def run(self, interval=BACKGROUND_PREFETCH_INTERVAL):
+        """Keep the pool filled forever"""
+        print(f"✓ Background prefetcher started (pool {self.pool_size}, "
+              f"quota {self.max_bytes // (1024 * 1024)}MB)")
+
+        while True:
+            try:
+                added = self.fill()
+                if added:
+                    print(f"[prefetcher] +{added} backgrounds, "
+                          f"{len(self.library.entries())} ready")
+            except Exception as e:
+                print(f"[prefetcher] Error: {e}")
+
+            time.sleep(interval)
+
+
+def run_prefetcher():
+    BackgroundPrefetcher().run()
+
+
+def start_prefetcher():
+    """
+    Start the prefetcher in its own process
+
+    Returns:
+        multiprocessing.Process or None if the pool is disabled
+    """
+    if not USE_BACKGROUND_LIBRARY or BACKGROUND_POOL_SIZE <= 0:
+        return None
+
+    process = multiprocessing.Process(target=run_prefetcher, daemon=True)
+    process.start()
+    return process
+
+
+if __name__ == "__main__":
+    prefetcher = BackgroundPrefetcher()
+    added = prefetcher.fill()
+    print(f"\n✓ {added} backgrounds added, {len(prefetcher.library.entries())} in pool")
+    print(f"💾 {prefetcher.disk_usage() / (1024 * 1024):.0f}MB used")
@@ -0,0 +1,165 @@
+"""
+مقارنة سرعة مُصنِّفات الصور
+Benchmark vision classifier backends on the same sample images
+
+العينات: لوحات إطارات (contact sheets) من فيديوهات BACKGROUNDS_DIR، أو صور
+من مجلد (--images)، أو صور مُولَّدة عند عدم وجود أي منهما.
+
+    python benchmark_classifiers.py
+    python benchmark_classifiers.py --backends heuristic --samples 50
+    python benchmark_classifiers.py --images frames/ --json results.json
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from PIL import Image
+from config import BACKGROUNDS_DIR
+from vision_classifiers import CLASSIFIERS, get_classifier, is_acceptable
+
+PROMPT = """
+Analyze this image and determine:
+1. Are there any humans or people visible?
+2. Are there any animals visible?
+3. Is this content appropriate for Islamic religious context?
+
+Respond ONLY with a JSON object:
+{"has_humans": true/false, "has_animals": true/false, "is_appropriate": true/false,
+ "description": "brief description", "category": "mosque/nature/sky/water/mountain/other"}
+"""
+
+
+def synthetic_samples(count, seed=0):
+    """Solid-color gradient images (deterministic)"""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        image = Image.new("RGB", (1080, 1920), color)
+        image.paste(tuple(c // 2 for c in color), (0, 960, 1080, 1920))
+        samples.append(image)
+    return samples
+
+
+def load_samples(count, images_dir=None):
+    """
+    Collect sample images
+
+    Returns:
+        Tuple (list of PIL images, source description)
+    """
+    if images_dir:
+        paths = sorted(Path(images_dir).glob("*.jpg")) + sorted(Path(images_dir).glob("*.png"))
+        samples = []
+        for path in paths[:count]:
+            with Image.open(path) as img:
+                samples.append(img.convert("RGB"))
+        return samples, f"{len(samples)} images from {images_dir}"
+
+    videos = sorted(BACKGROUNDS_DIR.glob("*.mp4"))[:count]
+    if videos:
+        from review_videos import VideoReviewer
+
+        reviewer = VideoReviewer(contact_sheet=True, classifier=get_classifier("heuristic"))
+        samples = [sheet for sheet in map(reviewer.extract_contact_sheet, videos) if sheet]
+        if samples:
+            return samples, f"{len(samples)} contact sheets from {BACKGROUNDS_DIR}"
+
+    return synthetic_samples(count), f"{count} synthetic images"
+
+
+def benchmark(classifier, samples):
+    """
+    Classify every sample once
+
+    Returns:
+        Dictionary with timings and verdicts
+    """
+    latencies = []
+    verdicts = []
+    errors = 0
+
+    started = time.perf_counter()
+    for image in samples:
+        t0 = time.perf_counter()
+        try:
+            analysis = classifier.classify([image], PROMPT)
+        except Exception:
+            analysis = None
+        latencies.append(time.perf_counter() - t0)
+
+        if analysis is None:
+            errors += 1
+            verdicts.append(None)
+        else:
+            verdicts.append(is_acceptable(analysis))
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "backend": classifier.name,
+        "model_version": classifier.model_version,
+        "samples": len(samples),
+        "errors": errors,
+        "total_seconds": round(total, 4),
+        "images_per_second": round(len(samples) / total, 2) if total > 0 else None,
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 2),
+        "p95_ms": round(1000 * latencies[int(0.95 * (len(latencies) - 1))], 2),
+        "accepted": sum(1 for v in verdicts if v),
+        "verdicts": verdicts
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vision classifier backends")
+    parser.add_argument('--backends', nargs='+', choices=sorted(CLASSIFIERS), default=sorted(CLASSIFIERS))
+    parser.add_argument('--samples', type=int, default=20, help="number of sample images")
+    parser.add_argument('--images', metavar='DIR', help="use *.jpg / *.png from DIR as samples")
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    samples, source = load_samples(args.samples, args.images)
+    if not samples:
+        print("❌ No samples")
+        return 1
+    print(f"📦 Samples: {source}\n")
+
+    results = []
+    for name in args.backends:
+        classifier = get_classifier(name)
+        if not classifier.is_ready():
+            print(f"⚠ {name}: not available, skipped")
+            continue
+        results.append(benchmark(classifier, samples))
+
+    print(f"{'backend':<12} {'img/s':>10} {'mean ms':>10} {'p95 ms':>10} {'accepted':>9} {'errors':>7}")
+    for r in results:
+        print(f"{r['backend']:<12} {r['images_per_second']:>10} {r['mean_ms']:>10} "
+              f"{r['p95_ms']:>10} {r['accepted']:>9} {r['errors']:>7}")
+
+    # اتفاق كل مُصنِّف مع الأول (المرجع)
+    if len(results) > 1:
+        reference = results[0]
+        for r in results[1:]:
+            pairs = [(a, b) for a, b in zip(reference['verdicts'], r['verdicts'])
+                     if a is not None and b is not None]
+            if pairs:
+                agreement = sum(a == b for a, b in pairs) / len(pairs)
+                print(f"\n{r['backend']} vs {reference['backend']}: {agreement:.0%} agreement "
+                      f"on {len(pairs)} samples")
+
+    if args.json:
+        output = json.dumps({"source": source, "results": results}, indent=2)
+        if args.json == '-':
+            print(output)
+        else:
+            Path(args.json).write_text(output, encoding='utf-8')
+            print(f"\n📄 Results written to {args.json}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
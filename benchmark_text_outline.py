@@ -0,0 +1,174 @@
+"""
+قياس سرعة رسم حدود النص
+Micro-benchmark: the real overlay renderers vs the original 7x7 offset grid
+
+Times VideoGenerator.render_text_overlay and
+EnhancedVideoGenerator.create_verse_image_pillow (one stroked draw per line)
+against copies of the original methods, which drew each line 49 times in
+black (offsets -3..3 on both axes) before the white text. Both sides render
+the full-size PNG, including the save.
+
+    python benchmark_text_outline.py
+    python benchmark_text_outline.py --repeat 20 --font C:\\Windows\\Fonts\\arial.ttf
+"""
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+import arabic_reshaper
+from bidi.algorithm import get_display
+from PIL import Image, ImageDraw, ImageFont
+from config import VIDEO_WIDTH, VIDEO_HEIGHT, TEXT_FONT_SIZE, TEXT_OUTLINE_WIDTH, ARABIC_FONTS
+from enhanced_generator import EnhancedVideoGenerator
+from video_generator import VideoGenerator
+
+# الشبكة الأصلية: 7x7 إزاحة (outline_range = 3 في الكود القديم)
+BASELINE_OUTLINE_RANGE = 3
+
+SAMPLE_VERSES = {
+    'short (112:1)': "قُلْ هُوَ اللَّهُ أَحَدٌ",
+    'medium (1:2)': "الْحَمْدُ لِلَّهِ رَبِّ الْعَالَمِينَ",
+    'long (2:255)': (
+        "اللَّهُ لَا إِلَٰهَ إِلَّا هُوَ الْحَيُّ الْقَيُّومُ ۚ لَا تَأْخُذُهُ سِنَةٌ وَلَا نَوْمٌ ۚ "
+        "لَّهُ مَا فِي السَّمَاوَاتِ وَمَا فِي الْأَرْضِ ۗ مَن ذَا الَّذِي يَشْفَعُ عِندَهُ إِلَّا بِإِذْنِهِ ۚ "
+        "يَعْلَمُ مَا بَيْنَ أَيْدِيهِمْ وَمَا خَلْفَهُمْ ۖ وَلَا يُحِيطُونَ بِشَيْءٍ مِّنْ عِلْمِهِ إِلَّا بِمَا شَاءَ ۚ "
+        "وَسِعَ كُرْسِيُّهُ السَّمَاوَاتِ وَالْأَرْضَ ۖ وَلَا يَئُودُهُ حِفْظُهُمَا ۚ وَهُوَ الْعَلِيُّ الْعَظِيمُ"
+    ),
+}
+
+
+def find_font(font_path=None):
+    """First loadable font (same order as the generators)"""
+    candidates = [font_path] if font_path else [*ARABIC_FONTS, "arial", "DejaVuSans.ttf"]
+    for candidate in candidates:
+        try:
+            ImageFont.truetype(candidate, TEXT_FONT_SIZE)
+            return candidate
+        except OSError:
+            continue
+    return None
+
+
+def wrap_lines(text, font, max_width):
+    """Greedy word wrap so long verses render as several lines"""
+    draw = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+    lines, current = [], []
+    for word in text.split():
+        candidate = ' '.join(current + [word])
+        if current and draw.textlength(candidate, font=font) > max_width:
+            lines.append(' '.join(current))
+            current = [word]
+        else:
+            current.append(word)
+    if current:
+        lines.append(' '.join(current))
+    return [get_display(arabic_reshaper.reshape(line)) for line in lines]
+
+
+def baseline_render_text_overlay(text, output_path, font_path, width=VIDEO_WIDTH, height=VIDEO_HEIGHT):
+    """VideoGenerator.render_text_overlay before the stroke change (7x7 grid)"""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.truetype(font_path, TEXT_FONT_SIZE)
+
+    total_height = 0
+    line_dimensions = []
+    for line in text.split('\n'):
+        if line.strip():
+            bbox = draw.textbbox((0, 0), line, font=font, anchor="mm")
+            line_width = bbox[2] - bbox[0]
+            line_height = bbox[3] - bbox[1]
+            line_dimensions.append((line, line_width, line_height))
+            total_height += line_height + 20
+
+    y_position = (height - total_height) // 2
+    for line, line_width, line_height in line_dimensions:
+        x_position = (width - line_width) // 2
+        for adj_x in range(-BASELINE_OUTLINE_RANGE, BASELINE_OUTLINE_RANGE + 1):
+            for adj_y in range(-BASELINE_OUTLINE_RANGE, BASELINE_OUTLINE_RANGE + 1):
+                draw.text((x_position + adj_x, y_position + adj_y), line,
+                          font=font, fill='black', anchor="mm")
+        draw.text((x_position, y_position), line, font=font, fill='white', anchor="mm")
+        y_position += line_height + 20
+
+    img.save(output_path, 'PNG')
+    return output_path
+
+
+def baseline_create_verse_image_pillow(generator, text, output_path, width=VIDEO_WIDTH, height=VIDEO_HEIGHT):
+    """EnhancedVideoGenerator.create_verse_image_pillow before the stroke change (7x7 grid)"""
+    display_text = generator.prepare_arabic_text(text)
+
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    font = generator.pillow_font()[0]
+
+    bbox = draw.textbbox((0, 0), display_text, font=font)
+    x = (width - (bbox[2] - bbox[0])) // 2
+    y = (height - (bbox[3] - bbox[1])) // 2
+
+    for adj_x in range(-BASELINE_OUTLINE_RANGE, BASELINE_OUTLINE_RANGE + 1):
+        for adj_y in range(-BASELINE_OUTLINE_RANGE, BASELINE_OUTLINE_RANGE + 1):
+            draw.text((x + adj_x, y + adj_y), display_text, font=font, fill='black')
+    draw.text((x, y), display_text, font=font, fill='white')
+
+    img.save(output_path, 'PNG')
+    return output_path
+
+
+def time_render(render, repeat):
+    """Best-of-repeat render time in milliseconds (renderer output silenced)"""
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            render()
+            best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark outlined text rendering")
+    parser.add_argument('--repeat', type=int, default=10, help="runs per renderer (best is reported)")
+    parser.add_argument('--font', help="font file (default: first of ARABIC_FONTS found)")
+    args = parser.parse_args()
+
+    font_path = find_font(args.font)
+    if font_path is None:
+        print("❌ No TrueType font found, pass one with --font")
+        return 1
+
+    video = VideoGenerator.__new__(VideoGenerator)
+    enhanced = EnhancedVideoGenerator.__new__(EnhancedVideoGenerator)
+    enhanced.PILLOW_FONT = font_path
+    enhanced._pillow_font = None
+
+    font = ImageFont.truetype(font_path, TEXT_FONT_SIZE)
+    print(f"Font: {font_path}, outline {TEXT_OUTLINE_WIDTH}px (stroke) vs 7x7 grid, best of {args.repeat}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / 'overlay.png'
+
+        print(f"{'renderer':<18} {'verse':<16} {'lines':>5} {'grid ms':>10} {'stroke ms':>10} {'speedup':>8}")
+        for name, text in SAMPLE_VERSES.items():
+            lines = wrap_lines(text, font, VIDEO_WIDTH - 2 * 40)
+            wrapped = '\n'.join(lines)
+            grid_ms = time_render(lambda: baseline_render_text_overlay(wrapped, output, font_path), args.repeat)
+            stroke_ms = time_render(lambda: video.render_text_overlay(wrapped, output, font_path), args.repeat)
+            print(f"{'video_generator':<18} {name:<16} {len(lines):>5} {grid_ms:>10.1f} {stroke_ms:>10.1f} "
+                  f"{grid_ms / stroke_ms:>7.1f}x")
+
+        for name, text in SAMPLE_VERSES.items():
+            grid_ms = time_render(lambda: baseline_create_verse_image_pillow(enhanced, text, output), args.repeat)
+            stroke_ms = time_render(lambda: enhanced.create_verse_image_pillow(text, output), args.repeat)
+            print(f"{'enhanced_generator':<18} {name:<16} {1:>5} {grid_ms:>10.1f} {stroke_ms:>10.1f} "
+                  f"{grid_ms / stroke_ms:>7.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -11,15 +11,32 @@ PEXELS_API_KEY = "KC7UgPcEyQGoZS0nhceJoVfv1mtNzG4dr015IXjrS23CFgIHNXuG3L52"
 TEMP_DIR = BASE_DIR / "temp"
 OUTPUT_DIR = BASE_DIR / "output"
 BACKGROUNDS_DIR = BASE_DIR / "backgrounds"
+CACHE_DIR = BASE_DIR / "cache"
 
 # Create directories if they don't exist
-for directory in [TEMP_DIR, OUTPUT_DIR, BACKGROUNDS_DIR]:
+for directory in [TEMP_DIR, OUTPUT_DIR, BACKGROUNDS_DIR, CACHE_DIR]:
     directory.mkdir(exist_ok=True)
 
 # API Endpoints
 ALQURAN_API = "https://api.alquran.cloud/v1"
 EVERYAYAH_BASE = "https://everyayah.com/data"
 
+# HTTP Settings
+AUDIO_DOWNLOAD_CONCURRENCY = int(os.getenv("AUDIO_DOWNLOAD_CONCURRENCY", "8"))
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5  # 0.5s, 1s, 2s ...
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MIN_AUDIO_BYTES = 1024  # أصغر ملف MP3 مقبول (أقل من ذلك = رد خاطئ)
+AUDIO_DOWNLOAD_RETRIES = int(os.getenv("AUDIO_DOWNLOAD_RETRIES", "2"))  # إعادة المحاولة عند تحميل ناقص
+
+# Cache Settings
+# كاش دائم لملفات التلاوة (مفتاحه: مجلد القارئ + السورة + الآية)
+AUDIO_CACHE_DIR = CACHE_DIR / "audio"
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_MB", "2048")) * 1024 * 1024
+
+# مخزن محلي لنصوص الآيات (SQLite) - النص لا يتغير، فيُحمَّل مرة واحدة
+VERSE_STORE_PATH = CACHE_DIR / "verses.sqlite3"
+
 # Video Settings
 VIDEO_WIDTH = 1080
 VIDEO_HEIGHT = 1920
@@ -27,6 +44,67 @@ VIDEO_FPS = 30
 VIDEO_BITRATE = "2M"
 AUDIO_BITRATE = "192k"
 
+# Render Settings
+# "per_verse": ffmpeg لكل آية ثم دمج (ayah_1.mp4, ayah_2.mp4, ...)
+# "single_pass": filtergraph واحد لكل الآيات وترميز الفيديو النهائي في عملية واحدة
+# "stream_copy": نسخ مقاطع الخلفية المُطبَّعة (-c:v copy) وترميز آخر GOP ناقص فقط
+RENDER_MODE = os.getenv("RENDER_MODE", "per_verse")
+# حد أقصى لعدد الآيات في filtergraph واحد (مدخلان لكل آية)؛ فوقه يُستخدم per_verse
+SINGLE_PASS_MAX_VERSES = int(os.getenv("SINGLE_PASS_MAX_VERSES", "20"))
+
+# مكتبة الخلفيات المُطبَّعة (1080x1920 @ VIDEO_FPS مع GOP ثابت)
+# تُبنى مرة واحدة: python background_library.py
+NORMALIZED_BACKGROUNDS_DIR = BACKGROUNDS_DIR / "normalized"
+BACKGROUND_GOP_SECONDS = 1
+USE_BACKGROUND_LIBRARY = os.getenv("USE_BACKGROUND_LIBRARY", "1") == "1"
+
+# مخزون الخلفيات الجاهزة: عملية في الخلفية تحمّل وتُطبّع خلفيات جديدة من Pexels
+# حتى يصل المخزون إلى BACKGROUND_POOL_SIZE دون تجاوز حصة القرص
+BACKGROUND_POOL_SIZE = int(os.getenv("BACKGROUND_POOL_SIZE", "30"))
+BACKGROUND_POOL_MAX_BYTES = int(os.getenv("BACKGROUND_POOL_MAX_MB", "4096")) * 1024 * 1024
+BACKGROUND_PREFETCH_INTERVAL = 60  # ثواني بين فحوصات المخزون
+
+# Job Queue Settings
+# قائمة مهام دائمة (SQLite) مع عدد ثابت من عمليات العمل (worker processes)
+JOB_DB_PATH = CACHE_DIR / "jobs.sqlite3"
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = 1.0  # ثواني بين محاولات سحب مهمة جديدة
+# العامل يجدد "عقد" مهمته كل JOB_HEARTBEAT_INTERVAL ثانية؛ المهمة تعود للقائمة
+# فقط إذا انتهى العقد أو ماتت عملية العامل
+JOB_HEARTBEAT_INTERVAL = 15
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+# 0 = خادم الويب لا يشغّل عمالاً (عند تشغيل python job_queue.py بشكل مستقل)
+JOB_WORKERS_IN_APP = os.getenv("JOB_WORKERS_IN_APP", "1") != "0"
+# بيئة serverless (Vercel): لا يمكن تشغيل عمليات عمل دائمة، فالتوليد غير مدعوم
+SERVERLESS = bool(os.getenv("VERCEL"))
+
+# بث التقدم (Server-Sent Events)
+SSE_POLL_INTERVAL = 0.25  # ثواني بين قراءات حالة المهمة داخل الخادم
+SSE_HEARTBEAT_INTERVAL = 15  # ثواني بين رسائل keep-alive
+
+# كاش الفيديوهات الناتجة: الطلبات المتطابقة تعيد الفيديو الموجود بدلاً من إعادة التوليد
+# (يُغيَّر RENDER_CACHE_VERSION لإبطال كل الفيديوهات المخزنة)
+RENDER_CACHE_ENABLED = os.getenv("RENDER_CACHE_ENABLED", "1") == "1"
+RENDER_CACHE_VERSION = 1
+
+# Encoder Profiles
+# يُختار الـ profile لكل job أو للنشر كله (ENCODER_PROFILE)، وإذا لم يكن
+# الـ encoder متاحاً في FFmpeg المثبت يُستخدم التالي في ENCODER_FALLBACK_ORDER
+ENCODER_PROFILES = {
+    "mpeg4": {"codec": "mpeg4", "qscale": 3},
+    "x264_ultrafast": {"codec": "libx264", "preset": "ultrafast", "crf": 23},
+    "x264_veryfast": {"codec": "libx264", "preset": "veryfast", "crf": 23},
+    "x264_medium": {"codec": "libx264", "preset": "medium", "crf": 21},
+    "x265_fast": {"codec": "libx265", "preset": "fast", "crf": 28, "tag": "hvc1"},
+    "svtav1": {"codec": "libsvtav1", "preset": "8", "crf": 35},
+}
+DEFAULT_ENCODER_PROFILE = os.getenv("ENCODER_PROFILE", "x264_veryfast")
+ENCODER_FALLBACK_ORDER = ["x264_veryfast", "mpeg4"]
+
+# عدد threads لكل عملية FFmpeg، وعدد الآيات التي تُرمَّز بالتوازي
+FFMPEG_THREADS = int(os.getenv("FFMPEG_THREADS", "2"))
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "0")) or max(1, (os.cpu_count() or 1) // FFMPEG_THREADS)
+
 # Font Settings (Arabic fonts)
 ARABIC_FONTS = [
     "C:\\Windows\\Fonts\\scheherazade.ttf",  # Scheherazade - best for Arabic ligatures
@@ -39,9 +117,15 @@ ARABIC_FONTS = [
 TEXT_FONT_SIZE = 75
 TEXT_COLOR = "white"
 TEXT_OUTLINE_COLOR = "black"
-TEXT_OUTLINE_WIDTH = 5
+TEXT_OUTLINE_WIDTH = 3  # بكسل حول الحروف (نفس سُمك شبكة 7x7 القديمة)
 TEXT_PADDING = 40
 
+# كاش صور النص (PNG شفاف مقصوص حول النص) - مفتاحه: hash النص + الخط + الحجم +
+# الألوان + العرض. يُغيَّر OVERLAY_CACHE_VERSION عند تغيير طريقة الرسم
+OVERLAY_CACHE_DIR = CACHE_DIR / "overlays"
+OVERLAY_CACHE_MAX_BYTES = int(os.getenv("OVERLAY_CACHE_MAX_MB", "512")) * 1024 * 1024
+OVERLAY_CACHE_VERSION = 2  # 2: حدود النص بـ stroke_width بدل 49 رسمة
+
 # Pexels Settings
 PEXELS_SEARCH_KEYWORDS = [
     # مساجد إسلامية
@@ -69,6 +153,49 @@ PEXELS_SEARCH_KEYWORDS = [
 PEXELS_VIDEO_ORIENTATION = "portrait"
 PEXELS_VIDEO_SIZE = "hd"
 
+# فحص الفيديوهات بالذكاء الاصطناعي (filter_pexels_videos.py): عدد الفيديوهات التي
+# تُفحص بالتوازي (تحميل جزء + استخراج إطار + طلب Gemini)
+FILTER_SCREENING_WORKERS = int(os.getenv("FILTER_SCREENING_WORKERS", "6"))
+# مُصنِّف الصور المستخدم في الفحص: "gemini" (عبر الشبكة) أو "heuristic" (محلي على CPU)
+VISION_CLASSIFIER = os.getenv("VISION_CLASSIFIER", "gemini")
+GEMINI_MODEL = "gemini-1.5-flash"
+HEURISTIC_SKIN_RATIO = 0.12  # نسبة بكسلات لون البشرة التي تعني وجود أشخاص
+
+# عينات الإطارات لكل فيديو مرشح: صور video_pictures من Pexels أولاً (بدون تحميل
+# الفيديو)، وإلا FFmpeg يقفز مباشرة عبر HTTP (range requests) إلى هذه الثواني
+FILTER_PREVIEW_PICTURES = 4
+FILTER_FRAME_TIMESTAMPS = [1, 4, 8]
+
+# نتائج فحص الذكاء الاصطناعي (SQLite) - مفتاحها رقم فيديو Pexels + hash الملف
+# الفيديو الذي فُحص مرة لا يُرسل للنموذج مرة أخرى (إلا إذا تغير الملف أو النموذج)
+VERDICT_STORE_PATH = CACHE_DIR / "verdicts.sqlite3"
+
+# سجل مراجعة مجلد الخلفيات (review_videos.py): حجم + وقت تعديل + hash + آخر نتيجة
+# لكل ملف، حتى لا تُعاد مراجعة إلا الملفات الجديدة أو المعدلة
+REVIEW_MANIFEST_PATH = CACHE_DIR / "review_manifest.json"
+
+# المراجعة بلوحة إطارات (contact sheet): REVIEW_SHEET_FRAMES إطاراً موزعة على
+# مدة الفيديو في صورة واحدة (fps + tile) = طلب واحد للنموذج لكل فيديو
+REVIEW_CONTACT_SHEET = os.getenv("REVIEW_CONTACT_SHEET", "1") == "1"
+REVIEW_SHEET_COLUMNS = 3
+REVIEW_SHEET_ROWS = 3
+REVIEW_SHEET_TILE_WIDTH = 360  # عرض كل إطار في اللوحة (بكسل)
+
+# كاش نتائج البحث في Pexels (مفتاحه: الكلمة + الاتجاه + الحجم + الصفحة)
+PEXELS_SEARCH_CACHE_DIR = CACHE_DIR / "pexels_search"
+PEXELS_SEARCH_CACHE_TTL = int(os.getenv("PEXELS_SEARCH_CACHE_TTL", str(24 * 3600)))  # ثواني
+PEXELS_SEARCH_CACHE_MAX_BYTES = 50 * 1024 * 1024
+PEXELS_PER_PAGE = 80  # الحد الأقصى في Pexels
+PEXELS_POOL_PAGES = 3  # عدد الصفحات في مجموعة الاختيار العشوائي لكل كلمة
+
+# حدود استخدام Pexels API (token bucket مشترك بين كل العمليات عبر SQLite)
+# الحصة الفعلية تُقرأ من X-Ratelimit-Remaining / X-Ratelimit-Reset في كل رد
+PEXELS_RATE_LIMIT_DB = CACHE_DIR / "rate_limits.sqlite3"
+PEXELS_RATE_PER_HOUR = int(os.getenv("PEXELS_RATE_PER_HOUR", "200"))
+PEXELS_RATE_BURST = 10  # أقصى عدد طلبات متتالية
+PEXELS_QUOTA_RESERVE = int(os.getenv("PEXELS_QUOTA_RESERVE", "50"))  # أقل من هذا = حصة منخفضة
+PEXELS_RATE_MAX_WAIT = 5  # أقصى انتظار (ثواني) لتوفر token قبل استخدام الكاش
+
 # Reciter List (complete list from everyayah.com)
 RECITERS = {
     # عبد الباسط عبد الصمد - Abdul Basit Abdul Samad
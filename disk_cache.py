@@ -0,0 +1,217 @@
+"""
+كاش دائم على القرص مع حد أقصى للحجم (LRU)
+Persistent on-disk cache with size-bounded LRU eviction
+
+- كل عنصر = ملف واحد تحت مجلد الكاش
+- الكتابة ذرّية (ملف مؤقت ثم os.replace) فلا يُقرأ ملف ناقص أبداً
+- آخر استخدام يُحفظ في mtime، والأقدم يُحذف أولاً عند تجاوز الحد
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+
+class DiskCache:
+    """
+    كاش ملفات بسيط مع إخلاء LRU
+    File cache keyed by relative path parts, evicting least recently used files
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, *key):
+        """
+        Build the cache path for a key
+
+        Args:
+            key: Path parts, e.g. (reciter_folder, "001001.mp3")
+
+        Returns:
+            Path inside the cache directory
+        """
+        return self.root.joinpath(*[str(part) for part in key])
+
+    def get(self, *key):
+        """
+        Look up a cached file and mark it as recently used
+
+        Returns:
+            Path to cached file or None
+        """
+        path = self.path_for(*key)
+
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key, data):
+        """
+        Store bytes atomically under a key
+
+        Args:
+            key: Tuple of path parts
+            data: File content (bytes)
+
+        Returns:
+            Path to cached file
+        """
+        path = self.path_for(*key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            replaced = self._size_of(path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self._added(len(data), replaced)
+        return path
+
+    def temp_path(self, *key):
+        """
+        Create an empty temp file next to a key's cache path
+
+        Writing there and then calling add_file keeps the final rename on
+        the same filesystem, so it stays atomic.
+
+        Returns:
+            Path to the temp file
+        """
+        path = self.path_for(*key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.part')
+        os.close(fd)
+        return Path(tmp_path)
+
+    def add_file(self, key, src_path):
+        """
+        Move a complete file (usually from temp_path) into the cache atomically
+
+        Returns:
+            Path to cached file
+        """
+        path = self.path_for(*key)
+        size = os.path.getsize(src_path)
+        replaced = self._size_of(path)
+        os.replace(src_path, path)
+
+        self._added(size, replaced)
+        return path
+
+    def copy_to(self, path, dest):
+        """
+        Expose a cached file at dest (hard link when possible, otherwise copy)
+
+        The hard link keeps the data alive for the job even if the cache
+        entry is evicted meanwhile.
+
+        Returns:
+            dest as Path
+        """
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+
+        if dest.exists():
+            dest.unlink()
+
+        try:
+            os.link(path, dest)
+        except OSError:
+            shutil.copy2(path, dest)
+
+        return dest
+
+    def _scan(self):
+        """Return list of (mtime, size, path) for every cached file"""
+        entries = []
+        for path in self.root.rglob('*'):
+            if path.is_file() and path.suffix != '.part':
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _size_of(self, path):
+        """Size of an existing cache file (0 if missing)"""
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _added(self, size, replaced=0):
+        """
+        Track the new entry and evict old entries if over the limit
+
+        Args:
+            size: Size of the stored file
+            replaced: Size of the file it replaced under the same key
+        """
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += size - replaced
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used files until under max_bytes"""
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+
+        self._size = total
+        if removed:
+            print(f"Cache {self.root.name}: evicted {removed} files")
+
+    def stats(self):
+        """
+        Cache statistics
+
+        Returns:
+            Dictionary with hits, misses and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
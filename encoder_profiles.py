@@ -0,0 +1,105 @@
+"""
+إعدادات ترميز الفيديو (Encoder Profiles)
+Video encoder profiles with detection of the encoders FFmpeg supports
+
+الاستخدام:
+    name, profile = resolve_profile("x264_veryfast")
+    cmd += video_codec_args(profile, threads=2)
+"""
+
+import subprocess
+from functools import lru_cache
+from config import ENCODER_PROFILES, DEFAULT_ENCODER_PROFILE, ENCODER_FALLBACK_ORDER
+
+
+@lru_cache(maxsize=1)
+def available_encoders():
+    """
+    Get video encoders supported by the installed FFmpeg
+
+    Returns:
+        Set of encoder names (e.g. {"mpeg4", "libx264"})
+    """
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                              capture_output=True, encoding='utf-8',
+                              errors='ignore', timeout=10)
+    except Exception as e:
+        print(f"Warning: Could not list FFmpeg encoders: {e}")
+        return frozenset()
+
+    encoders = set()
+    for line in result.stdout.splitlines():
+        # Format: " V....D libx264  libx264 H.264 / AVC ..."
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].startswith('V') and len(parts[0]) == 6:
+            encoders.add(parts[1])
+    return frozenset(encoders)
+
+
+def resolve_profile(name=None):
+    """
+    Pick an encoder profile the installed FFmpeg can actually use
+
+    Args:
+        name: Requested profile name (default: DEFAULT_ENCODER_PROFILE)
+
+    Returns:
+        Tuple (profile_name, profile_dict)
+    """
+    encoders = available_encoders()
+    candidates = [name, DEFAULT_ENCODER_PROFILE, *ENCODER_FALLBACK_ORDER]
+
+    for candidate in candidates:
+        profile = ENCODER_PROFILES.get(candidate)
+        if profile and profile['codec'] in encoders:
+            if name and candidate != name:
+                print(f"⚠️  Encoder profile '{name}' not available, using '{candidate}'")
+            return candidate, profile
+
+    # FFmpeg not detected: mpeg4 is built into every FFmpeg build
+    return "mpeg4", ENCODER_PROFILES["mpeg4"]
+
+
+def video_codec_args(profile, threads=None, gop=None):
+    """
+    Build FFmpeg video encoding arguments for a profile
+
+    Args:
+        profile: Profile dictionary from ENCODER_PROFILES
+        threads: Optional encoder thread count
+        gop: Optional fixed keyframe interval in frames (no scene-cut keyframes)
+
+    Returns:
+        List of FFmpeg arguments
+    """
+    codec = profile['codec']
+    args = ['-c:v', codec]
+
+    if 'qscale' in profile:
+        args += ['-q:v', str(profile['qscale'])]
+    if 'preset' in profile:
+        args += ['-preset', str(profile['preset'])]
+    if 'crf' in profile:
+        args += ['-crf', str(profile['crf'])]
+    if 'tune' in profile:
+        args += ['-tune', profile['tune']]
+    if 'tag' in profile:
+        args += ['-tag:v', profile['tag']]
+
+    if codec != 'mpeg4':
+        args += ['-pix_fmt', 'yuv420p']
+
+    if threads:
+        args += ['-threads', str(threads)]
+
+    if gop:
+        args += ['-g', str(gop), '-keyint_min', str(gop)]
+        if codec == 'libx265':
+            args += ['-x265-params', f'keyint={gop}:min-keyint={gop}:scenecut=0']
+        elif codec == 'libsvtav1':
+            args += ['-svtav1-params', 'scd=0']
+        else:
+            args += ['-sc_threshold', '0']
+
+    return args
@@ -18,9 +18,11 @@ import arabic_reshaper
 from bidi.algorithm import get_display
 from quran_api import QuranAPI
 from pexels_api import PexelsAPI
+from encoder_profiles import resolve_profile, video_codec_args
+from overlay_cache import render_cached
 from config import (
     TEMP_DIR, OUTPUT_DIR, VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS,
-    AUDIO_BITRATE
+    AUDIO_BITRATE, TEXT_COLOR, TEXT_OUTLINE_COLOR, TEXT_OUTLINE_WIDTH
 )
 
 
@@ -30,14 +32,24 @@ class EnhancedVideoGenerator:
     Enhanced video generator with verse synchronization
     """
     
-    def __init__(self):
+    # إعدادات رسم النص (جزء من مفتاح كاش الصور)
+    FONT_SIZE = 60
+    IMAGEMAGICK_FONT = 'Arial'
+    IMAGEMAGICK_STROKE_WIDTH = 2
+    PILLOW_FONT = "C:\\Windows\\Fonts\\arial.ttf"
+    
+    def __init__(self, encoder_profile=None):
         self.quran_api = QuranAPI()
         self.pexels_api = PexelsAPI()
         self.temp_dir = TEMP_DIR
         self.output_dir = OUTPUT_DIR
+        self.use_imagemagick = False
+        self._pillow_font = None
         
         # Check dependencies
         self.check_dependencies()
+        
+        self.encoder_profile_name, self.encoder_profile = resolve_profile(encoder_profile)
     
     def check_dependencies(self):
         """Check if FFmpeg and ImageMagick are available"""
@@ -61,6 +73,7 @@ class EnhancedVideoGenerator:
                          errors='ignore',
                          timeout=5)
             print("✓ ImageMagick found")
+            self.use_imagemagick = True
         except FileNotFoundError:
             print("⚠️  ImageMagick not found - will use Pillow instead")
             print("For better Arabic text: https://imagemagick.org/script/download.php")
@@ -112,7 +125,78 @@ class EnhancedVideoGenerator:
         
         return bidi_text
     
-    def create_verse_image_imagemagick(self, text, output_path, width=VIDEO_WIDTH, height=VIDEO_HEIGHT):
+    def create_verse_image(self, text, output_path, width=VIDEO_WIDTH, height=VIDEO_HEIGHT):
+        """
+        Create verse image, reusing a cached render of the same text and style
+        
+        Args:
+            text: Arabic text to display
+            output_path: Where to save the image
+            width: Image width
+            height: Image height
+        
+        Returns:
+            Path to created image (cropped around the text, centered)
+        """
+        if self.use_imagemagick:
+            image = render_cached(
+                text, self.text_style('imagemagick', width, height), output_path,
+                lambda path: self.create_verse_image_imagemagick(text, path, width, height, fallback=False)
+            )
+            if image:
+                return image
+            # ImageMagick فشل: Pillow لبقية الآيات (ومفتاح كاش Pillow)
+            self.use_imagemagick = False
+        
+        return render_cached(
+            text, self.text_style('pillow', width, height), output_path,
+            lambda path: self.create_verse_image_pillow(text, path, width, height)
+        )
+    
+    def text_style(self, renderer, width, height):
+        """
+        Everything besides the text that affects the rendered pixels
+        
+        Args:
+            renderer: 'imagemagick' or 'pillow'
+        
+        Returns:
+            Style dictionary for the overlay cache key
+        """
+        if renderer == 'imagemagick':
+            font, size, stroke_width = self.IMAGEMAGICK_FONT, self.FONT_SIZE, self.IMAGEMAGICK_STROKE_WIDTH
+        else:
+            font, size, stroke_width = self.pillow_font()[1], self.FONT_SIZE, TEXT_OUTLINE_WIDTH
+        
+        return {
+            'renderer': f'enhanced-{renderer}',
+            'font': font,
+            'size': size,
+            'fill': TEXT_COLOR,
+            'outline': TEXT_OUTLINE_COLOR,
+            'stroke_width': stroke_width,
+            'width': width,
+            'height': height
+        }
+    
+    def pillow_font(self):
+        """
+        Font used by the Pillow renderer (loaded once)
+        
+        Returns:
+            Tuple (ImageFont, font name)
+        """
+        if self._pillow_font is None:
+            from PIL import ImageFont
+            
+            try:
+                self._pillow_font = (ImageFont.truetype(self.PILLOW_FONT, self.FONT_SIZE), self.PILLOW_FONT)
+            except OSError:
+                self._pillow_font = (ImageFont.load_default(), 'default')
+        return self._pillow_font
+    
+    def create_verse_image_imagemagick(self, text, output_path, width=VIDEO_WIDTH, height=VIDEO_HEIGHT,
+                                       fallback=True):
         """
         Create image with Arabic text using ImageMagick
         
@@ -121,6 +205,7 @@ class EnhancedVideoGenerator:
             output_path: Where to save the image
             width: Image width
             height: Image height
+            fallback: Render with Pillow if ImageMagick fails (otherwise return None)
         
         Returns:
             Path to created image
@@ -137,11 +222,11 @@ class EnhancedVideoGenerator:
             'magick',
             '-size', f'{width}x{height}',
             'xc:transparent',  # Transparent background
-            '-font', 'Arial',  # Use system Arabic font
-            '-pointsize', '60',
-            '-fill', 'white',
-            '-stroke', 'black',
-            '-strokewidth', '2',
+            '-font', self.IMAGEMAGICK_FONT,  # Use system Arabic font
+            '-pointsize', str(self.FONT_SIZE),
+            '-fill', TEXT_COLOR,
+            '-stroke', TEXT_OUTLINE_COLOR,
+            '-strokewidth', str(self.IMAGEMAGICK_STROKE_WIDTH),
             '-gravity', 'center',
             '-annotate', '+0+0', display_text,
             str(output_path)
@@ -153,9 +238,15 @@ class EnhancedVideoGenerator:
             print(f"✓ Created image with ImageMagick: {output_path.name}")
             return output_path
         except subprocess.CalledProcessError as e:
+            if not fallback:
+                print("ImageMagick failed")
+                return None
             print(f"ImageMagick failed, falling back to Pillow")
             return self.create_verse_image_pillow(text, output_path, width, height)
         except FileNotFoundError:
+            if not fallback:
+                print("ImageMagick not found")
+                return None
             print("ImageMagick not found, using Pillow")
             return self.create_verse_image_pillow(text, output_path, width, height)
     
@@ -172,7 +263,7 @@ class EnhancedVideoGenerator:
         Returns:
             Path to created image
         """
-        from PIL import Image, ImageDraw, ImageFont
+        from PIL import Image, ImageDraw
         
         output_path = Path(output_path)
         
@@ -184,10 +275,7 @@ class EnhancedVideoGenerator:
         draw = ImageDraw.Draw(img)
         
         # Load font
-        try:
-            font = ImageFont.truetype("C:\\Windows\\Fonts\\arial.ttf", 60)
-        except:
-            font = ImageFont.load_default()
+        font = self.pillow_font()[0]
         
         # Get text bounding box
         bbox = draw.textbbox((0, 0), display_text, font=font)
@@ -198,15 +286,9 @@ class EnhancedVideoGenerator:
         x = (width - text_width) // 2
         y = (height - text_height) // 2
         
-        # Draw text with outline
-        outline_range = 3
-        for adj_x in range(-outline_range, outline_range + 1):
-            for adj_y in range(-outline_range, outline_range + 1):
-                draw.text((x + adj_x, y + adj_y), display_text, 
-                         font=font, fill='black')
-        
-        # Draw main text
-        draw.text((x, y), display_text, font=font, fill='white')
+        # Draw text with outline (one stroked draw)
+        draw.text((x, y), display_text, font=font, fill=TEXT_COLOR,
+                  stroke_width=TEXT_OUTLINE_WIDTH, stroke_fill=TEXT_OUTLINE_COLOR)
         
         # Save
         img.save(output_path, 'PNG')
@@ -237,8 +319,8 @@ class EnhancedVideoGenerator:
             # Create image
             image_path = self.temp_dir / f"verse_{verse['surah']}_{verse['number']}.png"
             
-            # Try ImageMagick first, fallback to Pillow
-            self.create_verse_image_imagemagick(verse_text, image_path)
+            # Try ImageMagick first, fallback to Pillow (cached across jobs)
+            self.create_verse_image(verse_text, image_path)
             
             verse_data.append({
                 'image': image_path,
@@ -288,8 +370,7 @@ class EnhancedVideoGenerator:
                 f'[bg][2:v]overlay=(W-w)/2:(H-h)/2[outv]',
                 '-map', '[outv]',
                 '-map', '1:a',
-                '-c:v', 'mpeg4',
-                '-q:v', '3',
+                *video_codec_args(self.encoder_profile),
                 '-c:a', 'aac',
                 '-b:a', AUDIO_BITRATE,
                 '-r', str(VIDEO_FPS),
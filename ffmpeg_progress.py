@@ -0,0 +1,212 @@
+"""
+تقدم FFmpeg الحقيقي
+Real FFmpeg progress parsed from "-progress pipe:1" output
+
+- run_ffmpeg: يشغل FFmpeg ويقرأ out_time/fps/speed أثناء الترميز
+- EncodeProgress: يجمع تقدم عدة عمليات FFmpeg (آيات متوازية) في نسبة واحدة مع ETA
+"""
+
+import subprocess
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+def parse_progress_block(block):
+    """
+    Convert one "-progress" key/value block into numbers
+
+    Args:
+        block: Dictionary of raw values (out_time_us, fps, speed, ...)
+
+    Returns:
+        Dictionary with 'time' (encoded seconds), 'fps' and 'speed'
+    """
+    # out_time_ms is actually microseconds too (FFmpeg naming quirk)
+    raw_time = block.get('out_time_us') or block.get('out_time_ms') or '0'
+    try:
+        encoded = max(0.0, int(raw_time) / 1_000_000)
+    except ValueError:
+        encoded = 0.0
+
+    try:
+        fps = float(block.get('fps', '0'))
+    except ValueError:
+        fps = 0.0
+
+    try:
+        speed = float(block.get('speed', '0x').rstrip('x'))
+    except ValueError:
+        speed = 0.0  # "N/A" at the very start
+
+    return {'time': encoded, 'fps': fps, 'speed': speed}
+
+
+def run_ffmpeg(cmd, on_progress=None, timeout=None):
+    """
+    Run an FFmpeg command while parsing its progress
+
+    Behaves like subprocess.run(cmd, check=True): raises CalledProcessError
+    (with the stderr tail) on failure and TimeoutExpired on timeout.
+
+    Args:
+        cmd: FFmpeg command list starting with 'ffmpeg'
+        on_progress: Optional callback(stats) with time/fps/speed
+        timeout: Optional timeout in seconds
+
+    Returns:
+        Dictionary with 'encoded_seconds', 'wall_seconds' and 'speed'
+    """
+    cmd = [cmd[0], '-progress', 'pipe:1', '-nostats', *cmd[1:]]
+    started = time.monotonic()
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               encoding='utf-8', errors='ignore')
+
+    # قراءة stderr في thread منفصل حتى لا يمتلئ الـ pipe ويتوقف FFmpeg
+    stderr_tail = deque(maxlen=50)
+    stderr_thread = threading.Thread(target=lambda: stderr_tail.extend(process.stderr), daemon=True)
+    stderr_thread.start()
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer:
+        timer.start()
+
+    last = {'time': 0.0, 'fps': 0.0, 'speed': 0.0}
+    block = {}
+    try:
+        for line in process.stdout:
+            key, _, value = line.strip().partition('=')
+            if key != 'progress':
+                block[key] = value
+                continue
+
+            last = parse_progress_block(block)
+            block = {}
+            if on_progress:
+                on_progress(last)
+
+        process.wait()
+    finally:
+        if timer:
+            timer.cancel()
+        stderr_thread.join(timeout=5)
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout, stderr=''.join(stderr_tail))
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stderr=''.join(stderr_tail))
+
+    wall = time.monotonic() - started
+    return {
+        'encoded_seconds': last['time'],
+        'wall_seconds': wall,
+        'speed': last['time'] / wall if wall > 0 else 0.0
+    }
+
+
+class EncodeProgress:
+    """
+    تجميع تقدم الترميز لكل الآيات
+    Aggregates encoded seconds of several FFmpeg runs into one progress report
+    """
+
+    def __init__(self, total_seconds, callback, min_interval=0.5):
+        """
+        Args:
+            total_seconds: Total media duration being encoded
+            callback: Function(done_seconds, total_seconds, fps, eta_seconds)
+            min_interval: Minimum seconds between callback calls
+        """
+        self.total_seconds = max(total_seconds, 0.001)
+        self.callback = callback
+        self.min_interval = min_interval
+        # وقت الترميز فقط (لا يحسب تحميل الصوت والخلفيات قبل FFmpeg)
+        self._busy = 0.0
+        self._busy_since = None
+        self._active = 0
+        self._done = {}
+        self._fps = {}
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def done_seconds(self):
+        return min(sum(self._done.values()), self.total_seconds)
+
+    @contextmanager
+    def encoding(self):
+        """
+        Count wall time while an FFmpeg run is active
+
+        Parallel runs overlap, so time is counted while at least one
+        of them is running.
+        """
+        with self._lock:
+            if self._active == 0:
+                self._busy_since = time.monotonic()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+                if self._active == 0:
+                    self._busy += time.monotonic() - self._busy_since
+                    self._busy_since = None
+
+    def elapsed(self, now=None):
+        """Wall seconds spent encoding so far"""
+        if self._busy_since is None:
+            return self._busy
+        return self._busy + (now or time.monotonic()) - self._busy_since
+
+    def tracker(self, key):
+        """
+        Build an on_progress callback for one FFmpeg run
+
+        Args:
+            key: Unique key of the run (e.g. verse number)
+        """
+        def on_progress(stats):
+            self.update(key, stats['time'], stats['fps'])
+        return on_progress
+
+    def update(self, key, seconds, fps=0.0, force=False):
+        """Record encoded seconds of one run and report if due"""
+        with self._lock:
+            self._done[key] = seconds
+            self._fps[key] = fps
+
+            now = time.monotonic()
+            if not force and now - self._last_report < self.min_interval:
+                return
+            self._last_report = now
+
+            done = self.done_seconds
+            fps_total = sum(self._fps.values())
+            elapsed = self.elapsed(now)
+            eta = elapsed * (self.total_seconds - done) / done if done > 0 else None
+
+        self.callback(done, self.total_seconds, fps_total, eta)
+
+    def finish(self, key, seconds):
+        """Mark one run as fully encoded"""
+        self.update(key, seconds, 0.0, force=True)
+
+    @property
+    def fraction(self):
+        return self.done_seconds / self.total_seconds
+
+    def speed(self):
+        """Average encode speed (media seconds per wall second)"""
+        with self._lock:
+            elapsed = self.elapsed()
+        return self.done_seconds / elapsed if elapsed > 0 else 0.0
@@ -13,20 +13,20 @@
 
 import requests
 import random
-import os
 import tempfile
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from config import PEXELS_API_KEY, BACKGROUNDS_DIR
-import google.generativeai as genai
+from config import (
+    PEXELS_API_KEY, BACKGROUNDS_DIR, FILTER_SCREENING_WORKERS,
+    FILTER_PREVIEW_PICTURES, FILTER_FRAME_TIMESTAMPS
+)
+from verdict_store import VerdictStore
+from vision_classifiers import get_classifier, is_acceptable, needs_review, GEMINI_API_KEY
 from PIL import Image
 import io
 
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-
 # كلمات البحث المفلترة - مناظر طبيعية ومساجد فقط
 FILTERED_KEYWORDS = [
     "mosque architecture",
@@ -49,19 +49,15 @@ FILTERED_KEYWORDS = [
 class VideoFilterAPI:
     """فلترة الفيديوهات باستخدام AI Vision"""
     
-    def __init__(self, api_key=PEXELS_API_KEY):
+    def __init__(self, api_key=PEXELS_API_KEY, workers=FILTER_SCREENING_WORKERS, classifier=None):
         self.api_key = api_key
+        self.workers = max(1, workers)
         self.base_url = "https://api.pexels.com/videos"
         self.headers = {"Authorization": api_key}
-        self.model = None
+        self.verdict_store = VerdictStore()
         
-        # Initialize Gemini model if API key is available
-        if GEMINI_API_KEY:
-            try:
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
-                print("✓ Gemini AI Vision initialized")
-            except Exception as e:
-                print(f"⚠ Could not initialize Gemini: {e}")
+        # مُصنِّف الصور (VISION_CLASSIFIER افتراضياً)
+        self.classifier = classifier or get_classifier()
     
     def search_videos(self, query, orientation="portrait", per_page=20):
         """البحث عن فيديوهات في Pexels"""
@@ -87,65 +83,86 @@ class VideoFilterAPI:
             print(f"❌ Error searching Pexels: {e}")
             return []
     
-    def extract_frame_from_video(self, video_url):
-        """استخراج إطار من الفيديو للتحليل"""
-        try:
-            # Download a small portion of the video
-            response = requests.get(video_url, stream=True, timeout=15)
-            response.raise_for_status()
-            
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_video:
-                # Download only first 2MB for speed
-                downloaded = 0
-                max_size = 2 * 1024 * 1024  # 2MB
-                
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        tmp_video.write(chunk)
-                        downloaded += len(chunk)
-                        if downloaded >= max_size:
-                            break
-                
-                tmp_video_path = tmp_video.name
-            
-            # Extract frame using ffmpeg
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_frame:
-                tmp_frame_path = tmp_frame.name
-            
-            # Extract frame at 2 seconds
-            cmd = [
-                'ffmpeg', '-i', tmp_video_path,
-                '-ss', '00:00:02',
-                '-vframes', '1',
-                '-q:v', '2',
-                '-y',
-                tmp_frame_path
-            ]
-            
-            subprocess.run(cmd, capture_output=True, check=True)
-            
-            # Load image
-            img = Image.open(tmp_frame_path)
+    def get_preview_pictures(self, video_obj, max_pictures=FILTER_PREVIEW_PICTURES):
+        """
+        صور معاينة الفيديو من Pexels (video_pictures)
+        
+        Pexels returns thumbnails taken across the whole video with every
+        search result, so no video bytes need to be downloaded.
+        
+        Returns:
+            List of PIL images (empty if unavailable)
+        """
+        pictures = sorted(video_obj.get("video_pictures", []), key=lambda p: p.get("nr", 0))
+        if len(pictures) > max_pictures:
+            step = len(pictures) / max_pictures
+            pictures = [pictures[int(i * step)] for i in range(max_pictures)]
+        
+        images = []
+        for picture in pictures:
+            try:
+                response = requests.get(picture["picture"], timeout=10)
+                response.raise_for_status()
+                images.append(Image.open(io.BytesIO(response.content)).convert("RGB"))
+            except Exception as e:
+                print(f"⚠ Error loading preview picture: {e}")
+        
+        return images
+    
+    def extract_frames_from_video(self, video_url, duration=0, timestamps=FILTER_FRAME_TIMESTAMPS):
+        """
+        استخراج عدة إطارات من الفيديو مباشرة عبر HTTP
+        
+        FFmpeg opens the URL once per timestamp with input seeking (-ss before
+        -i), so it fetches only the byte ranges it needs (moov atom + the
+        frames around each timestamp), in a single invocation.
+        
+        Args:
+            video_url: Direct video URL
+            duration: Video duration in seconds (timestamps past it are dropped)
+            timestamps: Seconds at which to take frames
+        
+        Returns:
+            List of PIL images (empty on failure)
+        """
+        if duration:
+            timestamps = [t for t in timestamps if t < duration] or [0]
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cmd = ['ffmpeg', '-y', '-v', 'error']
+            for t in timestamps:
+                cmd += ['-ss', str(t), '-rw_timeout', '15000000', '-i', video_url]
             
-            # Cleanup
-            os.unlink(tmp_video_path)
-            os.unlink(tmp_frame_path)
+            frame_paths = []
+            for i in range(len(timestamps)):
+                frame_path = Path(tmp_dir) / f"frame_{i}.jpg"
+                cmd += ['-map', f'{i}:v:0', '-frames:v', '1', '-q:v', '2', str(frame_path)]
+                frame_paths.append(frame_path)
             
-            return img
+            try:
+                subprocess.run(cmd, capture_output=True, check=True, timeout=90)
+            except subprocess.CalledProcessError as e:
+                print(f"⚠ Error extracting frames: {e.stderr.decode('utf-8', 'ignore').strip()[-200:]}")
+            except subprocess.TimeoutExpired:
+                print("⚠ Error extracting frames: timeout")
+            
+            images = []
+            for frame_path in frame_paths:
+                if frame_path.exists() and frame_path.stat().st_size > 0:
+                    with Image.open(frame_path) as img:
+                        images.append(img.convert("RGB"))
         
-        except Exception as e:
-            print(f"⚠ Error extracting frame: {e}")
-            return None
+        return images
     
-    def analyze_video_content(self, image):
-        """تحليل محتوى الفيديو باستخدام AI Vision"""
-        if not self.model or not image:
+    def analyze_video_content(self, images):
+        """تحليل محتوى الفيديو باستخدام AI Vision (كل الإطارات في طلب واحد)"""
+        if not self.classifier.is_ready() or not images:
             return None
         
         try:
             prompt = """
-            Analyze this image and determine if it contains:
+            These images are frames from one video.
+            Analyze them and determine if any of them contains:
             1. Any humans or people (even partially visible)
             2. Any animals (including birds, fish, insects, etc.)
             3. Any inappropriate content for Islamic context
@@ -162,19 +179,7 @@ class VideoFilterAPI:
             Be very strict: if you see ANY sign of humans or animals, mark it as true.
             """
             
-            response = self.model.generate_content([prompt, image])
-            result_text = response.text.strip()
-            
-            # Extract JSON from response
-            import json
-            # Remove markdown code blocks if present
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(result_text)
-            return result
+            return self.classifier.classify(images, prompt)
         
         except Exception as e:
             print(f"⚠ Error analyzing content: {e}")
@@ -201,37 +206,51 @@ class VideoFilterAPI:
             if not video_url:
                 return False
             
+            # نتيجة محفوظة من فحص سابق؟
+            verdict = self.verdict_store.get(self.classifier.model_version, video_id=video_obj.get('id'))
+            if verdict:
+                status = "✅ ACCEPTED" if verdict['acceptable'] else "❌ REJECTED"
+                print(f"   {status} (cached verdict) - video ID: {video_obj.get('id')}")
+                return verdict['acceptable']
+            
             print(f"   📹 Analyzing video ID: {video_obj.get('id')}...")
             
-            # Extract frame
-            frame = self.extract_frame_from_video(video_url)
-            if not frame:
-                print("   ⚠ Could not extract frame, skipping...")
+            # Sample frames: Pexels thumbnails first, then FFmpeg over HTTP
+            frames = self.get_preview_pictures(video_obj)
+            if not frames:
+                frames = self.extract_frames_from_video(video_url, duration=video_obj.get("duration", 0))
+            if not frames:
+                print("   ⚠ Could not extract frames, skipping...")
                 return False
             
             # Analyze content
-            analysis = self.analyze_video_content(frame)
+            analysis = self.analyze_video_content(frames)
             if not analysis:
                 print("   ⚠ Could not analyze content, skipping...")
                 return False
             
             # Check criteria
-            has_humans = analysis.get("has_humans", True)
-            has_animals = analysis.get("has_animals", True)
-            is_appropriate = analysis.get("is_appropriate", False)
+            has_humans = analysis.get("has_humans")
+            has_animals = analysis.get("has_animals")
+            is_appropriate = analysis.get("is_appropriate")
             
             print(f"   📊 Analysis: {analysis.get('description', 'N/A')}")
             print(f"   👤 Humans: {has_humans} | 🐾 Animals: {has_animals} | ✓ Appropriate: {is_appropriate}")
             
-            # Accept only if no humans, no animals, and appropriate
-            is_acceptable = not has_humans and not has_animals and is_appropriate
+            # Accept only if no humans, no animals, and appropriate (unknown = not accepted)
+            acceptable = is_acceptable(analysis)
+            
+            self.verdict_store.put(self.classifier.model_version, analysis, acceptable,
+                                   video_id=video_obj.get('id'))
             
-            if is_acceptable:
+            if acceptable:
                 print(f"   ✅ ACCEPTED - Category: {analysis.get('category', 'unknown')}")
+            elif needs_review(analysis):
+                print(f"   ⏸ NEEDS REVIEW ({self.classifier.name} cannot judge it) - not downloaded")
             else:
                 print(f"   ❌ REJECTED")
             
-            return is_acceptable
+            return acceptable
         
         except Exception as e:
             print(f"   ❌ Error checking video: {e}")
@@ -257,52 +276,91 @@ class VideoFilterAPI:
             print(f"   ❌ Download error: {e}")
             return None
     
-    def get_filtered_video(self, max_attempts=10):
-        """الحصول على فيديو مفلتر"""
+    def get_download_url(self, video_obj):
+        """رابط التحميل (HD بعرض 1080 أو أقل)"""
+        video_files = video_obj.get("video_files", [])
+        
+        for vf in video_files:
+            if vf.get("quality") == "hd" and vf.get("width", 0) <= 1080:
+                return vf.get("link")
+        
+        if video_files:
+            return video_files[0].get("link")
+        return None
+    
+    def get_filtered_videos(self, count, max_attempts=10, exclude_ids=()):
+        """
+        الحصول على عدة فيديوهات مفلترة من صفحة بحث واحدة
+        
+        Screens up to max_attempts candidates in parallel (frame extraction and
+        Gemini calls on a pool of self.workers threads) and stops as soon as
+        `count` videos are accepted and downloaded; pending screenings are
+        cancelled.
+        
+        Args:
+            count: Number of accepted videos wanted
+            max_attempts: Maximum candidates to screen
+            exclude_ids: Pexels video ids to skip (already downloaded)
+        
+        Returns:
+            List of downloaded video paths (may be shorter than count)
+        """
         keyword = random.choice(FILTERED_KEYWORDS)
         print(f"\n🔍 Searching for: '{keyword}'")
         
         videos = self.search_videos(keyword, orientation="portrait", per_page=20)
+        videos = [video for video in videos if video.get('id') not in exclude_ids]
         
         if not videos:
             print("❌ No videos found")
-            return None
-        
-        print(f"📦 Found {len(videos)} videos, filtering...")
+            return []
         
         # Shuffle to get variety
         random.shuffle(videos)
+        candidates = videos[:max_attempts]
         
-        attempts = 0
-        for video in videos:
-            if attempts >= max_attempts:
-                print(f"⚠ Reached max attempts ({max_attempts})")
-                break
-            
-            attempts += 1
-            print(f"\n🔄 Attempt {attempts}/{max_attempts}")
+        print(f"📦 Found {len(videos)} videos, screening {len(candidates)} "
+              f"({self.workers} in parallel)...")
+        
+        downloaded = []
+        done = threading.Event()
+        
+        def screen(video):
+            # لا داعي للفحص بعد الوصول للعدد المطلوب
+            if done.is_set():
+                return False
+            return self.is_video_acceptable(video)
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(screen, video): video for video in candidates}
             
-            if self.is_video_acceptable(video):
-                # Download the video
-                video_files = video.get("video_files", [])
-                video_url = None
+            for future in as_completed(futures):
+                if not future.result():
+                    continue
                 
-                for vf in video_files:
-                    if vf.get("quality") == "hd" and vf.get("width", 0) <= 1080:
-                        video_url = vf.get("link")
-                        break
+                video = futures[future]
+                video_url = self.get_download_url(video)
+                if not video_url:
+                    continue
                 
-                if not video_url and video_files:
-                    video_url = video_files[0].get("link")
+                output_path = BACKGROUNDS_DIR / f"pexels_{video['id']}.mp4"
+                if self.download_video(video_url, output_path):
+                    downloaded.append(output_path)
                 
-                if video_url:
-                    output_path = BACKGROUNDS_DIR / f"pexels_{video['id']}.mp4"
-                    downloaded = self.download_video(video_url, output_path)
-                    if downloaded:
-                        return downloaded
+                if len(downloaded) >= count:
+                    done.set()
+                    for pending in futures:
+                        pending.cancel()
+                    break
         
-        print("\n❌ Could not find acceptable video after all attempts")
-        return None
+        if not downloaded:
+            print("\n❌ Could not find acceptable video after all attempts")
+        return downloaded
+    
+    def get_filtered_video(self, max_attempts=10):
+        """الحصول على فيديو مفلتر"""
+        downloaded = self.get_filtered_videos(1, max_attempts=max_attempts)
+        return downloaded[0] if downloaded else None
     
     def download_multiple_filtered_videos(self, count=5):
         """تحميل عدة فيديوهات مفلترة"""
@@ -312,18 +370,21 @@ class VideoFilterAPI:
         
         downloaded = []
         
-        for i in range(count):
+        # كل جولة تفحص صفحة بحث كاملة بالتوازي
+        for round_number in range(count):
+            remaining = count - len(downloaded)
+            if remaining <= 0:
+                break
+            
             print(f"\n{'─'*60}")
-            print(f"📥 Downloading video {i+1}/{count}")
+            print(f"📥 Round {round_number + 1}: {remaining} videos still needed")
             print(f"{'─'*60}")
             
-            video_path = self.get_filtered_video(max_attempts=15)
+            exclude_ids = {int(path.stem.split('_')[1]) for path in downloaded}
+            videos = self.get_filtered_videos(remaining, max_attempts=15, exclude_ids=exclude_ids)
             
-            if video_path:
-                downloaded.append(video_path)
-                print(f"\n✅ Success! Total downloaded: {len(downloaded)}/{count}")
-            else:
-                print(f"\n⚠ Failed to download video {i+1}")
+            downloaded.extend(videos)
+            print(f"\n✅ Total downloaded: {len(downloaded)}/{count}")
         
         print(f"\n{'='*60}")
         print(f"📊 SUMMARY")
@@ -351,17 +412,27 @@ def main():
     print("   ✓ Islamic mosques only")
     print("   ✓ Shariah-compliant content")
     
-    # Check if Gemini API key is set
-    if not GEMINI_API_KEY:
-        print("\n⚠ WARNING: GEMINI_API_KEY not set!")
-        print("Please set your Gemini API key:")
-        print("   export GEMINI_API_KEY='your-api-key-here'")
-        print("\nGet your free API key at: https://makersuite.google.com/app/apikey")
-        return
-    
     # Initialize filter
     filter_api = VideoFilterAPI()
     
+    # Check if the classifier can run (Gemini needs an API key)
+    if not filter_api.classifier.is_ready():
+        if not GEMINI_API_KEY:
+            print("\n⚠ WARNING: GEMINI_API_KEY not set!")
+            print("Please set your Gemini API key:")
+            print("   export GEMINI_API_KEY='your-api-key-here'")
+            print("\nGet your free API key at: https://makersuite.google.com/app/apikey")
+        return
+    
+    # مُصنِّف مؤقت (heuristic) لا يقبل أي فيديو: التحميل معه لا معنى له
+    if filter_api.classifier.provisional:
+        print(f"\n❌ ERROR: '{filter_api.classifier.name}' verdicts are provisional and cannot "
+              f"accept videos for download.")
+        print("Use VISION_CLASSIFIER=gemini with GEMINI_API_KEY set.")
+        return
+    
+    print(f"\n🧠 Classifier: {filter_api.classifier.model_version}")
+    
     # Ask user how many videos to download
     try:
         count = int(input("\n📊 How many filtered videos to download? (default: 5): ") or "5")
@@ -11,13 +11,21 @@ Final Quran Video Generator
 
 import subprocess
 import os
+import math
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from mutagen.mp3 import MP3
 from quran_api import QuranAPI
 from pexels_api import PexelsAPI
+from background_library import BackgroundLibrary
+from encoder_profiles import resolve_profile, video_codec_args
+from ffmpeg_progress import run_ffmpeg, EncodeProgress
 from config import (
     TEMP_DIR, OUTPUT_DIR, VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS,
-    AUDIO_BITRATE
+    AUDIO_BITRATE, RENDER_MODE, SINGLE_PASS_MAX_VERSES, FFMPEG_THREADS, RENDER_WORKERS,
+    USE_BACKGROUND_LIBRARY, DEFAULT_ENCODER_PROFILE
 )
 
 
@@ -27,14 +35,22 @@ class FinalVideoGenerator:
     Final video generator with clean Arabic text and individual verse videos
     """
     
-    def __init__(self):
+    def __init__(self, workers=RENDER_WORKERS, encoder_profile=None):
         self.quran_api = QuranAPI()
         self.pexels_api = PexelsAPI()
         self.temp_dir = TEMP_DIR
         self.output_dir = OUTPUT_DIR
+        self.workers = max(1, workers)
+        self.background_library = BackgroundLibrary()
+        self.used_backgrounds = set()
+        self._backgrounds_lock = threading.Lock()
+        self.encode_progress = None
+        self.encode_speed = None
         
         # Check FFmpeg
         self.check_ffmpeg()
+        
+        self.encoder_profile_name, self.encoder_profile = resolve_profile(encoder_profile)
     
     def check_ffmpeg(self):
         """Check if FFmpeg is available"""
@@ -84,24 +100,37 @@ class FinalVideoGenerator:
     
 
     
-    def create_individual_verse_video(self, audio_path, output_path, verse_number):
+    def get_verse_background(self, verse_number):
         """
-        إنشاء فيديو مستقل لآية واحدة مع فيديو خلفية فريد (بدون نص)
-        Create individual video for one verse with unique background (no text)
+        تحميل فيديو خلفية فريد لآية واحدة
+        Download a unique background video for one verse
+        
+        A pre-normalized background from the pool (filled by the background
+        prefetcher) is preferred: no network, no scaling needed. When every
+        pool background is already used by this video, one is repeated rather
+        than blocking on a download; Pexels is only used if the pool is empty.
         
         Args:
-            audio_path: Path to verse audio
-            output_path: Output video path (e.g., ayah_1.mp4)
             verse_number: Verse number for naming
         
         Returns:
-            Path to created video or None
+            Path to background video or None
         """
-        output_path = Path(output_path)
-        
-        print(f"\n  Creating video for verse {verse_number}...")
+        if USE_BACKGROUND_LIBRARY:
+            with self._backgrounds_lock:
+                background_video = self.background_library.pick(exclude=self.used_backgrounds)
+                if background_video:
+                    self.used_backgrounds.add(background_video)
+                    print(f"    ✓ Normalized background: {background_video.name}")
+                else:
+                    # المخزون استُهلك: تكرار خلفية أفضل من انتظار التحميل
+                    background_video = self.background_library.pick()
+                    if background_video:
+                        print(f"    ↻ Pool exhausted, reusing: {background_video.name}")
+            
+            if background_video:
+                return background_video
         
-        # 1. تحميل فيديو خلفية فريد لهذه الآية
         print(f"    Downloading unique background video...")
         background_video = self.pexels_api.download_random_video(
             save_dir=self.temp_dir,
@@ -114,23 +143,52 @@ class FinalVideoGenerator:
         else:
             print(f"    ✓ Unique background downloaded")
         
+        return background_video
+    
+    def create_individual_verse_video(self, audio_path, output_path, verse_number):
+        """
+        إنشاء فيديو مستقل لآية واحدة مع فيديو خلفية فريد (بدون نص)
+        Create individual video for one verse with unique background (no text)
+        
+        Args:
+            audio_path: Path to verse audio
+            output_path: Output video path (e.g., ayah_1.mp4)
+            verse_number: Verse number for naming
+        
+        Returns:
+            Path to created video or None
+        """
+        output_path = Path(output_path)
+        
+        print(f"\n  Creating video for verse {verse_number}...")
+        
+        # 1. تحميل فيديو خلفية فريد لهذه الآية
+        background_video = self.get_verse_background(verse_number)
+        
         # 2. الحصول على مدة الصوت
         duration = self.get_audio_duration(audio_path)
         print(f"    Audio duration: {duration:.2f}s")
         
         # 3. إنشاء الفيديو (خلفية + صوت فقط، بدون نص)
+        if self.background_library.is_normalized(background_video):
+            # الخلفية مُطبَّعة مسبقاً - لا حاجة لـ scale/crop
+            video_args = ['-map', '0:v']
+        else:
+            video_args = [
+                '-filter_complex',
+                f'[0:v]scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=increase,'\
+                f'crop={VIDEO_WIDTH}:{VIDEO_HEIGHT}[outv]',
+                '-map', '[outv]',
+            ]
+        
         cmd = [
             'ffmpeg', '-y',
             '-stream_loop', '-1',  # تكرار الخلفية
             '-i', str(background_video),
             '-i', str(audio_path),
-            '-filter_complex',
-            f'[0:v]scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=increase,'\
-            f'crop={VIDEO_WIDTH}:{VIDEO_HEIGHT}[outv]',
-            '-map', '[outv]',
+            *video_args,
             '-map', '1:a',
-            '-c:v', 'mpeg4',
-            '-q:v', '3',
+            *video_codec_args(self.encoder_profile, threads=FFMPEG_THREADS),
             '-c:a', 'aac',
             '-b:a', AUDIO_BITRATE,
             '-r', str(VIDEO_FPS),
@@ -139,14 +197,183 @@ class FinalVideoGenerator:
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True,
-                         encoding='utf-8', errors='ignore', timeout=120)
+            with self.encoding():
+                run_ffmpeg(cmd, on_progress=self.progress_tracker(verse_number), timeout=120)
+            if self.encode_progress:
+                self.encode_progress.finish(verse_number, duration)
             print(f"    ✓ Video created: {output_path.name}")
             return output_path
         except Exception as e:
             print(f"    ✗ Failed to create video: {e}")
             return None
     
+    def progress_tracker(self, key):
+        """
+        FFmpeg progress callback for one encode (None when not tracking)
+        
+        Args:
+            key: Unique key of the encode (e.g. verse number)
+        """
+        if self.encode_progress:
+            return self.encode_progress.tracker(key)
+        return None
+    
+    def encoding(self):
+        """Context that counts its wall time towards the encode speed"""
+        if self.encode_progress:
+            return self.encode_progress.encoding()
+        return nullcontext()
+    
+    def create_stream_copy_verse_video(self, audio_path, output_path, verse_number):
+        """
+        إنشاء فيديو آية بنسخ مقاطع الخلفية بدون إعادة ترميز
+        Create a verse video by stream-copying keyframe-aligned background GOPs
+        
+        Whole GOPs of a normalized background are copied with -c:v copy; only
+        the final partial GOP is re-encoded. Falls back to
+        create_individual_verse_video when the background is not normalized,
+        was encoded with a different profile, or is shorter than the recitation.
+        
+        Args:
+            audio_path: Path to verse audio
+            output_path: Output video path (e.g., ayah_1.mp4)
+            verse_number: Verse number for naming
+        
+        Returns:
+            Path to created video or None
+        """
+        output_path = Path(output_path)
+        
+        print(f"\n  Creating stream-copy video for verse {verse_number}...")
+        
+        background_video = self.get_verse_background(verse_number)
+        entry = None
+        if self.background_library.is_normalized(background_video):
+            entry = self.background_library.entry_for(background_video)
+        
+        duration = self.get_audio_duration(audio_path)
+        print(f"    Audio duration: {duration:.2f}s")
+        
+        if (not entry or duration > entry['duration']
+                or entry.get('profile') != self.encoder_profile_name):
+            print(f"    ⚠️  Background not usable for stream copy, re-encoding")
+            return self.create_individual_verse_video(audio_path, output_path, verse_number)
+        
+        gop_seconds = entry['gop'] / entry['fps']
+        copy_duration = math.floor(duration / gop_seconds) * gop_seconds
+        tail_duration = duration - copy_duration
+        
+        segments = []
+        commands = []
+        
+        if copy_duration > 0:
+            head_path = self.temp_dir / f"{output_path.stem}_head.mp4"
+            segments.append(head_path)
+            commands.append([
+                'ffmpeg', '-y',
+                '-i', str(background_video),
+                '-t', f'{copy_duration:.3f}',
+                '-an',
+                '-c:v', 'copy',
+                str(head_path)
+            ])
+        
+        # إعادة ترميز آخر GOP ناقص فقط
+        if tail_duration >= 1 / entry['fps']:
+            tail_path = self.temp_dir / f"{output_path.stem}_tail.mp4"
+            segments.append(tail_path)
+            commands.append([
+                'ffmpeg', '-y',
+                '-ss', f'{copy_duration:.3f}',
+                '-i', str(background_video),
+                '-t', f'{tail_duration:.3f}',
+                '-an',
+                *video_codec_args(self.encoder_profile, threads=FFMPEG_THREADS, gop=entry['gop']),
+                '-r', str(VIDEO_FPS),
+                str(tail_path)
+            ])
+        
+        concat_file = self.temp_dir / f"{output_path.stem}_segments.txt"
+        with open(concat_file, 'w', encoding='utf-8') as f:
+            for segment in segments:
+                abs_path = str(segment.absolute()).replace('\\', '/')
+                f.write(f"file '{abs_path}'\n")
+        
+        # دمج المقاطع مع الصوت (الفيديو بدون إعادة ترميز)
+        commands.append([
+            'ffmpeg', '-y',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', str(concat_file),
+            '-i', str(audio_path),
+            '-map', '0:v',
+            '-map', '1:a',
+            '-c:v', 'copy',
+            '-c:a', 'aac',
+            '-b:a', AUDIO_BITRATE,
+            str(output_path)
+        ])
+        
+        try:
+            with self.encoding():
+                for cmd in commands:
+                    subprocess.run(cmd, check=True, capture_output=True,
+                                 encoding='utf-8', errors='ignore', timeout=120)
+            if self.encode_progress:
+                self.encode_progress.finish(verse_number, duration)
+            print(f"    ✓ Video created (stream copy): {output_path.name}")
+            return output_path
+        except Exception as e:
+            print(f"    ✗ Failed to create video: {e}")
+            return None
+    
+    def create_verse_videos(self, audio_files, update_progress, stream_copy=False):
+        """
+        ترميز فيديوهات الآيات بالتوازي مع الحفاظ على الترتيب
+        Encode verse clips concurrently (bounded by self.workers), keeping order
+        
+        Args:
+            audio_files: List of verse audio paths (in order)
+            update_progress: Progress reporting function
+            stream_copy: Use create_stream_copy_verse_video for each verse
+        
+        Returns:
+            List of created video paths in verse order (failed verses omitted)
+        """
+        total_verses = len(audio_files)
+        results = {}
+        
+        if stream_copy:
+            create_video = self.create_stream_copy_verse_video
+        else:
+            create_video = self.create_individual_verse_video
+        
+        print(f"\nEncoding {total_verses} verse videos with {self.workers} worker(s)...")
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(
+                    create_video,
+                    audio_path=audio_file,
+                    output_path=self.temp_dir / f"ayah_{i}.mp4",
+                    verse_number=i
+                ): i
+                for i, audio_file in enumerate(audio_files, 1)
+            }
+            
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                results[i] = future.result()
+                
+                # تحديث التقدم
+                if self.encode_progress:
+                    progress = 40 + int(self.encode_progress.fraction * 40)
+                else:
+                    progress = 40 + int((done / total_verses) * 40)
+                update_progress(progress, f"تم إنشاء فيديو الآية {done}/{total_verses}")
+        
+        return [results[i] for i in sorted(results) if results[i]]
+    
     def merge_videos(self, video_paths, output_path):
         """
         دمج كل الفيديوهات المستقلة في فيديو واحد نهائي
@@ -198,6 +425,119 @@ class FinalVideoGenerator:
             print(f"✗ Failed to merge videos: {e}")
             return None
     
+    def build_single_pass_filtergraph(self, durations, normalized=None):
+        """
+        بناء filtergraph واحد يغطي كل الآيات
+        Build one filtergraph covering every verse
+        
+        Inputs are expected in pairs: background video at index 2*i and
+        verse audio at index 2*i+1. Each background is scaled, cropped and
+        trimmed to its verse's audio duration, then all segments are joined
+        with the concat filter.
+        
+        Args:
+            durations: List of audio durations (seconds), one per verse
+            normalized: Optional list of flags; normalized backgrounds skip scale/crop
+        
+        Returns:
+            Filtergraph string producing [outv] and [outa]
+        """
+        normalized = normalized or [False] * len(durations)
+        chains = []
+        concat_inputs = ""
+        
+        for i, duration in enumerate(durations):
+            video_input = 2 * i
+            audio_input = 2 * i + 1
+            
+            if normalized[i]:
+                prepare = ''
+            else:
+                prepare = (
+                    f'scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=increase,'
+                    f'crop={VIDEO_WIDTH}:{VIDEO_HEIGHT},setsar=1,fps={VIDEO_FPS},'
+                )
+            
+            chains.append(
+                f'[{video_input}:v]{prepare}'
+                f'trim=duration={duration:.3f},setpts=PTS-STARTPTS[v{i}]'
+            )
+            chains.append(
+                f'[{audio_input}:a]aformat=sample_rates=44100:channel_layouts=stereo,'
+                f'atrim=duration={duration:.3f},asetpts=PTS-STARTPTS[a{i}]'
+            )
+            concat_inputs += f'[v{i}][a{i}]'
+        
+        chains.append(f'{concat_inputs}concat=n={len(durations)}:v=1:a=1[outv][outa]')
+        
+        return ';\n'.join(chains)
+    
+    def render_single_pass(self, audio_files, output_path):
+        """
+        ترميز كل الآيات في عملية FFmpeg واحدة (بدون ayah_N.mp4 وسيطة)
+        Render every verse into the final video with a single FFmpeg process
+        
+        Args:
+            audio_files: List of verse audio paths (in order)
+            output_path: Output final video path
+        
+        Returns:
+            Path to final video or None
+        """
+        output_path = Path(output_path)
+        
+        print(f"\nSingle-pass render for {len(audio_files)} verses...")
+        
+        inputs = []
+        durations = []
+        normalized = []
+        
+        for i, audio_file in enumerate(audio_files, 1):
+            print(f"\n  Preparing verse {i}...")
+            
+            background_video = self.get_verse_background(i)
+            if not background_video:
+                print(f"    ✗ No background for verse {i}")
+                return None
+            
+            duration = self.get_audio_duration(audio_file)
+            print(f"    Audio duration: {duration:.2f}s")
+            
+            inputs += ['-stream_loop', '-1', '-i', str(background_video)]
+            inputs += ['-i', str(audio_file)]
+            durations.append(duration)
+            normalized.append(self.background_library.is_normalized(background_video))
+        
+        # كتابة الـ filtergraph في ملف لتجنب حد طول سطر الأوامر
+        filter_script = self.temp_dir / "single_pass_filter.txt"
+        with open(filter_script, 'w', encoding='utf-8') as f:
+            f.write(self.build_single_pass_filtergraph(durations, normalized))
+        
+        cmd = [
+            'ffmpeg', '-y',
+            *inputs,
+            '-filter_complex_script', str(filter_script),
+            '-map', '[outv]',
+            '-map', '[outa]',
+            *video_codec_args(self.encoder_profile),
+            '-c:a', 'aac',
+            '-b:a', AUDIO_BITRATE,
+            '-r', str(VIDEO_FPS),
+            str(output_path)
+        ]
+        
+        # مهلة تتناسب مع المدة الكلية
+        timeout = max(300, int(sum(durations) * 4))
+        
+        try:
+            with self.encoding():
+                run_ffmpeg(cmd, on_progress=self.progress_tracker('single_pass'), timeout=timeout)
+            print(f"✓ Final video created: {output_path.name}")
+            return output_path
+        except Exception as e:
+            print(f"✗ Failed single-pass render: {e}")
+            return None
+    
     def cleanup_temp_files(self, keep_final=True):
         """
         تنظيف الملفات المؤقتة
@@ -217,7 +557,8 @@ class FinalVideoGenerator:
         except Exception as e:
             print(f"Warning: Could not clean all temp files: {e}")
     
-    def generate(self, reciter_id, surah_number, verse_start, verse_end, progress_callback=None):
+    def generate(self, reciter_id, surah_number, verse_start, verse_end, progress_callback=None,
+                 render_mode=None, encoder_profile=None):
         """
         سير العمل الرئيسي لتوليد الفيديو
         Main workflow for video generation
@@ -228,6 +569,8 @@ class FinalVideoGenerator:
             verse_start: رقم الآية الأولى
             verse_end: رقم الآية الأخيرة
             progress_callback: دالة callback للتقدم (اختياري)
+            render_mode: "per_verse" أو "single_pass" أو "stream_copy" (الافتراضي: RENDER_MODE)
+            encoder_profile: اسم الـ profile من ENCODER_PROFILES (اختياري)
         
         Returns:
             مسار الفيديو النهائي أو None
@@ -245,6 +588,10 @@ class FinalVideoGenerator:
             print(f"  Verses: {verse_start}-{verse_end}")
             print("="*70)
             
+            if encoder_profile:
+                self.encoder_profile_name, self.encoder_profile = resolve_profile(encoder_profile)
+            print(f"  Encoder: {self.encoder_profile_name}")
+            
             # الخطوة 1: جلب نصوص الآيات من API
             update_progress(10, "جاري تحميل نصوص الآيات...")
             verses = self.quran_api.get_verse_text(surah_number, verse_start, verse_end)
@@ -278,69 +625,79 @@ class FinalVideoGenerator:
             
             print(f"✓ Background video ready: {background_video.name}")
             
-            # الخطوة 4: إنشاء فيديو مستقل لكل آية
-            update_progress(40, "جاري إنشاء فيديوهات الآيات المستقلة...")
+            # بناء اسم الفيديو النهائي
+            reciter_name = self.quran_api.get_reciters()[reciter_id]["name_en"].replace(" ", "_")
+            surah_name = self.quran_api.get_surahs()[surah_number]
             
-            individual_videos = []
-            total_verses = len(verses)
+            # الترميز غير الافتراضي يحصل على اسم مستقل (لا يستبدل الفيديو المخزن)
+            profile_suffix = ""
+            if self.encoder_profile_name != DEFAULT_ENCODER_PROFILE:
+                profile_suffix = f"_{self.encoder_profile_name}"
             
-            for i, (verse, audio_file) in enumerate(zip(verses, audio_files), 1):
-                # اسم الفيديو المستقل
-                verse_video_name = f"ayah_{i}.mp4"
-                verse_video_path = self.temp_dir / verse_video_name
-                
-                # إنشاء الفيديو (بدون نص)
-                video_path = self.create_individual_verse_video(
-                    audio_path=audio_file,
-                    output_path=verse_video_path,
-                    verse_number=i
-                )
+            final_filename = f"{reciter_name}_{surah_name}_verses{verse_start}-{verse_end}_FINAL{profile_suffix}.mp4"
+            final_output_path = self.output_dir / final_filename
+            
+            render_mode = render_mode or RENDER_MODE
+            if render_mode == "single_pass" and len(audio_files) > SINGLE_PASS_MAX_VERSES:
+                # كل آية تفتح مدخلين في عملية FFmpeg واحدة: فوق الحد نرجع للترميز لكل آية
+                print(f"⚠ {len(audio_files)} verses > SINGLE_PASS_MAX_VERSES ({SINGLE_PASS_MAX_VERSES}), "
+                      f"using per_verse")
+                render_mode = "per_verse"
+            self.used_backgrounds = set()
+            
+            # تتبع تقدم الترميز الحقيقي (ثواني مُرمَّزة / المدة الكلية)
+            encode_end = 85 if render_mode == "single_pass" else 80
+            
+            def report_encoding(done, total, fps, eta):
+                progress = 40 + int(done / total * (encode_end - 40))
+                message = f"جاري الترميز: {done:.0f}/{total:.0f} ث"
+                if fps:
+                    message += f" | {fps:.0f} fps"
+                if eta is not None:
+                    message += f" | متبقي ~{eta:.0f} ث"
+                update_progress(progress, message)
+            
+            total_duration = sum(self.get_audio_duration(audio_file) for audio_file in audio_files)
+            self.encode_progress = EncodeProgress(total_duration, report_encoding)
+            
+            if render_mode == "single_pass":
+                # الخطوة 4+5: ترميز كل الآيات مباشرة في الفيديو النهائي
+                update_progress(40, "جاري إنشاء الفيديو في مرحلة واحدة...")
+                final_video = self.render_single_pass(audio_files, final_output_path)
                 
-                if video_path:
-                    individual_videos.append(video_path)
+                if not final_video:
+                    update_progress(0, "فشل إنشاء الفيديو")
+                    return None
                 
-                # تحديث التقدم
-                progress = 40 + int((i / total_verses) * 40)
-                update_progress(progress, f"تم إنشاء فيديو الآية {i}/{total_verses}")
+                self.record_encode_speed()
+                return self.finish(final_video, update_progress)
+            
+            # الخطوة 4: إنشاء فيديو مستقل لكل آية
+            update_progress(40, "جاري إنشاء فيديوهات الآيات المستقلة...")
+            
+            total_verses = len(verses)
+            individual_videos = self.create_verse_videos(
+                audio_files, update_progress,
+                stream_copy=(render_mode == "stream_copy")
+            )
             
             if len(individual_videos) != total_verses:
                 update_progress(0, "فشل إنشاء بعض الفيديوهات")
                 return None
             
             print(f"\n✓ Created {len(individual_videos)} individual verse videos")
+            self.record_encode_speed()
             
             # الخطوة 5: دمج كل الفيديوهات في فيديو نهائي واحد
             update_progress(85, "جاري دمج الفيديوهات...")
             
-            # بناء اسم الفيديو النهائي
-            reciter_name = self.quran_api.get_reciters()[reciter_id]["name_en"].replace(" ", "_")
-            surah_name = self.quran_api.get_surahs()[surah_number]
-            
-            final_filename = f"{reciter_name}_{surah_name}_verses{verse_start}-{verse_end}_FINAL.mp4"
-            final_output_path = self.output_dir / final_filename
-            
             final_video = self.merge_videos(individual_videos, final_output_path)
             
             if not final_video:
                 update_progress(0, "فشل دمج الفيديوهات")
                 return None
             
-            # الخطوة 6: تنظيف الملفات المؤقتة
-            update_progress(95, "جاري تنظيف الملفات المؤقتة...")
-            self.cleanup_temp_files()
-            
-            # النجاح!
-            update_progress(100, "تم إنشاء الفيديو بنجاح!")
-            
-            print("\n" + "="*70)
-            print("✓ SUCCESS! Final video created:")
-            print(f"  📹 {final_video.name}")
-            print(f"  📁 {final_video.parent}")
-            file_size = final_video.stat().st_size / (1024 * 1024)
-            print(f"  💾 Size: {file_size:.2f} MB")
-            print("="*70 + "\n")
-            
-            return final_video
+            return self.finish(final_video, update_progress)
         
         except Exception as e:
             update_progress(0, f"خطأ: {str(e)}")
@@ -348,6 +705,43 @@ class FinalVideoGenerator:
             import traceback
             traceback.print_exc()
             return None
+    
+    def record_encode_speed(self):
+        """
+        حفظ سرعة الترميز لهذا الـ job (لتخطيط السعة)
+        Store the average encode speed (media seconds per wall second)
+        """
+        self.encode_speed = self.encode_progress.speed()
+        print(f"✓ Encode speed: {self.encode_speed:.2f}x realtime")
+    
+    def finish(self, final_video, update_progress):
+        """
+        تنظيف الملفات المؤقتة وطباعة ملخص النجاح
+        Cleanup temp files and report the final video
+        
+        Args:
+            final_video: Path to final video
+            update_progress: Progress reporting function
+        
+        Returns:
+            Path to final video
+        """
+        # الخطوة 6: تنظيف الملفات المؤقتة
+        update_progress(95, "جاري تنظيف الملفات المؤقتة...")
+        self.cleanup_temp_files()
+        
+        # النجاح!
+        update_progress(100, "تم إنشاء الفيديو بنجاح!")
+        
+        print("\n" + "="*70)
+        print("✓ SUCCESS! Final video created:")
+        print(f"  📹 {final_video.name}")
+        print(f"  📁 {final_video.parent}")
+        file_size = final_video.stat().st_size / (1024 * 1024)
+        print(f"  💾 Size: {file_size:.2f} MB")
+        print("="*70 + "\n")
+        
+        return final_video
 
 if __name__ == "__main__":
     print("Testing Final Video Generator...")
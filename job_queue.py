@@ -0,0 +1,414 @@
+"""
+قائمة مهام توليد الفيديو الدائمة
+Durable video generation job queue (SQLite) with worker processes
+
+- كل طلب /api/generate يُضاف كصف في jobs.sqlite3 بحالة "queued"
+- عدد ثابت من العمليات (JOB_WORKERS) يسحب المهام بالترتيب وينفذها
+- المهام تبقى بعد إعادة تشغيل الخادم، والمهام التي مات عاملها (انتهى عقدها
+  أو توقفت عمليته) تعود للقائمة
+
+تشغيل العمال بشكل مستقل (بدون خادم الويب):
+    python job_queue.py
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from config import (
+    TEMP_DIR, OUTPUT_DIR, JOB_DB_PATH, JOB_WORKERS, JOB_POLL_INTERVAL,
+    JOB_HEARTBEAT_INTERVAL, JOB_LEASE_SECONDS,
+    RENDER_CACHE_ENABLED, RENDER_CACHE_VERSION, RENDER_MODE, USE_BACKGROUND_LIBRARY
+)
+
+
+def render_cache_key(params):
+    """
+    مفتاح كاش الفيديو الناتج
+    Key identifying the output of a generation request
+
+    Built from (reciter, surah, verse range, resolved encoder profile,
+    background selection policy, render mode).
+
+    Args:
+        params: Job parameters (as passed to FinalVideoGenerator.generate)
+
+    Returns:
+        Hex digest string
+    """
+    from encoder_profiles import resolve_profile
+
+    key = {
+        'version': RENDER_CACHE_VERSION,
+        'reciter_id': params['reciter_id'],
+        'surah_number': params['surah_number'],
+        'verse_start': params['verse_start'],
+        'verse_end': params['verse_end'],
+        'encoder_profile': resolve_profile(params.get('encoder_profile'))[0],
+        'background_policy': 'library' if USE_BACKGROUND_LIBRARY else 'pexels',
+        'render_mode': params.get('render_mode') or RENDER_MODE
+    }
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class JobQueue:
+    """
+    قائمة المهام
+    SQLite-backed job queue shared by the web process and the workers
+    """
+
+    def __init__(self, db_path=JOB_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " progress INTEGER NOT NULL DEFAULT 0,"
+                " message TEXT,"
+                " video_path TEXT,"
+                " error TEXT,"
+                " params TEXT NOT NULL,"
+                " cache_key TEXT,"
+                " encode_speed REAL,"
+                " worker TEXT,"
+                " worker_pid INTEGER,"
+                " heartbeat_at REAL,"
+                " created_at REAL NOT NULL,"
+                " started_at REAL,"
+                " finished_at REAL)"
+            )
+            columns = [row['name'] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if 'cache_key' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN cache_key TEXT")
+            if 'encode_speed' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN encode_speed REAL")
+            if 'worker_pid' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN worker_pid INTEGER")
+            if 'heartbeat_at' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_cache_key ON jobs (cache_key, status)")
+
+    def _connect(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, params):
+        """
+        Add a generation job to the queue
+
+        Identical requests are deduplicated: if a job with the same render
+        cache key is still queued/processing, its id is returned (the request
+        joins it); if one completed and its video still exists, that finished
+        job is returned instantly.
+
+        Args:
+            params: Dictionary of FinalVideoGenerator.generate arguments
+
+        Returns:
+            Job id (new or existing)
+        """
+        cache_key = render_cache_key(params) if RENDER_CACHE_ENABLED else None
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+
+            if cache_key:
+                existing = self._find_reusable(conn, cache_key)
+                if existing:
+                    conn.execute("COMMIT")
+                    return existing
+
+            job_id = str(uuid.uuid4())
+            conn.execute(
+                "INSERT INTO jobs (id, status, message, params, cache_key, created_at)"
+                " VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, 'في قائمة الانتظار...', json.dumps(params), cache_key, time.time())
+            )
+            conn.execute("COMMIT")
+            return job_id
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _find_reusable(self, conn, cache_key):
+        """Find an in-flight job or a completed job with an existing output"""
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE cache_key = ? AND status IN ('queued', 'processing')"
+            " ORDER BY created_at LIMIT 1",
+            (cache_key,)
+        ).fetchone()
+        if row:
+            print(f"↪ Joining in-flight job {row['id']}")
+            return row['id']
+
+        for row in conn.execute(
+            "SELECT id, video_path FROM jobs WHERE cache_key = ? AND status = 'completed'"
+            " ORDER BY finished_at DESC",
+            (cache_key,)
+        ):
+            if row['video_path'] and (OUTPUT_DIR / row['video_path']).exists():
+                print(f"↪ Reusing rendered video {row['video_path']}")
+                return row['id']
+
+        return None
+
+    def claim_next(self, worker_name, worker_pid=None):
+        """
+        Atomically take the oldest queued job
+
+        Args:
+            worker_name: Name of the claiming worker
+            worker_pid: Process id of the worker (default: this process)
+
+        Returns:
+            Tuple (job_id, params) or None if the queue is empty
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, params FROM jobs WHERE status = 'queued'"
+                " ORDER BY created_at LIMIT 1"
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'processing', worker = ?, worker_pid = ?,"
+                " started_at = ?, heartbeat_at = ?, message = ? WHERE id = ?",
+                (worker_name, worker_pid or os.getpid(), now, now, 'جاري البدء...', row['id'])
+            )
+            conn.execute("COMMIT")
+            return row['id'], json.loads(row['params'])
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def update(self, job_id, **fields):
+        """
+        Update job fields (status, progress, message, video_path, error, ...)
+        """
+        if fields.get('status') in ('completed', 'failed'):
+            fields.setdefault('finished_at', time.time())
+
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?",
+                         (*fields.values(), job_id))
+
+    def heartbeat(self, job_id):
+        """Renew the lease of a job that is still being processed"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'processing'",
+                (time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        """
+        Get a job
+
+        Returns:
+            Dictionary of job fields or None
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def queue_position(self, job_id):
+        """
+        Position of a queued job (1 = next to run)
+
+        Returns:
+            Position, or 0 if the job is not queued
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM jobs AS other, jobs AS job"
+                " WHERE job.id = ? AND job.status = 'queued'"
+                " AND other.status = 'queued' AND other.created_at <= job.created_at",
+                (job_id,)
+            ).fetchone()
+        return row[0]
+
+    def requeue_stale(self):
+        """
+        Put jobs whose worker died back in the queue
+
+        A processing job is stale when its lease expired (no heartbeat for
+        JOB_LEASE_SECONDS) or its worker process no longer exists. Jobs that
+        live workers in other processes are running are left alone.
+
+        Returns:
+            Number of requeued jobs
+        """
+        expired = time.time() - JOB_LEASE_SECONDS
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            stale = [
+                row['id'] for row in conn.execute(
+                    "SELECT id, worker_pid, heartbeat_at FROM jobs WHERE status = 'processing'"
+                )
+                if row['heartbeat_at'] is None or row['heartbeat_at'] < expired
+                or not pid_alive(row['worker_pid'])
+            ]
+            for job_id in stale:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', progress = 0, worker = NULL,"
+                    " worker_pid = NULL, heartbeat_at = NULL,"
+                    " message = 'في قائمة الانتظار...' WHERE id = ?",
+                    (job_id,)
+                )
+            conn.execute("COMMIT")
+            return len(stale)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+def pid_alive(pid):
+    """
+    Check if a worker process still exists on this host
+
+    Returns:
+        False only when the process is known to be gone
+    """
+    if not pid:
+        return False
+    if os.name == 'nt':
+        return True  # os.kill(pid, 0) ينهي العملية على Windows؛ نعتمد على العقد فقط
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # موجودة لكن بمستخدم آخر
+    return True
+
+
+def process_job(queue, job_id, params):
+    """
+    تنفيذ مهمة واحدة
+    Run one generation job and record its result in the queue
+    """
+    from final_generator import FinalVideoGenerator
+
+    # إنشاء مجلد مؤقت خاص بهذا الـ job
+    job_temp_dir = TEMP_DIR / f"job_{job_id}"
+    job_temp_dir.mkdir(parents=True, exist_ok=True)
+
+    def progress_callback(progress, message):
+        queue.update(job_id, progress=progress, message=message)
+
+    try:
+        # إنشاء generator خاص بهذا الـ job مع مجلد مؤقت خاص
+        job_generator = FinalVideoGenerator()
+        job_generator.temp_dir = job_temp_dir
+
+        video_path = job_generator.generate(progress_callback=progress_callback, **params)
+
+        if video_path:
+            queue.update(job_id, status='completed', video_path=str(video_path.name),
+                         progress=100, message='تم الانتهاء!',
+                         encode_speed=job_generator.encode_speed)
+        else:
+            queue.update(job_id, status='failed', error='فشل في إنشاء الفيديو')
+    except Exception as e:
+        queue.update(job_id, status='failed', error=str(e))
+    finally:
+        # تنظيف المجلد المؤقت الخاص بهذا الـ job
+        try:
+            if job_temp_dir.exists():
+                shutil.rmtree(job_temp_dir)
+        except Exception:
+            pass
+
+
+def run_worker(worker_name):
+    """
+    حلقة عمل العامل: سحب مهمة، تنفيذها، ثم التالية
+    Worker loop: claim the next job, run it, repeat
+    """
+    queue = JobQueue()
+    print(f"✓ Worker {worker_name} started")
+
+    while True:
+        claimed = queue.claim_next(worker_name)
+        if claimed is None:
+            time.sleep(JOB_POLL_INTERVAL)
+            continue
+
+        job_id, params = claimed
+        print(f"[{worker_name}] Job {job_id} started")
+
+        # تجديد العقد طوال مدة المهمة حتى لا يعيدها عامل آخر للقائمة
+        done = threading.Event()
+
+        def keep_alive():
+            while not done.wait(JOB_HEARTBEAT_INTERVAL):
+                queue.heartbeat(job_id)
+
+        heartbeat = threading.Thread(target=keep_alive, daemon=True)
+        heartbeat.start()
+        try:
+            process_job(queue, job_id, params)
+        finally:
+            done.set()
+            heartbeat.join()
+        print(f"[{worker_name}] Job {job_id} finished")
+
+
+def start_workers(count=JOB_WORKERS):
+    """
+    Requeue interrupted jobs and start the worker processes
+
+    Args:
+        count: Number of worker processes
+
+    Returns:
+        List of multiprocessing.Process
+    """
+    requeued = JobQueue().requeue_stale()
+    if requeued:
+        print(f"↻ Requeued {requeued} interrupted jobs")
+
+    workers = []
+    for i in range(count):
+        worker = multiprocessing.Process(target=run_worker, args=(f"worker-{i + 1}",), daemon=True)
+        worker.start()
+        workers.append(worker)
+    return workers
+
+
+if __name__ == "__main__":
+    from background_prefetcher import start_prefetcher
+
+    workers = start_workers()
+    start_prefetcher()
+    print(f"Running {len(workers)} workers, press Ctrl+C to stop")
+    for worker in workers:
+        worker.join()
@@ -1,20 +1,56 @@
-from flask import Flask, render_template, request, jsonify, send_file
-from pathlib import Path
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
+import json
 import threading
-import uuid
-from final_generator import FinalVideoGenerator
+import time
 from quran_api import QuranAPI
-from config import OUTPUT_DIR
+from job_queue import JobQueue, start_workers
+from background_prefetcher import start_prefetcher
+from config import (
+    OUTPUT_DIR, ENCODER_PROFILES, SSE_POLL_INTERVAL, SSE_HEARTBEAT_INTERVAL, SERVERLESS,
+    JOB_WORKERS_IN_APP
+)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'quran-final-generator'
 
-# Storage for generation jobs
-jobs = {}
+# Storage for generation jobs (SQLite - survives restarts)
+job_queue = JobQueue()
 
 # Initialize
 quran_api = QuranAPI()
-final_generator = FinalVideoGenerator()
+
+# عمليات الخلفية (العمال + مخزون الخلفيات) تبدأ مرة واحدة لكل عملية خادم
+background_processes = {}
+background_lock = threading.Lock()
+
+
+def start_background_processes():
+    """
+    Start the job workers and the background prefetcher once per server process
+    
+    Called before the first request, so the queue is processed however the
+    app is served (python main_final.py, flask run, gunicorn). Does nothing on
+    serverless hosts, where processes cannot outlive a request, or when
+    JOB_WORKERS_IN_APP is off because standalone workers (python job_queue.py)
+    run the queue.
+    
+    Returns:
+        Dictionary with 'workers' (list) and 'prefetcher' (process or None)
+    """
+    with background_lock:
+        if not background_processes and not SERVERLESS:
+            if JOB_WORKERS_IN_APP:
+                background_processes['workers'] = start_workers()
+                background_processes['prefetcher'] = start_prefetcher()
+            else:
+                background_processes.update(workers=[], prefetcher=None)
+        return background_processes
+
+
+@app.before_request
+def ensure_background_processes():
+    if not background_processes:
+        start_background_processes()
 
 
 @app.route('/')
@@ -56,90 +92,96 @@ def generate_video():
         surah_number = int(data.get('surah_number'))
         verse_start = int(data.get('verse_start'))
         verse_end = int(data.get('verse_end'))
+        encoder_profile = data.get('encoder_profile')
         
         if not reciter_id or not surah_number:
             return jsonify({'success': False, 'error': 'المعطيات غير مكتملة'}), 400
         
+        if encoder_profile and encoder_profile not in ENCODER_PROFILES:
+            return jsonify({'success': False, 'error': 'إعداد الترميز غير معروف'}), 400
+        
         if verse_start < 1 or verse_end < verse_start:
             return jsonify({'success': False, 'error': 'أرقام الآيات غير صحيحة'}), 400
         
-        job_id = str(uuid.uuid4())
-        jobs[job_id] = {
-            'status': 'processing',
-            'progress': 0,
-            'message': 'جاري البدء...',
-            'video_path': None,
-            'error': None
-        }
+        if SERVERLESS:
+            # لا توجد عمليات عمل دائمة: المهمة ستبقى في الانتظار إلى الأبد
+            return jsonify({'success': False,
+                            'error': 'توليد الفيديو غير مدعوم على استضافة serverless (Vercel)'}), 503
         
-        def generate_in_background():
-            # إنشاء مجلد مؤقت خاص بهذا الـ job
-            from pathlib import Path
-            import shutil
-            
-            job_temp_dir = Path(f"temp/job_{job_id}")
-            job_temp_dir.mkdir(parents=True, exist_ok=True)
-            
-            def progress_callback(progress, message):
-                jobs[job_id]['progress'] = progress
-                jobs[job_id]['message'] = message
-            
-            try:
-                # إنشاء generator خاص بهذا الـ job مع مجلد مؤقت خاص
-                from final_generator import FinalVideoGenerator
-                job_generator = FinalVideoGenerator()
-                job_generator.temp_dir = job_temp_dir  # استخدام مجلد مؤقت خاص
-                
-                video_path = job_generator.generate(
-                    reciter_id=reciter_id,
-                    surah_number=surah_number,
-                    verse_start=verse_start,
-                    verse_end=verse_end,
-                    progress_callback=progress_callback
-                )
-                
-                if video_path:
-                    jobs[job_id]['status'] = 'completed'
-                    jobs[job_id]['video_path'] = str(video_path.name)
-                    jobs[job_id]['progress'] = 100
-                    jobs[job_id]['message'] = 'تم الانتهاء!'
-                else:
-                    jobs[job_id]['status'] = 'failed'
-                    jobs[job_id]['error'] = 'فشل في إنشاء الفيديو'
-            except Exception as e:
-                jobs[job_id]['status'] = 'failed'
-                jobs[job_id]['error'] = str(e)
-            finally:
-                # تنظيف المجلد المؤقت الخاص بهذا الـ job
-                try:
-                    if job_temp_dir.exists():
-                        shutil.rmtree(job_temp_dir)
-                except:
-                    pass
-        
-        thread = threading.Thread(target=generate_in_background)
-        thread.daemon = True
-        thread.start()
+        job_id = job_queue.enqueue({
+            'reciter_id': reciter_id,
+            'surah_number': surah_number,
+            'verse_start': verse_start,
+            'verse_end': verse_end,
+            'encoder_profile': encoder_profile
+        })
         
         return jsonify({'success': True, 'job_id': job_id})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-@app.route('/api/progress/<job_id>', methods=['GET'])
-def get_progress(job_id):
-    if job_id not in jobs:
-        return jsonify({'success': False, 'error': 'Job not found'}), 404
+def job_progress(job):
+    """بناء رد التقدم لمهمة (مشترك بين الـ polling والـ SSE)"""
+    queue_position = job_queue.queue_position(job['id']) if job['status'] == 'queued' else 0
+    message = job['message']
+    if queue_position:
+        message = f'في قائمة الانتظار (الترتيب {queue_position})'
     
-    job = jobs[job_id]
-    return jsonify({
+    return {
         'success': True,
         'status': job['status'],
         'progress': job['progress'],
-        'message': job['message'],
+        'message': message,
+        'queue_position': queue_position,
         'video_path': job['video_path'],
         'error': job['error']
-    })
+    }
+
+
+@app.route('/api/progress/<job_id>', methods=['GET'])
+def get_progress(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    return jsonify(job_progress(job))
+
+
+@app.route('/api/progress/<job_id>/stream', methods=['GET'])
+def stream_progress(job_id):
+    """بث التقدم عبر Server-Sent Events - رسالة عند كل تغيير فقط"""
+    if job_queue.get(job_id) is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    def events():
+        last_payload = None
+        last_sent = time.monotonic()
+        
+        while True:
+            job = job_queue.get(job_id)
+            if job is None:
+                return
+            
+            payload = json.dumps(job_progress(job), ensure_ascii=False)
+            if payload != last_payload:
+                yield f"data: {payload}\n\n"
+                last_payload = payload
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= SSE_HEARTBEAT_INTERVAL:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            
+            if job['status'] in ('completed', 'failed'):
+                return
+            
+            time.sleep(SSE_POLL_INTERVAL)
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 
 @app.route('/api/download/<filename>', methods=['GET'])
@@ -166,6 +208,12 @@ if __name__ == '__main__':
     print("  ✓ دمج تلقائي في فيديو نهائي واحد")
     print("  ✓ تنظيف تلقائي للملفات المؤقتة")
     
+    # تشغيل عمليات العمل (عدد ثابت = JOB_WORKERS) وتعبئة مخزون الخلفيات
+    background = start_background_processes()
+    print(f"  ✓ {len(background.get('workers', []))} عمليات توليد في الخلفية")
+    if background.get('prefetcher'):
+        print("  ✓ تعبئة مخزون الخلفيات في الخلفية")
+    
     # Get port from environment variable (for deployment platforms)
     port = int(os.environ.get('PORT', 5000))
     
@@ -0,0 +1,97 @@
+"""
+كاش صور نص الآيات
+Persistent cache of rendered verse text overlays
+
+- المفتاح: hash النص + نمط الرسم (الخط، الحجم، الألوان، العرض...)
+- الصورة تُقص حول النص بشكل متماثل حول المركز، فتبقى في نفس المكان عند
+  وضعها في منتصف الفيديو (overlay=(W-w)/2:(H-h)/2) لكن بحجم أصغر بكثير
+- مشترك بين كل الـ jobs: الآيات المشهورة تُرسم مرة واحدة فقط
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from PIL import Image
+from disk_cache import DiskCache
+from config import OVERLAY_CACHE_DIR, OVERLAY_CACHE_MAX_BYTES, OVERLAY_CACHE_VERSION
+
+
+overlay_cache = DiskCache(OVERLAY_CACHE_DIR, OVERLAY_CACHE_MAX_BYTES)
+
+
+def overlay_key(text, style):
+    """
+    Cache key of one rendered overlay
+
+    Args:
+        text: Text as passed to the renderer
+        style: Dictionary of everything else that affects the pixels
+
+    Returns:
+        Tuple of path parts (shard directory, file name)
+    """
+    key = {
+        'version': OVERLAY_CACHE_VERSION,
+        'text': hashlib.sha1(text.encode('utf-8')).hexdigest(),
+        'style': style
+    }
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+    return digest[:2], f"{digest}.png"
+
+
+def crop_centered(src_path, dest_path):
+    """
+    Crop a full-frame RGBA overlay to its content, symmetrically around the center
+
+    Args:
+        src_path: Rendered full-size PNG
+        dest_path: Where to write the cropped PNG
+    """
+    with Image.open(src_path) as img:
+        width, height = img.size
+        bbox = img.getchannel('A').getbbox() if img.mode == 'RGBA' else None
+
+        if bbox:
+            left, top, right, bottom = bbox
+            left = min(left, width - right)
+            top = min(top, height - bottom)
+            img = img.crop((left, top, width - left, height - top))
+
+        img.save(dest_path, 'PNG')
+
+
+def render_cached(text, style, output_path, render):
+    """
+    Get an overlay from the cache, rendering and storing it on a miss
+
+    Args:
+        text: Text to render
+        style: Style dictionary (part of the key)
+        output_path: Where the job expects the PNG
+        render: Function(output_path) drawing the full-size overlay; returns
+                the path or None on failure
+
+    Returns:
+        Path to the overlay (output_path) or None
+    """
+    key = overlay_key(text, style)
+    output_path = Path(output_path)
+
+    cached = overlay_cache.get(*key)
+    if cached:
+        print(f"✓ Text overlay from cache: {output_path.name}")
+        return overlay_cache.copy_to(cached, output_path)
+
+    rendered = render(output_path)
+    if not rendered:
+        return None
+
+    tmp_path = overlay_cache.temp_path(*key)
+    try:
+        crop_centered(rendered, tmp_path)
+    except Exception:
+        tmp_path.unlink()
+        raise
+
+    cached = overlay_cache.add_file(key, tmp_path)
+    return overlay_cache.copy_to(cached, output_path)
@@ -1,7 +1,54 @@
 import requests
 import random
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from config import PEXELS_API_KEY, PEXELS_SEARCH_KEYWORDS, PEXELS_VIDEO_ORIENTATION, BACKGROUNDS_DIR
+from config import (
+    PEXELS_API_KEY, PEXELS_SEARCH_KEYWORDS, PEXELS_VIDEO_ORIENTATION, BACKGROUNDS_DIR,
+    PEXELS_SEARCH_CACHE_DIR, PEXELS_SEARCH_CACHE_TTL, PEXELS_SEARCH_CACHE_MAX_BYTES,
+    PEXELS_PER_PAGE, PEXELS_POOL_PAGES, PEXELS_RATE_LIMIT_DB, PEXELS_RATE_PER_HOUR,
+    PEXELS_RATE_BURST, PEXELS_QUOTA_RESERVE, PEXELS_RATE_MAX_WAIT
+)
+from disk_cache import DiskCache
+from rate_limiter import RateLimiter
+
+
+# كاش نتائج البحث مشترك بين كل الـ jobs (يبقى بعد إعادة التشغيل)
+search_cache = DiskCache(PEXELS_SEARCH_CACHE_DIR, PEXELS_SEARCH_CACHE_MAX_BYTES)
+
+# حصة Pexels مشتركة بين كل العمليات (الخادم، العمال، معبّئ الخلفيات)
+rate_limiter = RateLimiter(
+    'pexels', PEXELS_RATE_LIMIT_DB,
+    rate_per_second=PEXELS_RATE_PER_HOUR / 3600,
+    burst=PEXELS_RATE_BURST,
+    reserve=PEXELS_QUOTA_RESERVE
+)
+
+
+class KeywordRotation:
+    """
+    تدوير كلمات البحث
+    Cycles through keywords in a shuffled order so every keyword gets used
+    """
+    
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._order = []
+        self._lock = threading.Lock()
+    
+    def next(self):
+        """Get the next keyword (reshuffled after each full round)"""
+        with self._lock:
+            if not self._order:
+                self._order = random.sample(self.keywords, len(self.keywords))
+            return self._order.pop()
+
+
+keyword_rotation = KeywordRotation(PEXELS_SEARCH_KEYWORDS)
 
 
 class PexelsAPI:
@@ -19,7 +66,7 @@ class PexelsAPI:
         'lion', 'tiger', 'elephant', 'monkey', 'bear', 'deer', 'rabbit',
         'chicken', 'duck', 'goose', 'eagle', 'pigeon', 'butterfly', 'bee',
         'insect', 'spider', 'snake', 'lizard', 'frog', 'wildlife', 'pet',
-        'camel', 'goat', 'donkey', 'buffalo',
+        'camel', 'goat', 'donkey', 'buffalo', 'wolf', 'mouse',
         
         # كنائس ومعابد غير إسلامية
         'church', 'cathedral', 'chapel', 'temple', 'synagogue', 'pagoda',
@@ -28,60 +75,142 @@ class PexelsAPI:
         
         # محتوى غير مناسب
         'party', 'club', 'bar', 'alcohol', 'wine', 'beer', 'dance', 'concert',
-        'festival', 'celebration', 'wedding', 'bride', 'groom'
+        'festival', 'celebration', 'wedding', 'bride', 'groom', 'dancer'
     ]
     
+    # صيغ الجمع التي لا تُكوَّن بإضافة s/es (y→ies والجموع الشاذة) → الكلمة الأصلية
+    FORBIDDEN_PLURALS = {
+        'men': 'man', 'women': 'woman', 'children': 'child',
+        'babies': 'baby', 'butterflies': 'butterfly', 'parties': 'party', 'monasteries': 'monastery',
+        'geese': 'goose', 'cattle': 'cow', 'wolves': 'wolf', 'mice': 'mouse',
+        # جموع الكلمات المركبة من man/woman
+        'fishermen': 'man', 'businessmen': 'man', 'policemen': 'man', 'horsemen': 'man',
+        'cameramen': 'man', 'sportsmen': 'man', 'businesswomen': 'woman', 'policewomen': 'woman',
+    }
+    
+    # كلمات مركبة لأشخاص/حيوانات: الجذر في آخر الكلمة (fisherman, cowboy, goldfish, hummingbird)
+    FORBIDDEN_SUFFIX_ROOTS = ['man', 'boy', 'girl', 'fish', 'bird', 'horse']
+    # أو في أولها (horseback, fishermen, birdwatching, girlfriend)
+    FORBIDDEN_PREFIX_ROOTS = ['horse', 'fish', 'bird', 'girl', 'boy']
+    
+    # كلمات تشبه المركبات وليست منها؛ تُحذف من النص قبل الفحص
+    FORBIDDEN_EXCEPTIONS = ['man-made', 'manmade', 'german', 'roman', 'ottoman']
+    
+    # كل الكلمات في regex واحد: كلمة كاملة (bar لا تطابق barrier) مع صيغة الجمع،
+    # أو كلمة مركبة من جذر أشخاص/حيوانات
+    FORBIDDEN_PATTERN = re.compile(
+        r'\b(?:'
+        r'(?P<word>' + '|'.join(map(re.escape, sorted([*FORBIDDEN_WORDS, *FORBIDDEN_PLURALS], key=len, reverse=True)))
+        + r')(?:s|es)?'
+        r'|\w+(?P<suffix>' + '|'.join(FORBIDDEN_SUFFIX_ROOTS) + r')(?:s|es)?'
+        r'|(?P<prefix>' + '|'.join(FORBIDDEN_PREFIX_ROOTS) + r')\w+'
+        r')\b'
+    )
+    FORBIDDEN_EXCEPTIONS_PATTERN = re.compile(
+        r'\b(?:' + '|'.join(map(re.escape, FORBIDDEN_EXCEPTIONS)) + r')s?\b'
+    )
+    
+    # نتائج الفحص حسب رقم الفيديو (نفس الفيديو يظهر في عدة عمليات بحث)، بحد أقصى (LRU)
+    VERDICT_MEMO_SIZE = 10000
+    _verdicts = OrderedDict()
+    _verdicts_lock = threading.Lock()
+    
     def __init__(self, api_key=PEXELS_API_KEY):
         self.api_key = api_key
         self.base_url = "https://api.pexels.com/videos"
         self.headers = {
             "Authorization": api_key
         }
+        self.rate_limiter = rate_limiter
     
-    def is_video_safe(self, video_obj):
+    def forbidden_matches(self, video_obj):
         """
-        فحص إذا كان الفيديو آمن بناءً على tags و description
+        الكلمات المحظورة الموجودة في tags و رابط الفيديو
         
         Returns:
-            True إذا كان آمن، False إذا كان يحتوي على محتوى محظور
+            Sorted list of matched forbidden words (empty if safe)
         """
+        video_id = video_obj.get('id')
+        if video_id is not None:
+            with self._verdicts_lock:
+                if video_id in self._verdicts:
+                    self._verdicts.move_to_end(video_id)
+                    return self._verdicts[video_id]
+        
         # Get tags and description
         tags = video_obj.get('tags', [])
         url = video_obj.get('url', '')
+        text = f"{' '.join(tags) if tags else ''} {url}".lower()
+        text = self.FORBIDDEN_EXCEPTIONS_PATTERN.sub(' ', text)
         
-        # Convert tags to lowercase text
-        tags_text = ' '.join(tags).lower() if tags else ''
-        url_text = url.lower()
+        matches = sorted({
+            self.FORBIDDEN_PLURALS.get(word, word)
+            for word in (
+                match.group('word') or match.group('suffix') or match.group('prefix')
+                for match in self.FORBIDDEN_PATTERN.finditer(text)
+            )
+        })
+        
+        if video_id is not None:
+            with self._verdicts_lock:
+                self._verdicts[video_id] = matches
+                if len(self._verdicts) > self.VERDICT_MEMO_SIZE:
+                    self._verdicts.popitem(last=False)
+        return matches
+    
+    def is_video_safe(self, video_obj):
+        """
+        فحص إذا كان الفيديو آمن بناءً على tags و description
         
-        # Check for forbidden words
-        for word in self.FORBIDDEN_WORDS:
-            if word in tags_text or word in url_text:
-                print(f"      ⚠ Rejected: contains '{word}'")
-                return False
+        Returns:
+            True إذا كان آمن، False إذا كان يحتوي على محتوى محظور
+        """
+        matches = self.forbidden_matches(video_obj)
+        if matches:
+            print(f"      ⚠ Rejected: contains {', '.join(repr(word) for word in matches)}")
+            return False
         
         return True
     
-    def search_videos(self, query, orientation="portrait", size="medium", per_page=15):
+    def search_videos(self, query, orientation="portrait", size="medium", per_page=15, page=1):
         """
         Search for videos on Pexels
         
+        Results are cached on disk for PEXELS_SEARCH_CACHE_TTL seconds, keyed by
+        (query, orientation, size, per_page, page). If the request fails or
+        the rate limiter refuses it (quota low / no token in time), a stale
+        cached result is used when available.
+        
         Args:
             query: Search keywords
             orientation: portrait, landscape, or square
             size: medium, large, or small
             per_page: Number of results (max 80)
+            page: Results page (1-based)
         
         Returns:
             List of video objects
         """
+        params = {
+            "query": query,
+            "orientation": orientation,
+            "size": size,
+            "per_page": per_page,
+            "page": page
+        }
+        
+        cache_name = hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+        cache_key = (f"{cache_name}.json",)
+        cached = self.load_cached_search(cache_key)
+        
+        if cached and time.time() - cached["fetched_at"] < PEXELS_SEARCH_CACHE_TTL:
+            return cached["videos"]
+        
+        if not self.rate_limiter.acquire(max_wait=PEXELS_RATE_MAX_WAIT):
+            print("Pexels quota low, skipping search")
+            return cached["videos"] if cached else []
+        
         try:
-            params = {
-                "query": query,
-                "orientation": orientation,
-                "size": size,
-                "per_page": per_page
-            }
-            
             response = requests.get(
                 f"{self.base_url}/search",
                 headers=self.headers,
@@ -89,15 +218,67 @@ class PexelsAPI:
                 timeout=10
             )
             
+            self.rate_limiter.record_response(response)
             response.raise_for_status()
             data = response.json()
+            videos = data.get("videos", [])
+            
+            search_cache.put(cache_key, json.dumps({
+                "fetched_at": time.time(),
+                "videos": videos
+            }).encode('utf-8'))
             
-            return data.get("videos", [])
+            return videos
         
         except requests.exceptions.RequestException as e:
             print(f"Error searching Pexels: {e}")
+            if cached:
+                print("   Using stale cached results")
+                return cached["videos"]
             return []
     
+    def load_cached_search(self, cache_key):
+        """
+        Load a cached search result
+        
+        Returns:
+            Dictionary with fetched_at and videos, or None
+        """
+        path = search_cache.get(*cache_key)
+        if not path:
+            return None
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def get_video_pool(self, query, pages=PEXELS_POOL_PAGES):
+        """
+        Get a large pool of candidate videos for a keyword (pages are cached)
+        
+        Args:
+            query: Search keywords
+            pages: Number of result pages to combine
+        
+        Returns:
+            List of unique video objects
+        """
+        pool = {}
+        
+        for page in range(1, pages + 1):
+            videos = self.search_videos(query, orientation=PEXELS_VIDEO_ORIENTATION,
+                                        per_page=PEXELS_PER_PAGE, page=page)
+            for video in videos:
+                pool.setdefault(video.get("id"), video)
+            
+            # آخر صفحة متاحة
+            if len(videos) < PEXELS_PER_PAGE:
+                break
+        
+        return list(pool.values())
+    
     def get_video_url(self, video_obj, quality="hd"):
         """
         Extract video URL from Pexels video object
@@ -167,18 +348,21 @@ class PexelsAPI:
         while attempts < max_attempts:
             attempts += 1
             
-            # Select random keyword
-            keyword = random.choice(PEXELS_SEARCH_KEYWORDS)
+            # Next keyword in rotation
+            keyword = keyword_rotation.next()
             
             print(f"   🔍 Attempt {attempts}/{max_attempts}: Searching for '{keyword}'")
-            videos = self.search_videos(keyword, orientation=PEXELS_VIDEO_ORIENTATION, per_page=20)
+            videos = self.get_video_pool(keyword)
             
             if not videos:
                 print("      No videos found, trying alternative...")
                 keyword = "mountain landscape"
-                videos = self.search_videos(keyword, orientation=PEXELS_VIDEO_ORIENTATION, per_page=20)
+                videos = self.get_video_pool(keyword)
             
             if not videos:
+                if self.rate_limiter.quota_low():
+                    print("      Pexels quota exhausted, giving up")
+                    break
                 print("      Failed to fetch videos")
                 continue
             
@@ -208,7 +392,7 @@ class PexelsAPI:
         print(f"   ❌ Could not find safe video after {max_attempts} attempts")
         return None
     
-    def download_random_video(self, save_dir=None, filename=None, max_attempts=10):
+    def download_random_video(self, save_dir=None, filename=None, max_attempts=10, exclude_ids=()):
         """
         Download a unique random background video WITH SAFETY FILTERING
         
@@ -216,6 +400,7 @@ class PexelsAPI:
             save_dir: Directory to save video (default: BACKGROUNDS_DIR)
             filename: Custom filename (default: pexels_{id}.mp4)
             max_attempts: Maximum attempts to find safe video
+            exclude_ids: Pexels video ids to skip (e.g. already downloaded)
         
         Returns:
             Path to downloaded video or None
@@ -225,21 +410,27 @@ class PexelsAPI:
         while attempts < max_attempts:
             attempts += 1
             
-            keyword = random.choice(PEXELS_SEARCH_KEYWORDS)
+            keyword = keyword_rotation.next()
             
             print(f"      🔍 Attempt {attempts}/{max_attempts}: {keyword}")
-            videos = self.search_videos(keyword, orientation=PEXELS_VIDEO_ORIENTATION, per_page=20)
+            videos = self.get_video_pool(keyword)
             
             if not videos:
-                videos = self.search_videos("mountain landscape", orientation=PEXELS_VIDEO_ORIENTATION, per_page=20)
+                videos = self.get_video_pool("mountain landscape")
             
             if not videos:
+                if self.rate_limiter.quota_low():
+                    print("      Pexels quota exhausted, giving up")
+                    break
                 continue
             
             # Shuffle and try to find safe video
             random.shuffle(videos)
             
             for video in videos:
+                if video.get('id') in exclude_ids:
+                    continue
+                
                 # Check if video is safe
                 if not self.is_video_safe(video):
                     continue
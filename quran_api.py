@@ -1,15 +1,66 @@
+import os
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import quote
-from config import ALQURAN_API, EVERYAYAH_BASE, RECITERS, SURAHS
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import (
+    ALQURAN_API, EVERYAYAH_BASE, RECITERS, SURAHS,
+    AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_BYTES,
+    AUDIO_DOWNLOAD_CONCURRENCY, HTTP_RETRIES, HTTP_BACKOFF_FACTOR,
+    DOWNLOAD_CHUNK_SIZE, MIN_AUDIO_BYTES, AUDIO_DOWNLOAD_RETRIES
+)
+from disk_cache import DiskCache
+from verse_store import VerseStore
+
+
+# كاش التلاوات مشترك بين كل الـ jobs في نفس العملية
+audio_cache = DiskCache(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_BYTES)
+
+
+def create_session(pool_size=AUDIO_DOWNLOAD_CONCURRENCY):
+    """
+    Create a requests session with keep-alive connection pooling and retries
+    
+    Args:
+        pool_size: Maximum pooled connections per host
+    
+    Returns:
+        requests.Session
+    """
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=[429, 500, 502, 503, 504]
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# جلسة HTTP مشتركة (اتصالات TLS تُعاد استخدامها بين الطلبات)
+session = create_session()
 
 
 class QuranAPI:
     """Handler for Quran-related APIs"""
     
-    def __init__(self):
+    def __init__(self, concurrency=AUDIO_DOWNLOAD_CONCURRENCY):
         self.alquran_base = ALQURAN_API
         self.everyayah_base = EVERYAYAH_BASE
+        self.concurrency = max(1, concurrency)
+        # الجلسة المشتركة تكفي ما دام التوازي لا يتجاوز حجم الـ pool
+        if self.concurrency <= AUDIO_DOWNLOAD_CONCURRENCY:
+            self.session = session
+        else:
+            self.session = create_session(self.concurrency)
+        self.audio_cache = audio_cache
+        self.verse_store = VerseStore()
     
     def get_surahs(self):
         """
@@ -31,7 +82,10 @@ class QuranAPI:
     
     def get_verse_text(self, surah_number, verse_start, verse_end):
         """
-        Fetch Arabic text for verse(s) from api.alquran.cloud
+        Fetch Arabic text for verse(s)
+        
+        Texts are answered from the local verse store; a surah missing from
+        the store is fetched from api.alquran.cloud in one request and saved.
         
         Args:
             surah_number: Surah number (1-114)
@@ -41,34 +95,55 @@ class QuranAPI:
         Returns:
             List of verse texts with verse numbers
         """
-        verses = []
+        texts = self.verse_store.get_range(surah_number, verse_start, verse_end)
         
-        try:
-            for verse_num in range(verse_start, verse_end + 1):
-                # Fetch verse from API
-                url = f"{self.alquran_base}/ayah/{surah_number}:{verse_num}"
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                if data.get("code") == 200:
-                    verse_data = data.get("data", {})
-                    verse_text = verse_data.get("text", "")
-                    
-                    verses.append({
-                        "number": verse_num,
-                        "text": verse_text,
-                        "surah": surah_number,
-                        "surah_name": SURAHS.get(surah_number, "")
-                    })
-                else:
-                    print(f"API error for verse {surah_number}:{verse_num}")
+        if texts is None:
+            surah_verses = self.fetch_surah_text(surah_number)
+            if surah_verses:
+                self.verse_store.save_surah(surah_number, surah_verses)
+                texts = self.verse_store.get_range(surah_number, verse_start, verse_end)
         
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching verse text: {e}")
+        if texts is None:
+            print(f"Verses {surah_number}:{verse_start}-{verse_end} not available")
+            return []
         
-        return verses
+        return [
+            {
+                "number": verse_num,
+                "text": verse_text,
+                "surah": surah_number,
+                "surah_name": SURAHS.get(surah_number, "")
+            }
+            for verse_num, verse_text in zip(range(verse_start, verse_end + 1), texts)
+        ]
+    
+    def fetch_surah_text(self, surah_number):
+        """
+        Fetch Arabic text of a whole surah in a single request
+        
+        Args:
+            surah_number: Surah number (1-114)
+        
+        Returns:
+            List of (verse_number, text) tuples, empty on failure
+        """
+        try:
+            url = f"{self.alquran_base}/surah/{surah_number}"
+            response = self.session.get(url, timeout=30)
+            response.raise_for_status()
+            
+            data = response.json()
+            
+            if data.get("code") != 200:
+                print(f"API error for surah {surah_number}")
+                return []
+            
+            ayahs = data.get("data", {}).get("ayahs", [])
+            return [(ayah["numberInSurah"], ayah.get("text", "")) for ayah in ayahs]
+        
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            print(f"Error fetching surah text: {e}")
+            return []
     
     def get_audio_url(self, reciter_id, surah_number, verse_number):
         """
@@ -100,6 +175,10 @@ class QuranAPI:
         """
         Download audio file for a specific verse
         
+        Recitations are kept in a persistent cache keyed by
+        (reciter folder, surah, ayah); a cache hit is linked into
+        output_path without touching the network.
+        
         Args:
             reciter_id: Reciter identifier
             surah_number: Surah number
@@ -115,22 +194,87 @@ class QuranAPI:
             print(f"Invalid reciter ID: {reciter_id}")
             return None
         
+        cache_key = (RECITERS[reciter_id]["folder"], f"{surah_number:03d}{verse_number:03d}.mp3")
+        
+        cached = self.audio_cache.get(*cache_key)
+        if cached:
+            output_path = self.audio_cache.copy_to(cached, output_path)
+            print(f"Cached audio: {output_path.name}")
+            return output_path
+        
+        tmp_path = self.audio_cache.temp_path(*cache_key)
+        
         try:
-            response = requests.get(url, timeout=15)
-            response.raise_for_status()
-            
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            # الملف الناقص يُعاد تحميله عدداً محدوداً من المرات قبل الفشل
+            for attempt in range(AUDIO_DOWNLOAD_RETRIES + 1):
+                if attempt:
+                    time.sleep(HTTP_BACKOFF_FACTOR * (2 ** (attempt - 1)))
+                
+                if self.fetch_audio(url, tmp_path):
+                    cached = self.audio_cache.add_file(cache_key, tmp_path)
+                    output_path = self.audio_cache.copy_to(cached, output_path)
+                    
+                    print(f"Downloaded audio: {output_path.name}")
+                    return output_path
             
-            print(f"Downloaded audio: {output_path.name}")
-            return output_path
+            return None
         
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.HTTPError, OSError) as e:
+            # أخطاء HTTP أُعيدت محاولتها في الجلسة نفسها (Retry)
             print(f"Error downloading audio from {url}: {e}")
             return None
+        
+        finally:
+            # حذف الملف الجزئي إن لم يُنقل للكاش
+            if tmp_path.exists():
+                os.unlink(tmp_path)
+    
+    def fetch_audio(self, url, tmp_path):
+        """
+        Stream one audio file to tmp_path and validate it
+        
+        Args:
+            url: Audio URL
+            tmp_path: Temporary file to write
+        
+        Returns:
+            True if the file is complete, False if it should be retried
+        
+        Raises:
+            requests.exceptions.HTTPError: On an error status (not retried)
+        """
+        try:
+            # تحميل على دفعات مباشرة إلى القرص بدلاً من response.content
+            with self.session.get(url, stream=True, timeout=15) as response:
+                response.raise_for_status()
+                
+                expected = response.headers.get("Content-Length")
+                if response.headers.get("Content-Encoding"):
+                    expected = None  # الحجم بعد فك الضغط يختلف
+                
+                downloaded = 0
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+                            downloaded += len(chunk)
+        
+        except requests.exceptions.HTTPError:
+            raise
+        except requests.exceptions.RequestException as e:
+            # انقطاع الاتصال أثناء التحميل يُعامل كملف ناقص
+            print(f"Interrupted audio download from {url}: {e}")
+            return False
+        
+        if expected is not None and downloaded != int(expected):
+            print(f"Truncated audio from {url}: {downloaded}/{expected} bytes")
+            return False
+        
+        if downloaded < MIN_AUDIO_BYTES:
+            print(f"Audio from {url} too small ({downloaded} bytes)")
+            return False
+        
+        return True
     
     def download_verse_range_audio(self, reciter_id, surah_number, verse_start, verse_end, output_dir):
         """
@@ -146,21 +290,29 @@ class QuranAPI:
         Returns:
             List of downloaded audio file paths
         """
-        audio_files = []
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        for verse_num in range(verse_start, verse_end + 1):
-            file_name = f"{surah_number:03d}{verse_num:03d}.mp3"
-            output_path = output_dir / file_name
-            
-            downloaded = self.download_audio(reciter_id, surah_number, verse_num, output_path)
-            
+        verse_numbers = list(range(verse_start, verse_end + 1))
+        
+        def download(verse_num):
+            output_path = output_dir / f"{surah_number:03d}{verse_num:03d}.mp3"
+            return self.download_audio(reciter_id, surah_number, verse_num, output_path)
+        
+        # تحميل متوازٍ مع الحفاظ على ترتيب الآيات
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(executor.map(download, verse_numbers))
+        
+        audio_files = []
+        for verse_num, downloaded in zip(verse_numbers, results):
             if downloaded:
                 audio_files.append(downloaded)
             else:
                 print(f"Failed to download verse {verse_num}")
         
+        stats = self.audio_cache.stats()
+        print(f"Audio cache: {stats['hits']} hits, {stats['misses']} misses")
+        
         return audio_files
 
 
@@ -0,0 +1,176 @@
+"""
+محدد معدل الطلبات المشترك
+Rate limiter shared by every process (SQLite-backed token bucket)
+
+- token bucket محلي: يمنع إرسال الطلبات أسرع من المعدل المسموح
+- حصة الخادم: تُقرأ من X-Ratelimit-Remaining / X-Ratelimit-Reset بعد كل رد
+- عند 429 أو حصة منخفضة يتوقف الإرسال حتى وقت الـ reset
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+
+
+class RateLimiter:
+    """
+    محدد المعدل
+    Token bucket plus server quota tracking for one API
+    """
+
+    def __init__(self, name, db_path, rate_per_second, burst, reserve=0):
+        """
+        Args:
+            name: API name (one row per API)
+            db_path: SQLite file shared between processes
+            rate_per_second: Token refill rate
+            burst: Bucket capacity
+            reserve: Remaining server quota at which requests stop
+        """
+        self.name = name
+        self.db_path = Path(db_path)
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.reserve = reserve
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                " name TEXT PRIMARY KEY,"
+                " tokens REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " remaining INTEGER,"
+                " reset_at REAL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO rate_limits (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (name, burst, time.time())
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _quota_blocked(self, row, now):
+        """Check if the server quota is low and not reset yet"""
+        return (
+            row['remaining'] is not None
+            and row['remaining'] <= self.reserve
+            and row['reset_at'] is not None
+            and now < row['reset_at']
+        )
+
+    def _try_acquire(self):
+        """
+        Take one token if possible
+
+        Returns:
+            0 if granted, seconds to wait for the next token, or None if
+            the server quota is exhausted
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT * FROM rate_limits WHERE name = ?", (self.name,)).fetchone()
+            now = time.time()
+
+            if self._quota_blocked(row, now):
+                conn.execute("COMMIT")
+                return None
+
+            tokens = min(self.burst, row['tokens'] + (now - row['updated_at']) * self.rate_per_second)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate_per_second
+
+            conn.execute(
+                "UPDATE rate_limits SET tokens = ?, updated_at = ? WHERE name = ?",
+                (tokens, now, self.name)
+            )
+            conn.execute("COMMIT")
+            return wait
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def acquire(self, max_wait=0):
+        """
+        Wait for permission to send one request
+
+        Args:
+            max_wait: Maximum seconds to wait for a token
+
+        Returns:
+            True if the request may be sent, False if the caller should
+            fall back (quota low or the wait would be too long)
+        """
+        deadline = time.monotonic() + max_wait
+
+        while True:
+            wait = self._try_acquire()
+            if wait is None:
+                return False
+            if wait == 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def record_response(self, response):
+        """
+        Update the server quota from a response
+
+        Reads X-Ratelimit-Remaining / X-Ratelimit-Reset (epoch seconds);
+        a 429 blocks requests until the reset time (or Retry-After).
+        """
+        headers = response.headers
+        now = time.time()
+
+        remaining = headers.get('X-Ratelimit-Remaining')
+        reset_at = headers.get('X-Ratelimit-Reset')
+        try:
+            remaining = int(remaining) if remaining is not None else None
+            reset_at = float(reset_at) if reset_at is not None else None
+        except ValueError:
+            remaining = reset_at = None
+
+        if response.status_code == 429:
+            remaining = 0
+            if reset_at is None:
+                try:
+                    reset_at = now + float(headers.get('Retry-After', 60))
+                except ValueError:
+                    reset_at = now + 60
+
+        if remaining is None:
+            return
+
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE rate_limits SET remaining = ?, reset_at = ? WHERE name = ?",
+                (remaining, reset_at, self.name)
+            )
+
+    def quota_low(self):
+        """Check if requests are currently blocked by the server quota"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM rate_limits WHERE name = ?", (self.name,)).fetchone()
+        return self._quota_blocked(row, time.time())
+
+    def status(self):
+        """
+        Get the current quota state
+
+        Returns:
+            Dictionary with tokens, remaining and reset_at
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM rate_limits WHERE name = ?", (self.name,)).fetchone()
+        return {'tokens': row['tokens'], 'remaining': row['remaining'], 'reset_at': row['reset_at']}
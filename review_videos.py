@@ -1,35 +1,48 @@
 """
 مراجعة وفلترة الفيديوهات الموجودة في مجلد backgrounds
 يستخدم AI Vision لفحص الفيديوهات وحذف أي فيديو يحتوي على أشخاص أو حيوانات
+
+المراجعة تدريجية: الملفات التي لم تتغير منذ آخر مراجعة (حسب review_manifest.json)
+لا تُفحص مرة أخرى.
+
+    python review_videos.py                        # الملفات الجديدة والمعدلة فقط
+    python review_videos.py --since 2026-10-01     # الملفات المعدلة بعد هذا التاريخ فقط
+    python review_videos.py --full --summary -     # مراجعة كاملة + ملخص JSON
+    python review_videos.py --keep --summary review.json
+    python review_videos.py --single-frame         # إطار واحد بدل لوحة الإطارات
+    python review_videos.py --classifier heuristic # فحص محلي بدون شبكة
 """
 
+import argparse
+import json
 import os
 import tempfile
 import subprocess
+import time
+from datetime import datetime
 from pathlib import Path
-import google.generativeai as genai
 from PIL import Image
 
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-
-from config import BACKGROUNDS_DIR
+from config import (
+    BACKGROUNDS_DIR, REVIEW_MANIFEST_PATH, REVIEW_CONTACT_SHEET,
+    REVIEW_SHEET_COLUMNS, REVIEW_SHEET_ROWS, REVIEW_SHEET_TILE_WIDTH
+)
+from verdict_store import VerdictStore, file_hash, pexels_id_from_path
+from vision_classifiers import CLASSIFIERS, get_classifier, is_acceptable, needs_review, GEMINI_API_KEY
 
 
 class VideoReviewer:
     """مراجعة الفيديوهات الموجودة"""
     
-    def __init__(self):
-        self.model = None
+    def __init__(self, contact_sheet=REVIEW_CONTACT_SHEET, classifier=None):
+        self.classifier = classifier or get_classifier()
+        self.verdict_store = VerdictStore()
+        self.contact_sheet = contact_sheet
         
-        if GEMINI_API_KEY:
-            try:
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
-                print("✓ Gemini AI Vision initialized")
-            except Exception as e:
-                print(f"⚠ Could not initialize Gemini: {e}")
+        # نتائج اللوحة ونتائج الإطار الواحد لا تختلط في مخزن النتائج
+        self.sheet_frames = REVIEW_SHEET_COLUMNS * REVIEW_SHEET_ROWS
+        model_version = self.classifier.model_version
+        self.verdict_model = f"{model_version}/sheet{self.sheet_frames}" if contact_sheet else model_version
     
     def extract_frame(self, video_path, timestamp=2):
         """استخراج إطار من الفيديو"""
@@ -65,13 +78,74 @@ class VideoReviewer:
             print(f"      ❌ Error extracting frame: {e}")
             return None
     
-    def analyze_content(self, image):
+    def get_duration(self, video_path):
+        """Get video duration in seconds using ffprobe (0.0 on failure)"""
+        cmd = [
+            'ffprobe', '-v', 'error',
+            '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1',
+            str(video_path)
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True,
+                                  encoding='utf-8', errors='ignore', timeout=30)
+            return float(result.stdout.strip())
+        except Exception:
+            return 0.0
+    
+    def extract_contact_sheet(self, video_path):
+        """
+        لوحة إطارات موزعة على كامل الفيديو في صورة واحدة
+        
+        One FFmpeg call samples REVIEW_SHEET_COLUMNS x REVIEW_SHEET_ROWS
+        evenly spaced frames (fps filter) and lays them out in a grid (tile
+        filter), so a person entering late in the clip is still seen.
+        
+        Returns:
+            PIL image or None
+        """
+        duration = self.get_duration(video_path)
+        if duration <= 0:
+            return None
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sheet_path = Path(tmp_dir) / "sheet.jpg"
+            cmd = [
+                'ffmpeg', '-v', 'error', '-y',
+                '-i', str(video_path),
+                '-vf',
+                f'fps={self.sheet_frames}/{duration:.3f},'
+                f'scale={REVIEW_SHEET_TILE_WIDTH}:-2,'
+                f'tile={REVIEW_SHEET_COLUMNS}x{REVIEW_SHEET_ROWS}',
+                '-frames:v', '1',
+                '-q:v', '3',
+                str(sheet_path)
+            ]
+            
+            try:
+                subprocess.run(cmd, capture_output=True, check=True, timeout=300)
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+                print(f"      ❌ Error building contact sheet: {e}")
+                return None
+            
+            if not sheet_path.exists() or sheet_path.stat().st_size == 0:
+                return None
+            
+            with Image.open(sheet_path) as img:
+                return img.convert("RGB")
+    
+    def analyze_content(self, image, contact_sheet=False):
         """تحليل محتوى الصورة"""
-        if not self.model or not image:
+        if not self.classifier.is_ready() or not image:
             return None
         
         try:
-            prompt = """
+            intro = ""
+            if contact_sheet:
+                intro = (f"This image is a {REVIEW_SHEET_COLUMNS}x{REVIEW_SHEET_ROWS} grid of frames "
+                         f"sampled evenly across one video. Check EVERY frame in the grid.")
+            
+            prompt = intro + """
             Analyze this image carefully and determine:
             1. Are there any humans or people visible? (even partially, in background, or silhouettes)
             2. Are there any animals visible? (including birds, fish, insects, any living creature)
@@ -89,17 +163,7 @@ class VideoReviewer:
             Be VERY strict: if you see ANY sign of humans or animals, mark as true.
             """
             
-            response = self.model.generate_content([prompt, image])
-            result_text = response.text.strip()
-            
-            import json
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(result_text)
-            return result
+            return self.classifier.classify([image], prompt)
         
         except Exception as e:
             print(f"      ⚠ Analysis error: {e}")
@@ -109,14 +173,35 @@ class VideoReviewer:
         """مراجعة فيديو واحد"""
         print(f"\n   📹 Reviewing: {video_path.name}")
         
-        # Extract frame
-        frame = self.extract_frame(video_path)
+        # نتيجة محفوظة لنفس الملف؟ (بدون استخراج إطار أو طلب للنموذج)
+        video_id = pexels_id_from_path(video_path)
+        content_hash = file_hash(video_path)
+        verdict = self.verdict_store.get(self.verdict_model, video_id=video_id, file_hash=content_hash)
+        if verdict is None and video_id and self.verdict_model != self.classifier.model_version:
+            # نتيجة filter_pexels_videos قبل التحميل (نفس النموذج، إطارات المعاينة) تكفي
+            verdict = self.verdict_store.get(self.classifier.model_version, video_id=video_id)
+        if verdict:
+            print(f"      💾 Cached verdict: {verdict['analysis'].get('description', 'N/A')}")
+            return {
+                'path': video_path,
+                'acceptable': verdict['acceptable'],
+                'needs_review': not verdict['acceptable'] and needs_review(verdict['analysis']),
+                'analysis': verdict['analysis'],
+                'hash': content_hash,
+                'cached': True
+            }
+        
+        # Extract frames (contact sheet, or one frame at 2s)
+        if self.contact_sheet:
+            frame = self.extract_contact_sheet(video_path)
+        else:
+            frame = self.extract_frame(video_path)
         if not frame:
             print(f"      ⚠ Could not extract frame - SKIPPING")
             return None
         
         # Analyze
-        analysis = self.analyze_content(frame)
+        analysis = self.analyze_content(frame, contact_sheet=self.contact_sheet)
         if not analysis:
             print(f"      ⚠ Could not analyze - SKIPPING")
             return None
@@ -128,57 +213,180 @@ class VideoReviewer:
         print(f"      ✓ Appropriate: {analysis.get('is_appropriate', 'unknown')}")
         print(f"      🎯 Confidence: {analysis.get('confidence', 'unknown')}")
         
-        has_humans = analysis.get('has_humans', True)
-        has_animals = analysis.get('has_animals', True)
-        is_appropriate = analysis.get('is_appropriate', False)
+        acceptable = is_acceptable(analysis)
         
-        is_acceptable = not has_humans and not has_animals and is_appropriate
+        self.verdict_store.put(self.verdict_model, analysis, acceptable,
+                               video_id=video_id, file_hash=content_hash)
         
         return {
             'path': video_path,
-            'acceptable': is_acceptable,
-            'analysis': analysis
+            'acceptable': acceptable,
+            'needs_review': not acceptable and needs_review(analysis),
+            'analysis': analysis,
+            'hash': content_hash,
+            'cached': False
         }
     
-    def review_all_videos(self, auto_delete=False):
-        """مراجعة جميع الفيديوهات"""
+    def load_manifest(self):
+        """
+        Load the review manifest
+
+        Returns:
+            Dictionary {file_name: {size, mtime, hash, acceptable, needs_review,
+                                    description, model, reviewed_at}}
+        """
+        try:
+            with open(REVIEW_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def save_manifest(self, manifest):
+        """Write the manifest atomically"""
+        tmp_path = REVIEW_MANIFEST_PATH.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, REVIEW_MANIFEST_PATH)
+    
+    def is_unchanged(self, entry, video_path):
+        """
+        Check if a file still matches its manifest entry (size + mtime)
+
+        Entries written by another classifier (e.g. provisional heuristic
+        verdicts) do not count: the file is reviewed again.
+        """
+        stat = video_path.stat()
+        return (
+            entry is not None
+            and entry.get('model') == self.verdict_model
+            and entry.get('size') == stat.st_size
+            and entry.get('mtime') == stat.st_mtime
+        )
+    
+    def stored_verdict(self, entry, video_path):
+        """
+        Verdict of a file that is not reviewed again
+
+        Uses the manifest entry when the file is unchanged since then,
+        otherwise a saved verdict for the file's content.
+
+        Returns:
+            'acceptable', 'rejected' or 'needs_review', or None if the file
+            was never reviewed
+        """
+        if self.is_unchanged(entry, video_path) and 'acceptable' in entry:
+            acceptable, unsure = entry['acceptable'], entry.get('needs_review', False)
+        else:
+            verdict = self.verdict_store.get(self.verdict_model, video_id=pexels_id_from_path(video_path),
+                                             file_hash=file_hash(video_path))
+            if verdict is None:
+                return None
+            acceptable, unsure = verdict['acceptable'], needs_review(verdict['analysis'])
+        
+        if acceptable:
+            return 'acceptable'
+        return 'needs_review' if unsure else 'rejected'
+    
+    def review_all_videos(self, auto_delete=False, confirm=True, incremental=True, since=None):
+        """
+        مراجعة جميع الفيديوهات
+        
+        Args:
+            auto_delete: Delete rejected files without asking
+            confirm: Ask before deleting (when auto_delete is False)
+            incremental: Skip files unchanged since their last review
+            since: Only review files modified after this timestamp
+        
+        Returns:
+            Summary dictionary (or None if the review could not run)
+        """
         print(f"\n{'='*60}")
         print(f"🔍 Reviewing All Videos in backgrounds/")
         print(f"{'='*60}")
         
-        if not self.model:
-            print("\n❌ ERROR: Gemini AI not initialized!")
-            print("Please set GEMINI_API_KEY environment variable.")
-            return
+        if not self.classifier.is_ready():
+            print(f"\n❌ ERROR: {self.classifier.name} classifier not initialized!")
+            print("Please set GEMINI_API_KEY environment variable (or VISION_CLASSIFIER=heuristic).")
+            return None
         
         # Get all videos
-        videos = list(BACKGROUNDS_DIR.glob("*.mp4"))
+        videos = sorted(BACKGROUNDS_DIR.glob("*.mp4"))
         
         if not videos:
             print("\n📭 No videos found in backgrounds/")
-            return
+            return None
+        
+        manifest = self.load_manifest()
         
-        print(f"\n📦 Found {len(videos)} videos")
+        # حذف الملفات التي لم تعد موجودة من السجل
+        names = {path.name for path in videos}
+        for name in [name for name in manifest if name not in names]:
+            del manifest[name]
+        
+        to_review = []
+        unchanged = []
+        for video_path in videos:
+            if since is not None and video_path.stat().st_mtime < since:
+                unchanged.append(video_path)
+            elif incremental and self.is_unchanged(manifest.get(video_path.name), video_path):
+                unchanged.append(video_path)
+            else:
+                to_review.append(video_path)
+        
+        print(f"\n📦 Found {len(videos)} videos, {len(to_review)} to review "
+              f"({len(unchanged)} unchanged)")
         
         acceptable = []
         rejected = []
+        unsure = []  # نتائج مؤقتة (مُصنِّف لا يستطيع الحكم): لا تُقبل ولا تُحذف
         skipped = []
+        cached = 0
+        lists = {'acceptable': acceptable, 'rejected': rejected, 'needs_review': unsure}
+        
+        # الملفات غير المتغيرة تدخل الملخص (والحذف) بنتيجتها المحفوظة
+        earlier = set()
+        for video_path in unchanged:
+            status = self.stored_verdict(manifest.get(video_path.name), video_path)
+            if status is None:
+                continue
+            earlier.add(video_path)
+            lists[status].append(video_path)
         
-        for i, video_path in enumerate(videos, 1):
+        for i, video_path in enumerate(to_review, 1):
             print(f"\n{'─'*60}")
-            print(f"Video {i}/{len(videos)}")
+            print(f"Video {i}/{len(to_review)}")
             
+            stat = video_path.stat()
             result = self.review_video(video_path)
             
+            if result and result['cached']:
+                cached += 1
+            
             if result is None:
                 skipped.append(video_path)
                 print(f"      ⚠ SKIPPED")
+                continue
             elif result['acceptable']:
                 acceptable.append(video_path)
                 print(f"      ✅ ACCEPTABLE")
+            elif result['needs_review']:
+                unsure.append(video_path)
+                print(f"      ⏸ NEEDS REVIEW (kept)")
             else:
                 rejected.append(video_path)
                 print(f"      ❌ REJECTED")
+            
+            manifest[video_path.name] = {
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'hash': result['hash'],
+                'acceptable': result['acceptable'],
+                'needs_review': result['needs_review'],
+                'description': result['analysis'].get('description'),
+                'model': self.verdict_model,
+                'reviewed_at': time.time()
+            }
+            self.save_manifest(manifest)
         
         # Summary
         print(f"\n{'='*60}")
@@ -186,16 +394,26 @@ class VideoReviewer:
         print(f"{'='*60}")
         print(f"✅ Acceptable: {len(acceptable)}")
         print(f"❌ Rejected: {len(rejected)}")
+        print(f"⏸ Needs review: {len(unsure)}")
         print(f"⚠ Skipped: {len(skipped)}")
+        print(f"💾 From saved verdicts: {cached}")
+        print(f"⏭ Unchanged (not reviewed): {len(unchanged)}, {len(earlier)} with an earlier verdict")
+        
+        deleted = []
         
         # Show rejected files
         if rejected:
             print(f"\n❌ REJECTED FILES:")
             for path in rejected:
-                print(f"   • {path.name}")
+                print(f"   • {path.name}" + (" (earlier review)" if path in earlier else ""))
+            
+            # نتائج مُصنِّف مؤقت لا تكفي لحذف الملفات
+            if self.classifier.provisional:
+                print(f"\n⚠ Provisional verdicts ({self.classifier.name}): confirm with the model before deleting.")
+                auto_delete = confirm = False
             
             # Ask to delete
-            if not auto_delete:
+            if not auto_delete and confirm:
                 print(f"\n⚠ Do you want to DELETE rejected files?")
                 response = input("Type 'yes' to confirm deletion: ").strip().lower()
                 auto_delete = response == 'yes'
@@ -205,6 +423,8 @@ class VideoReviewer:
                 for path in rejected:
                     try:
                         path.unlink()
+                        manifest.pop(path.name, None)
+                        deleted.append(path)
                         print(f"   ✓ Deleted: {path.name}")
                     except Exception as e:
                         print(f"   ✗ Failed to delete {path.name}: {e}")
@@ -213,38 +433,101 @@ class VideoReviewer:
             else:
                 print(f"\n⚠ Rejected files NOT deleted.")
         
+        self.save_manifest(manifest)
+        
         # Show acceptable files
         if acceptable:
             print(f"\n✅ ACCEPTABLE FILES:")
             for path in acceptable:
                 print(f"   • {path.name}")
+        
+        return {
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'model': self.verdict_model,
+            'total': len(videos),
+            'reviewed': len(to_review),
+            'unchanged': len(unchanged),
+            'from_earlier_reviews': len(earlier),
+            'from_saved_verdicts': cached,
+            'acceptable': [path.name for path in acceptable],
+            'rejected': [path.name for path in rejected],
+            'needs_review': [path.name for path in unsure],
+            'skipped': [path.name for path in skipped],
+            'deleted': [path.name for path in deleted]
+        }
+
+
+def parse_since(value):
+    """Parse --since (ISO date/datetime) into a timestamp"""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {value!r} (expected YYYY-MM-DD[THH:MM])")
 
 
 def main():
     """الدالة الرئيسية"""
+    parser = argparse.ArgumentParser(description="AI review of the backgrounds folder")
+    parser.add_argument('--full', action='store_true',
+                        help="review every file, not only new or modified ones")
+    parser.add_argument('--since', type=parse_since,
+                        help="only review files modified after this date (YYYY-MM-DD[THH:MM])")
+    delete_group = parser.add_mutually_exclusive_group()
+    delete_group.add_argument('--auto-delete', action='store_true',
+                              help="delete rejected files without asking")
+    delete_group.add_argument('--keep', action='store_true',
+                              help="never delete rejected files (no prompts)")
+    parser.add_argument('--summary', metavar='PATH',
+                        help="write a JSON summary to PATH ('-' for stdout)")
+    parser.add_argument('--single-frame', action='store_true',
+                        help="analyze one frame at 2s instead of a contact sheet")
+    parser.add_argument('--classifier', choices=sorted(CLASSIFIERS),
+                        help="vision classifier backend (default: VISION_CLASSIFIER)")
+    args = parser.parse_args()
+    
     print("\n" + "="*60)
     print("🔍 Video Reviewer - AI Content Analysis")
     print("="*60)
     
-    if not GEMINI_API_KEY:
+    classifier = get_classifier(args.classifier)
+    
+    if not classifier.is_ready() and not GEMINI_API_KEY:
         print("\n❌ ERROR: GEMINI_API_KEY not set!")
         print("\nPlease set your Gemini API key:")
         print("   $env:GEMINI_API_KEY=\"your-api-key-here\"  (PowerShell)")
         print("   set GEMINI_API_KEY=your-api-key-here      (CMD)")
         print("\nGet your free API key at:")
         print("   https://makersuite.google.com/app/apikey")
-        return
+        print("\nOr review offline with: --classifier heuristic")
+        return 1
+    
+    reviewer = VideoReviewer(contact_sheet=REVIEW_CONTACT_SHEET and not args.single_frame,
+                             classifier=classifier)
     
-    reviewer = VideoReviewer()
+    auto_delete = args.auto_delete
+    if not args.auto_delete and not args.keep:
+        # Ask for auto-delete option
+        print("\n⚠ Auto-delete rejected videos?")
+        auto_delete = input("Type 'yes' to auto-delete, or press Enter to ask later: ").strip().lower() == 'yes'
     
-    # Ask for auto-delete option
-    print("\n⚠ Auto-delete rejected videos?")
-    auto_delete = input("Type 'yes' to auto-delete, or press Enter to ask later: ").strip().lower() == 'yes'
+    summary = reviewer.review_all_videos(
+        auto_delete=auto_delete,
+        confirm=not args.keep,
+        incremental=not args.full,
+        since=args.since
+    )
     
-    reviewer.review_all_videos(auto_delete=auto_delete)
+    if summary is not None and args.summary:
+        summary_json = json.dumps(summary, indent=2, ensure_ascii=False)
+        if args.summary == '-':
+            print(summary_json)
+        else:
+            Path(args.summary).write_text(summary_json, encoding='utf-8')
+            print(f"\n📄 Summary written to {args.summary}")
     
     print(f"\n🎉 Review complete!")
+    return 0 if summary is not None else 1
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -24,6 +24,7 @@ const retryBtn = document.getElementById('retryBtn');
 
 let currentJobId = null;
 let progressInterval = null;
+let progressStream = null;
 
 // ============================
 // API Functions
@@ -170,11 +171,78 @@ function resetForm() {
     showSection(null);
     generateBtn.disabled = false;
     
+    stopProgressUpdates();
+}
+
+function stopProgressUpdates() {
     // Clear progress interval if exists
     if (progressInterval) {
         clearInterval(progressInterval);
         progressInterval = null;
     }
+    
+    // Close progress stream if exists
+    if (progressStream) {
+        progressStream.close();
+        progressStream = null;
+    }
+}
+
+// Returns true when the job has finished (completed or failed)
+function handleProgress(progressData) {
+    updateProgress(progressData.progress, progressData.message);
+    
+    if (progressData.status === 'completed') {
+        stopProgressUpdates();
+        showSuccess(progressData.video_path);
+        generateBtn.disabled = false;
+        return true;
+    } else if (progressData.status === 'failed') {
+        stopProgressUpdates();
+        showError(progressData.error || 'فشل في إنشاء الفيديو');
+        generateBtn.disabled = false;
+        return true;
+    }
+    return false;
+}
+
+function pollProgress(jobId) {
+    // Poll for progress (fallback when Server-Sent Events are unavailable)
+    progressInterval = setInterval(async () => {
+        try {
+            const progressData = await checkProgress(jobId);
+            handleProgress(progressData);
+        } catch (error) {
+            stopProgressUpdates();
+            showError('حدث خطأ أثناء التحقق من التقدم');
+            generateBtn.disabled = false;
+        }
+    }, 1000); // Check every second
+}
+
+function watchProgress(jobId) {
+    if (!window.EventSource) {
+        pollProgress(jobId);
+        return;
+    }
+    
+    // Server pushes an event on every progress change
+    progressStream = new EventSource(`/api/progress/${jobId}/stream`);
+    let finished = false;
+    
+    progressStream.onmessage = (event) => {
+        finished = handleProgress(JSON.parse(event.data));
+    };
+    
+    progressStream.onerror = () => {
+        if (progressStream) {
+            progressStream.close();
+            progressStream = null;
+        }
+        if (!finished) {
+            pollProgress(jobId);
+        }
+    };
 }
 
 // ============================
@@ -214,31 +282,8 @@ videoForm.addEventListener('submit', async (e) => {
         // Start generation
         currentJobId = await generateVideo(formData);
         
-        // Poll for progress
-        progressInterval = setInterval(async () => {
-            try {
-                const progressData = await checkProgress(currentJobId);
-                
-                updateProgress(progressData.progress, progressData.message);
-                
-                if (progressData.status === 'completed') {
-                    clearInterval(progressInterval);
-                    progressInterval = null;
-                    showSuccess(progressData.video_path);
-                    generateBtn.disabled = false;
-                } else if (progressData.status === 'failed') {
-                    clearInterval(progressInterval);
-                    progressInterval = null;
-                    showError(progressData.error || 'فشل في إنشاء الفيديو');
-                    generateBtn.disabled = false;
-                }
-            } catch (error) {
-                clearInterval(progressInterval);
-                progressInterval = null;
-                showError('حدث خطأ أثناء التحقق من التقدم');
-                generateBtn.disabled = false;
-            }
-        }, 1000); // Check every second
+        // Follow progress (SSE stream, polling as fallback)
+        watchProgress(currentJobId);
         
     } catch (error) {
         showError(error.message || 'حدث خطأ غير متوقع');
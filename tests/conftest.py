@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# الوحدات في جذر المستودع (بدون حزمة)
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,96 @@
+"""
+Smoke tests for background normalization commands (no FFmpeg needed)
+"""
+
+import pytest
+
+import background_library
+from background_library import BackgroundLibrary
+from config import VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS, ENCODER_PROFILES
+
+
+@pytest.fixture(autouse=True)
+def mpeg4_profile(monkeypatch):
+    monkeypatch.setattr(background_library, 'resolve_profile',
+                        lambda name=None: ('mpeg4', ENCODER_PROFILES['mpeg4']))
+
+
+def test_normalize_command_and_entry(tmp_path, monkeypatch):
+    commands = []
+
+    def run(cmd, **kwargs):
+        commands.append(cmd)
+        # الملف المؤقت الذي يكتبه ffmpeg
+        with open(cmd[-1], 'wb') as f:
+            f.write(b'normalized')
+
+    monkeypatch.setattr(background_library.subprocess, 'run', run)
+    monkeypatch.setattr(BackgroundLibrary, 'get_duration', lambda self, path: 8.0)
+
+    library = BackgroundLibrary(tmp_path, tmp_path / 'normalized')
+    source = tmp_path / 'pexels_7.mp4'
+    source.write_bytes(b'raw')
+
+    entry = library.normalize(source)
+
+    cmd, = commands
+    assert cmd[cmd.index('-i') + 1] == str(source)
+    assert '-an' in cmd
+    assert cmd[cmd.index('-vf') + 1] == (
+        f'scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=increase,'
+        f'crop={VIDEO_WIDTH}:{VIDEO_HEIGHT},setsar=1,fps={VIDEO_FPS}'
+    )
+    assert cmd[cmd.index('-c:v') + 1] == 'mpeg4'
+    assert cmd[-1].endswith('pexels_7.tmp.mp4')
+
+    assert (tmp_path / 'normalized' / 'pexels_7.mp4').read_bytes() == b'normalized'
+    assert not (tmp_path / 'normalized' / 'pexels_7.tmp.mp4').exists()
+    assert entry['duration'] == 8.0
+    assert entry['gop'] == library.gop
+    assert library.is_current(entry, source)
+
+
+def test_failed_normalize_leaves_no_files(tmp_path, monkeypatch):
+    def run(cmd, **kwargs):
+        with open(cmd[-1], 'wb') as f:
+            f.write(b'partial')
+        raise background_library.subprocess.CalledProcessError(1, cmd)
+
+    monkeypatch.setattr(background_library.subprocess, 'run', run)
+
+    library = BackgroundLibrary(tmp_path, tmp_path / 'normalized')
+    source = tmp_path / 'pexels_8.mp4'
+    source.write_bytes(b'raw')
+
+    assert library.normalize(source) is None
+    assert list((tmp_path / 'normalized').iterdir()) == []
+    assert library.ingest() == 0
+
+
+def test_deleted_source_is_removed_from_pick(tmp_path, monkeypatch):
+    def run(cmd, **kwargs):
+        with open(cmd[-1], 'wb') as f:
+            f.write(b'normalized')
+
+    monkeypatch.setattr(background_library.subprocess, 'run', run)
+    monkeypatch.setattr(BackgroundLibrary, 'get_duration', lambda self, path: 8.0)
+
+    library = BackgroundLibrary(tmp_path, tmp_path / 'normalized')
+    kept = tmp_path / 'pexels_1.mp4'
+    rejected = tmp_path / 'pexels_2.mp4'
+    kept.write_bytes(b'raw')
+    rejected.write_bytes(b'raw')
+    assert library.ingest() == 2
+
+    rejected.unlink()
+
+    assert [entry['source'] for entry in library.entries()] == ['pexels_1.mp4']
+    assert not (tmp_path / 'normalized' / 'pexels_2.mp4').exists()
+    assert list(library.load_manifest()) == ['pexels_1.mp4']
+    for _ in range(5):
+        assert library.pick() == tmp_path / 'normalized' / 'pexels_1.mp4'
+
+    kept.write_bytes(b'changed raw')
+    assert library.pick() is None
+    assert (tmp_path / 'normalized' / 'pexels_1.mp4').exists()
+    assert library.pending() == [kept]
@@ -0,0 +1,139 @@
+from background_library import BackgroundLibrary
+from background_prefetcher import BackgroundPrefetcher
+from config import VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS
+from encoder_profiles import resolve_profile
+
+
+class FakeClassifier:
+    name = 'fake'
+    provisional = False
+
+    def is_ready(self):
+        return True
+
+
+class FakeReviewer:
+    """Accepts every clip except the names in rejected"""
+
+    def __init__(self, rejected=()):
+        self.classifier = FakeClassifier()
+        self.rejected = set(rejected)
+        self.reviewed = []
+
+    def review_video(self, video_path):
+        self.reviewed.append(video_path.name)
+        return {'path': video_path, 'acceptable': video_path.name not in self.rejected}
+
+
+class FakeRateLimiter:
+    def quota_low(self):
+        return False
+
+
+class FakePexelsAPI:
+    def __init__(self, source_dir):
+        self.source_dir = source_dir
+        self.rate_limiter = FakeRateLimiter()
+        self.downloads = 0
+
+    def download_random_video(self, save_dir, exclude_ids=()):
+        self.downloads += 1
+        path = save_dir / f"pexels_{900 + self.downloads}.mp4"
+        path.write_bytes(b'r' * 10)
+        return path
+
+
+def make_library(tmp_path, raw_count, normalized_size=100):
+    library = BackgroundLibrary(tmp_path / 'raw', tmp_path / 'raw' / 'normalized')
+    for i in range(raw_count):
+        (library.source_dir / f"pexels_{i}.mp4").write_bytes(b'r' * 10)
+
+    normalized = []
+
+    def normalize(source_path):
+        normalized.append(source_path.name)
+        (library.library_dir / source_path.name).write_bytes(b'n' * normalized_size)
+        stat = source_path.stat()
+        return {
+            'source': source_path.name, 'source_size': stat.st_size,
+            'source_mtime': stat.st_mtime, 'path': source_path.name, 'duration': 10.0,
+            'width': VIDEO_WIDTH, 'height': VIDEO_HEIGHT, 'fps': VIDEO_FPS,
+            'gop': library.gop, 'profile': resolve_profile(None)[0], 'codec': 'mpeg4'
+        }
+
+    library.normalize = normalize
+    library.normalized = normalized
+    return library
+
+
+def test_pending_lists_only_new_raw_files(tmp_path):
+    library = make_library(tmp_path, raw_count=3)
+    library.ingest([library.source_dir / 'pexels_1.mp4'])
+
+    assert [p.name for p in library.pending()] == ['pexels_0.mp4', 'pexels_2.mp4']
+
+
+def test_fill_stops_ingesting_at_pool_size(tmp_path):
+    library = make_library(tmp_path, raw_count=5)
+    pexels = FakePexelsAPI(library.source_dir)
+    prefetcher = BackgroundPrefetcher(library, pexels, FakeReviewer(), pool_size=2, max_bytes=10 ** 6)
+
+    assert prefetcher.fill() == 2
+    assert library.normalized == ['pexels_0.mp4', 'pexels_1.mp4']
+    assert pexels.downloads == 0
+
+
+def test_fill_stops_ingesting_at_disk_quota(tmp_path):
+    library = make_library(tmp_path, raw_count=5, normalized_size=100)
+    pexels = FakePexelsAPI(library.source_dir)
+    # 5 raw files (50 bytes) + one normalized file (100 bytes) reach the quota
+    prefetcher = BackgroundPrefetcher(library, pexels, FakeReviewer(), pool_size=10, max_bytes=150)
+
+    assert prefetcher.fill() == 1
+    assert len(library.normalized) == 1
+
+
+def test_fill_downloads_after_ingesting_raw_files(tmp_path):
+    library = make_library(tmp_path, raw_count=1)
+    pexels = FakePexelsAPI(library.source_dir)
+    prefetcher = BackgroundPrefetcher(library, pexels, FakeReviewer(), pool_size=3, max_bytes=10 ** 6)
+
+    assert prefetcher.fill() == 3
+    assert pexels.downloads == 2
+    assert library.normalized == ['pexels_0.mp4', 'pexels_901.mp4', 'pexels_902.mp4']
+
+
+def test_only_clips_that_pass_the_vision_check_enter_the_pool(tmp_path):
+    library = make_library(tmp_path, raw_count=2)
+    pexels = FakePexelsAPI(library.source_dir)
+    reviewer = FakeReviewer(rejected={'pexels_0.mp4', 'pexels_901.mp4'})
+    prefetcher = BackgroundPrefetcher(library, pexels, reviewer, pool_size=2, max_bytes=10 ** 6)
+
+    assert prefetcher.fill() == 2
+    assert library.normalized == ['pexels_1.mp4', 'pexels_902.mp4']
+    assert reviewer.reviewed == ['pexels_0.mp4', 'pexels_1.mp4', 'pexels_901.mp4', 'pexels_902.mp4']
+    # تحميل مرفوض يُحذف ولا يُحمَّل مرة أخرى؛ الملف الموجود مسبقاً يبقى
+    assert not (library.source_dir / 'pexels_901.mp4').exists()
+    assert (library.source_dir / 'pexels_0.mp4').exists()
+    assert 901 in prefetcher.known_ids()
+
+
+def test_no_downloads_without_final_verdicts(tmp_path):
+    library = make_library(tmp_path, raw_count=0)
+    pexels = FakePexelsAPI(library.source_dir)
+    reviewer = FakeReviewer()
+    reviewer.classifier.provisional = True
+    prefetcher = BackgroundPrefetcher(library, pexels, reviewer, pool_size=2, max_bytes=10 ** 6)
+
+    assert prefetcher.fill() == 0
+    assert pexels.downloads == 0
+
+
+def test_rejected_downloads_are_bounded(tmp_path):
+    library = make_library(tmp_path, raw_count=0)
+    pexels = FakePexelsAPI(library.source_dir)
+    reviewer = FakeReviewer(rejected={f"pexels_{900 + i}.mp4" for i in range(1, 100)})
+    prefetcher = BackgroundPrefetcher(library, pexels, reviewer, pool_size=3, max_bytes=10 ** 6)
+
+    assert prefetcher.fill() == 0
+    assert pexels.downloads == 3
@@ -0,0 +1,81 @@
+import os
+
+from disk_cache import DiskCache
+
+
+def test_put_get_and_stats(tmp_path):
+    cache = DiskCache(tmp_path / 'audio', max_bytes=1024)
+
+    assert cache.get('ar.alafasy', '001001.mp3') is None
+    path = cache.put(('ar.alafasy', '001001.mp3'), b'mp3 data')
+
+    assert path == tmp_path / 'audio' / 'ar.alafasy' / '001001.mp3'
+    assert cache.get('ar.alafasy', '001001.mp3') == path
+    assert path.read_bytes() == b'mp3 data'
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+
+def test_put_leaves_no_temp_files(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1024)
+    cache.put(('a', 'one.mp3'), b'x' * 10)
+    cache.put(('a', 'one.mp3'), b'y' * 10)
+
+    assert [p.name for p in (tmp_path / 'a').iterdir()] == ['one.mp3']
+    assert (tmp_path / 'a' / 'one.mp3').read_bytes() == b'y' * 10
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=25)
+    old = cache.put(('old.bin',), b'o' * 10)
+    used = cache.put(('used.bin',), b'u' * 10)
+    os.utime(old, (1, 1))
+    os.utime(used, (2, 2))
+
+    assert cache.get('used.bin')  # refreshes mtime
+    cache.put(('new.bin',), b'n' * 10)
+
+    assert not old.exists()
+    assert used.exists()
+    assert cache.get('new.bin')
+
+
+def test_add_file_and_copy_to(tmp_path):
+    cache = DiskCache(tmp_path / 'cache', max_bytes=1024)
+    tmp = cache.temp_path('shard', 'overlay.png')
+    assert tmp.suffix == '.part'
+    tmp.write_bytes(b'png')
+
+    cached = cache.add_file(('shard', 'overlay.png'), tmp)
+    assert not tmp.exists()
+    assert cache.get('shard', 'overlay.png') == cached
+
+    dest = tmp_path / 'job' / 'text.png'
+    dest.parent.mkdir()
+    dest.write_bytes(b'stale')
+    assert cache.copy_to(cached, dest) == dest
+    assert dest.read_bytes() == b'png'
+
+
+def test_temp_files_do_not_count_towards_size(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=15)
+    cache.temp_path('pending.bin').write_bytes(b'p' * 100)
+    kept = cache.put(('kept.bin',), b'k' * 10)
+
+    assert kept.exists()
+
+
+def test_replacing_a_key_does_not_grow_the_size(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=25)
+    first = cache.put(('first.bin',), b'f' * 10)
+    for _ in range(5):
+        cache.put(('second.bin',), b's' * 10)
+
+    assert cache._size == 20
+    assert first.exists()
+
+    tmp = cache.temp_path('second.bin')
+    tmp.write_bytes(b'n' * 12)
+    cache.add_file(('second.bin',), tmp)
+
+    assert cache._size == 22
+    assert first.exists()
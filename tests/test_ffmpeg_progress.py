@@ -0,0 +1,60 @@
+import ffmpeg_progress
+from ffmpeg_progress import EncodeProgress, parse_progress_block
+
+
+def test_parses_progress_block():
+    block = {'frame': '150', 'fps': '48.5', 'out_time_us': '5000000',
+             'out_time_ms': '5000000', 'out_time': '00:00:05.000000',
+             'speed': '1.62x', 'progress': 'continue'}
+
+    assert parse_progress_block(block) == {'time': 5.0, 'fps': 48.5, 'speed': 1.62}
+
+
+def test_out_time_ms_is_microseconds():
+    assert parse_progress_block({'out_time_ms': '2500000'})['time'] == 2.5
+
+
+def test_start_of_encode_values():
+    stats = parse_progress_block({'fps': '0.00', 'out_time_us': 'N/A', 'speed': 'N/A'})
+    assert stats == {'time': 0.0, 'fps': 0.0, 'speed': 0.0}
+
+
+def test_negative_and_missing_values():
+    assert parse_progress_block({'out_time_us': '-23220'})['time'] == 0.0
+    assert parse_progress_block({}) == {'time': 0.0, 'fps': 0.0, 'speed': 0.0}
+
+
+def test_encode_progress_sums_parallel_runs():
+    reports = []
+    progress = EncodeProgress(10.0, lambda *args: reports.append(args), min_interval=0)
+
+    progress.tracker(1)({'time': 2.0, 'fps': 30.0, 'speed': 1.0})
+    progress.tracker(2)({'time': 3.0, 'fps': 20.0, 'speed': 1.0})
+    progress.finish(1, 4.0)
+
+    done, total, fps, eta = reports[-1]
+    assert (done, total, fps) == (7.0, 10.0, 20.0)
+    assert eta is not None and eta >= 0
+    assert progress.fraction == 0.7
+
+
+def test_speed_counts_only_encoding_time(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(ffmpeg_progress.time, 'monotonic', lambda: clock[0])
+    progress = EncodeProgress(10.0, lambda *args: None, min_interval=0)
+
+    clock[0] += 30.0  # تحميل الصوت والخلفيات قبل الترميز
+    with progress.encoding():
+        with progress.encoding():
+            clock[0] += 4.0
+            progress.finish(1, 4.0)
+        clock[0] += 1.0
+        progress.finish(2, 6.0)
+    clock[0] += 30.0  # انتظار بين الترميزات
+
+    assert progress.elapsed() == 5.0
+    assert progress.speed() == 2.0
+
+
+def test_speed_is_zero_before_any_encode():
+    assert EncodeProgress(10.0, lambda *args: None).speed() == 0.0
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+
+import pytest
+
+from pexels_api import PexelsAPI
+
+api = PexelsAPI(api_key='')
+
+
+def matches(*tags, url=''):
+    return api.forbidden_matches({'tags': list(tags), 'url': url})
+
+
+@pytest.mark.parametrize('text, word', [
+    ('dog', 'dog'),
+    ('dogs', 'dog'),
+    ('crosses', 'cross'),
+    ('dancers', 'dancer'),
+    ('butterflies', 'butterfly'),
+    ('babies', 'baby'),
+    ('parties', 'party'),
+    ('monasteries', 'monastery'),
+    ('geese', 'goose'),
+    ('cattle', 'cow'),
+    ('men', 'man'),
+    ('women', 'woman'),
+    ('children', 'child'),
+    ('Sheep', 'sheep'),
+    ('wolves', 'wolf'),
+    ('mice', 'mouse'),
+])
+def test_forbidden_forms_are_caught(text, word):
+    assert matches(text) == [word]
+
+
+@pytest.mark.parametrize('text', [
+    'barrier', 'bearing', 'crossing', 'scattered', 'catalog', 'manhattan',
+    'humanity', 'partying', 'handsome', 'deerfield', 'stamen', 'ramen',
+])
+def test_whole_words_only(text):
+    assert matches(text) == []
+
+
+@pytest.mark.parametrize('text, root', [
+    ('fisherman', 'man'),
+    ('fishermen', 'man'),
+    ('businessman', 'man'),
+    ('businessmen', 'man'),
+    ('cowboy', 'boy'),
+    ('cowboys', 'boy'),
+    ('schoolgirl', 'girl'),
+    ('girlfriend', 'girl'),
+    ('goldfish', 'fish'),
+    ('hummingbird', 'bird'),
+    ('birdseye', 'bird'),
+    ('horseback', 'horse'),
+    ('seahorse', 'horse'),
+])
+def test_people_and_animal_compounds_are_caught(text, root):
+    assert matches(text) == [root]
+
+
+@pytest.mark.parametrize('text', ['man-made', 'manmade', 'german', 'romans', 'ottoman'])
+def test_compound_lookalikes_are_allowed(text):
+    assert matches(text) == []
+
+
+def test_man_made_slug_still_checks_other_words():
+    url = 'https://www.pexels.com/video/man-made-lake-with-ducks-123/'
+    assert matches('water', url=url) == ['duck']
+
+
+def test_matches_words_in_the_url_slug():
+    url = 'https://www.pexels.com/video/flock-of-geese-over-a-lake-8541/'
+    assert matches('nature', 'lake', url=url) == ['goose']
+
+
+def test_reports_every_forbidden_word_once():
+    assert matches('Beach Party', 'party', 'women dancing') == ['dancing', 'party', 'woman']
+    assert api.is_video_safe({'tags': ['sunset', 'sea', 'waves']})
+    assert not api.is_video_safe({'tags': ['sunset', 'cattle']})
+
+
+def test_every_y_word_has_its_ies_plural():
+    for word in PexelsAPI.FORBIDDEN_WORDS:
+        if word.endswith('y') and word[-2] not in 'aeiou' and word != 'mary':
+            assert PexelsAPI.FORBIDDEN_PLURALS.get(word[:-1] + 'ies') == word
+
+
+def test_verdict_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(PexelsAPI, 'VERDICT_MEMO_SIZE', 2)
+    monkeypatch.setattr(PexelsAPI, '_verdicts', OrderedDict())
+
+    for video_id in (1, 2, 1, 3):
+        api.forbidden_matches({'id': video_id, 'tags': ['sea']})
+
+    assert list(PexelsAPI._verdicts) == [1, 3]
@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+import encoder_profiles
+import job_queue
+from job_queue import JobQueue, render_cache_key
+
+PARAMS = {'reciter_id': 'ar.alafasy', 'surah_number': 112, 'verse_start': 1, 'verse_end': 4}
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(encoder_profiles, 'resolve_profile', lambda name=None: (name or 'mpeg4', {}))
+    monkeypatch.setattr(job_queue, 'OUTPUT_DIR', tmp_path)
+    monkeypatch.setattr(job_queue, 'RENDER_CACHE_ENABLED', True)
+    return JobQueue(tmp_path / 'jobs.sqlite3')
+
+
+def test_cache_key_depends_on_range_and_profile(queue):
+    assert render_cache_key(PARAMS) == render_cache_key(dict(PARAMS))
+    assert render_cache_key(PARAMS) != render_cache_key({**PARAMS, 'verse_end': 3})
+    assert render_cache_key(PARAMS) != render_cache_key({**PARAMS, 'encoder_profile': 'svtav1'})
+
+
+def test_claims_in_order_and_tracks_position(queue):
+    first = queue.enqueue(PARAMS)
+    second = queue.enqueue({**PARAMS, 'verse_end': 2})
+
+    assert queue.queue_position(first) == 1
+    assert queue.queue_position(second) == 2
+
+    assert queue.claim_next('worker-1') == (first, PARAMS)
+    assert queue.get(first)['status'] == 'processing'
+    assert queue.get(first)['worker'] == 'worker-1'
+    assert queue.queue_position(first) == 0
+    assert queue.queue_position(second) == 1
+
+    assert queue.claim_next('worker-2')[0] == second
+    assert queue.claim_next('worker-1') is None
+
+
+def test_identical_request_joins_in_flight_job(queue):
+    job_id = queue.enqueue(PARAMS)
+    assert queue.enqueue(dict(PARAMS)) == job_id
+
+    queue.claim_next('worker-1')
+    assert queue.enqueue(dict(PARAMS)) == job_id
+
+
+def test_completed_job_reused_only_while_video_exists(queue, tmp_path):
+    job_id = queue.enqueue(PARAMS)
+    queue.claim_next('worker-1')
+    queue.update(job_id, status='completed', video_path='final.mp4', progress=100)
+    assert queue.get(job_id)['finished_at'] is not None
+
+    (tmp_path / 'final.mp4').write_bytes(b'video')
+    assert queue.enqueue(PARAMS) == job_id
+
+    (tmp_path / 'final.mp4').unlink()
+    assert queue.enqueue(PARAMS) != job_id
+
+
+def test_failed_job_is_not_reused(queue):
+    job_id = queue.enqueue(PARAMS)
+    queue.claim_next('worker-1')
+    queue.update(job_id, status='failed', error='boom')
+
+    assert queue.enqueue(PARAMS) != job_id
+
+
+def test_requeue_stale_leaves_live_workers_alone(queue):
+    job_id = queue.enqueue(PARAMS)
+    queue.claim_next('worker-1')
+
+    assert queue.requeue_stale() == 0
+    assert queue.get(job_id)['status'] == 'processing'
+
+
+def test_requeue_stale_after_lease_expires(queue, monkeypatch):
+    job_id = queue.enqueue(PARAMS)
+    queue.claim_next('worker-1')
+    queue.update(job_id, heartbeat_at=time.time() - job_queue.JOB_LEASE_SECONDS - 1)
+
+    assert queue.requeue_stale() == 1
+    job = queue.get(job_id)
+    assert job['status'] == 'queued'
+    assert job['worker'] is None
+    assert queue.claim_next('worker-2')[0] == job_id
+
+
+def test_heartbeat_renews_lease(queue):
+    job_id = queue.enqueue(PARAMS)
+    queue.claim_next('worker-1')
+    queue.update(job_id, heartbeat_at=0)
+
+    queue.heartbeat(job_id)
+
+    assert queue.requeue_stale() == 0
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='PID checks are disabled on Windows')
+def test_requeue_stale_when_worker_process_died(queue):
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    job_id = queue.enqueue(PARAMS)
+    queue.claim_next('worker-1', worker_pid=dead.pid)
+
+    assert queue.requeue_stale() == 1
+    assert queue.get(job_id)['status'] == 'queued'
+
+
+def test_adds_columns_to_old_database(tmp_path):
+    db_path = tmp_path / 'jobs.sqlite3'
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL,"
+            " progress INTEGER NOT NULL DEFAULT 0, message TEXT, video_path TEXT,"
+            " error TEXT, params TEXT NOT NULL, worker TEXT, created_at REAL NOT NULL,"
+            " started_at REAL, finished_at REAL)"
+        )
+
+    JobQueue(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+    assert 'cache_key' in columns
+    assert 'encode_speed' in columns
+    assert 'worker_pid' in columns
+    assert 'heartbeat_at' in columns
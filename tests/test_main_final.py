@@ -0,0 +1,46 @@
+import pytest
+
+import main_final
+
+
+@pytest.fixture
+def client(monkeypatch):
+    started = []
+    monkeypatch.setattr(main_final, 'background_processes', {})
+    monkeypatch.setattr(main_final, 'start_workers', lambda: started.append('workers') or ['w'])
+    monkeypatch.setattr(main_final, 'start_prefetcher', lambda: started.append('prefetcher'))
+    main_final.app.testing = True
+    client = main_final.app.test_client()
+    client.started = started
+    return client
+
+
+def test_first_request_starts_background_processes_once(client, monkeypatch):
+    monkeypatch.setattr(main_final, 'SERVERLESS', False)
+
+    client.get('/api/progress/missing')
+    client.get('/api/progress/missing')
+
+    assert client.started == ['workers', 'prefetcher']
+
+
+def test_serverless_refuses_generation(client, monkeypatch):
+    monkeypatch.setattr(main_final, 'SERVERLESS', True)
+
+    response = client.post('/api/generate', json={
+        'reciter_id': 'ar.alafasy', 'surah_number': 112, 'verse_start': 1, 'verse_end': 4
+    })
+
+    assert response.status_code == 503
+    assert response.get_json()['success'] is False
+    assert client.started == []
+
+
+def test_standalone_workers_switch_keeps_app_from_starting_workers(client, monkeypatch):
+    monkeypatch.setattr(main_final, 'SERVERLESS', False)
+    monkeypatch.setattr(main_final, 'JOB_WORKERS_IN_APP', False)
+
+    client.get('/api/progress/missing')
+
+    assert client.started == []
+    assert main_final.background_processes == {'workers': [], 'prefetcher': None}
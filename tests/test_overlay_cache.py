@@ -0,0 +1,117 @@
+import subprocess
+
+import pytest
+
+import enhanced_generator
+import overlay_cache
+from disk_cache import DiskCache
+from enhanced_generator import EnhancedVideoGenerator
+from overlay_cache import overlay_key
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.setattr(overlay_cache, 'overlay_cache', DiskCache(tmp_path / 'overlays', 10 ** 7))
+    generator = EnhancedVideoGenerator.__new__(EnhancedVideoGenerator)
+    generator.use_imagemagick = True
+    generator._pillow_font = None
+    return generator
+
+
+def test_style_key_follows_renderer_and_font(generator):
+    magick = generator.text_style('imagemagick', 1080, 1920)
+    pillow = generator.text_style('pillow', 1080, 1920)
+
+    assert magick['renderer'] == 'enhanced-imagemagick'
+    assert magick['font'] == 'Arial'
+    assert magick['stroke_width'] == EnhancedVideoGenerator.IMAGEMAGICK_STROKE_WIDTH
+    assert pillow['renderer'] == 'enhanced-pillow'
+    assert pillow['font'] == generator.pillow_font()[1]
+    assert pillow['stroke_width'] == enhanced_generator.TEXT_OUTLINE_WIDTH
+    assert overlay_key('text', magick) != overlay_key('text', pillow)
+
+
+def test_enhanced_outline_follows_config(generator, monkeypatch):
+    monkeypatch.setattr(enhanced_generator, 'TEXT_OUTLINE_WIDTH', 7)
+    monkeypatch.setattr(enhanced_generator, 'TEXT_OUTLINE_COLOR', 'navy')
+
+    style = generator.text_style('pillow', 1080, 1920)
+
+    assert style['stroke_width'] == 7
+    assert style['outline'] == 'navy'
+
+
+def test_imagemagick_failure_is_cached_under_pillow_key(generator, tmp_path, monkeypatch):
+    def missing_magick(cmd, **kwargs):
+        raise FileNotFoundError(cmd[0])
+
+    monkeypatch.setattr(enhanced_generator.subprocess, 'run', missing_magick)
+
+    output = generator.create_verse_image('بسم الله', tmp_path / 'verse_1.png', 540, 960)
+
+    assert output == tmp_path / 'verse_1.png'
+    assert generator.use_imagemagick is False
+    cache = overlay_cache.overlay_cache
+    assert cache.get(*overlay_key('بسم الله', generator.text_style('pillow', 540, 960)))
+    assert cache.get(*overlay_key('بسم الله', generator.text_style('imagemagick', 540, 960))) is None
+
+
+def test_second_render_comes_from_cache(generator, tmp_path, monkeypatch):
+    generator.use_imagemagick = False
+    generator.create_verse_image('الحمد لله', tmp_path / 'a.png', 540, 960)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('rendered twice')
+
+    monkeypatch.setattr(generator, 'create_verse_image_pillow', fail)
+    output = generator.create_verse_image('الحمد لله', tmp_path / 'b.png', 540, 960)
+
+    assert output.read_bytes() == (tmp_path / 'a.png').read_bytes()
+
+
+def test_imagemagick_command_uses_style_settings(generator, tmp_path, monkeypatch):
+    commands = []
+    monkeypatch.setattr(enhanced_generator.subprocess, 'run', lambda cmd, **kwargs: commands.append(cmd))
+
+    generator.create_verse_image_imagemagick('نص', tmp_path / 'x.png', 540, 960, fallback=False)
+
+    cmd, = commands
+    style = generator.text_style('imagemagick', 540, 960)
+    assert cmd[cmd.index('-font') + 1] == style['font']
+    assert cmd[cmd.index('-pointsize') + 1] == str(style['size'])
+    assert cmd[cmd.index('-strokewidth') + 1] == str(style['stroke_width'])
+
+
+def test_crop_is_symmetric_around_center(tmp_path):
+    from PIL import Image
+
+    src = tmp_path / 'full.png'
+    img = Image.new('RGBA', (100, 200), (0, 0, 0, 0))
+    img.paste((255, 255, 255, 255), (30, 50, 60, 70))
+    img.save(src)
+
+    overlay_cache.crop_centered(src, tmp_path / 'cropped.png')
+
+    with Image.open(tmp_path / 'cropped.png') as cropped:
+        # left margin 30, right margin 40 -> keep 30 on both sides
+        assert cropped.size == (40, 100)
+
+
+def test_video_generator_outline_follows_config(tmp_path, monkeypatch):
+    from PIL import Image
+    import video_generator
+    from video_generator import VideoGenerator
+
+    monkeypatch.setattr(overlay_cache, 'overlay_cache', DiskCache(tmp_path / 'overlays', 10 ** 7))
+    generator = VideoGenerator.__new__(VideoGenerator)
+    generator.font_path = 'DejaVuSans.ttf'
+
+    sizes = {}
+    for width in (2, 8):
+        monkeypatch.setattr(video_generator, 'TEXT_OUTLINE_WIDTH', width)
+        output = generator.create_text_overlay('Quran', tmp_path / f'outline_{width}.png', 540, 960)
+        with Image.open(output) as img:
+            sizes[width] = img.size
+
+    # مفتاح مختلف لكل سُمك (لا يُعاد استخدام الصورة) والحدود الأسمك أكبر
+    assert sizes[8][0] - sizes[2][0] == 2 * (8 - 2)
@@ -0,0 +1,73 @@
+import pytest
+import requests
+
+import quran_api
+from config import MIN_AUDIO_BYTES
+from disk_cache import DiskCache
+from quran_api import QuranAPI
+
+
+class FakeResponse:
+    def __init__(self, body, length=None, status=200):
+        self.body = body
+        self.status = status
+        self.headers = {'Content-Length': str(len(body) if length is None else length)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status} error")
+
+    def iter_content(self, chunk_size):
+        yield self.body
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, stream=False, timeout=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(quran_api.time, 'sleep', lambda seconds: None)
+    api = QuranAPI.__new__(QuranAPI)
+    api.everyayah_base = 'https://example.invalid'
+    api.audio_cache = DiskCache(tmp_path / 'cache', max_bytes=1024 * 1024)
+    return api
+
+
+def test_truncated_download_is_retried(api, tmp_path, monkeypatch):
+    monkeypatch.setattr(quran_api, 'AUDIO_DOWNLOAD_RETRIES', 2)
+    body = b'a' * MIN_AUDIO_BYTES
+    api.session = FakeSession([FakeResponse(body[:100], length=len(body)), FakeResponse(body)])
+
+    output = api.download_audio('abdul_basit', 1, 1, tmp_path / 'out.mp3')
+
+    assert api.session.calls == 2
+    assert output.read_bytes() == body
+
+
+def test_gives_up_after_bounded_retries(api, tmp_path, monkeypatch):
+    monkeypatch.setattr(quran_api, 'AUDIO_DOWNLOAD_RETRIES', 2)
+    api.session = FakeSession([FakeResponse(b'short')] * 3)
+
+    assert api.download_audio('abdul_basit', 1, 1, tmp_path / 'out.mp3') is None
+    assert api.session.calls == 3
+    assert not list((tmp_path / 'cache').rglob('*.part'))
+
+
+def test_http_errors_are_not_retried(api, tmp_path):
+    api.session = FakeSession([FakeResponse(b'', status=404)])
+
+    assert api.download_audio('abdul_basit', 1, 1, tmp_path / 'out.mp3') is None
+    assert api.session.calls == 1
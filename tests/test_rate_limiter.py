@@ -0,0 +1,75 @@
+import time
+
+from rate_limiter import RateLimiter
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def make_limiter(tmp_path, **kwargs):
+    options = {'rate_per_second': 0.001, 'burst': 3, 'reserve': 5, **kwargs}
+    return RateLimiter('pexels', tmp_path / 'rate_limits.sqlite3', **options)
+
+
+def test_burst_then_refuses_without_waiting(tmp_path):
+    limiter = make_limiter(tmp_path)
+
+    assert [limiter.acquire() for _ in range(3)] == [True, True, True]
+    assert limiter.acquire() is False
+    assert limiter.status()['tokens'] < 1
+
+
+def test_waits_for_next_token(tmp_path):
+    limiter = make_limiter(tmp_path, rate_per_second=50, burst=1)
+
+    assert limiter.acquire()
+    started = time.monotonic()
+    assert limiter.acquire(max_wait=1)
+    assert time.monotonic() - started < 1
+
+
+def test_bucket_is_shared_between_instances(tmp_path):
+    first = make_limiter(tmp_path)
+    second = make_limiter(tmp_path)
+
+    assert first.acquire() and first.acquire()
+    assert second.acquire()
+    assert second.acquire() is False
+
+
+def test_low_quota_blocks_until_reset(tmp_path):
+    limiter = make_limiter(tmp_path)
+    limiter.record_response(FakeResponse(headers={
+        'X-Ratelimit-Remaining': '5', 'X-Ratelimit-Reset': str(time.time() + 3600)
+    }))
+
+    assert limiter.quota_low()
+    assert limiter.acquire() is False
+    assert limiter.status()['remaining'] == 5
+
+    limiter.record_response(FakeResponse(headers={
+        'X-Ratelimit-Remaining': '5', 'X-Ratelimit-Reset': str(time.time() - 1)
+    }))
+    assert not limiter.quota_low()
+    assert limiter.acquire()
+
+
+def test_429_uses_retry_after(tmp_path):
+    limiter = make_limiter(tmp_path)
+    limiter.record_response(FakeResponse(429, {'Retry-After': '120'}))
+
+    status = limiter.status()
+    assert status['remaining'] == 0
+    assert 110 < status['reset_at'] - time.time() <= 120
+    assert limiter.quota_low()
+
+
+def test_ignores_responses_without_quota_headers(tmp_path):
+    limiter = make_limiter(tmp_path)
+    limiter.record_response(FakeResponse(headers={'X-Ratelimit-Remaining': 'many'}))
+
+    assert limiter.status()['remaining'] is None
+    assert not limiter.quota_low()
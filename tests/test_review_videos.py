@@ -0,0 +1,190 @@
+from PIL import Image
+import pytest
+
+import review_videos
+from review_videos import VideoReviewer
+from verdict_store import VerdictStore
+
+
+class FakeClassifier:
+    name = 'fake'
+    model_version = 'fake-v1'
+    provisional = False
+
+    def __init__(self):
+        self.calls = 0
+
+    def is_ready(self):
+        return True
+
+    def classify(self, images, prompt=None):
+        self.calls += 1
+        people = images[0].info['name'].startswith('people')
+        return {'has_humans': people, 'has_animals': False, 'is_appropriate': True,
+                'description': images[0].info['name']}
+
+
+def fake_sheet(video_path):
+    image = Image.new('RGB', (4, 4))
+    image.info['name'] = video_path.name
+    return image
+
+
+@pytest.fixture
+def reviewer(tmp_path, monkeypatch):
+    backgrounds = tmp_path / 'backgrounds'
+    backgrounds.mkdir()
+    for name in ('pexels_1.mp4', 'people.mp4'):
+        (backgrounds / name).write_bytes(name.encode())
+
+    monkeypatch.setattr(review_videos, 'BACKGROUNDS_DIR', backgrounds)
+    monkeypatch.setattr(review_videos, 'REVIEW_MANIFEST_PATH', tmp_path / 'review_manifest.json')
+    monkeypatch.setattr(review_videos, 'VerdictStore', lambda: VerdictStore(tmp_path / 'verdicts.sqlite3'))
+
+    reviewer = VideoReviewer(contact_sheet=True, classifier=FakeClassifier())
+    reviewer.extract_contact_sheet = fake_sheet
+    reviewer.backgrounds = backgrounds
+    return reviewer
+
+
+def test_first_review_classifies_every_file(reviewer):
+    summary = reviewer.review_all_videos(confirm=False)
+
+    assert reviewer.classifier.calls == 2
+    assert summary['reviewed'] == 2
+    assert summary['acceptable'] == ['pexels_1.mp4']
+    assert summary['rejected'] == ['people.mp4']
+    assert summary['deleted'] == []
+
+
+def test_unchanged_rejected_files_stay_in_summary(reviewer):
+    reviewer.review_all_videos(confirm=False)
+    summary = reviewer.review_all_videos(confirm=False)
+
+    assert reviewer.classifier.calls == 2
+    assert summary['reviewed'] == 0
+    assert summary['unchanged'] == 2
+    assert summary['from_earlier_reviews'] == 2
+    assert summary['acceptable'] == ['pexels_1.mp4']
+    assert summary['rejected'] == ['people.mp4']
+
+
+def test_unchanged_rejected_files_are_deleted(reviewer):
+    reviewer.review_all_videos(confirm=False)
+    summary = reviewer.review_all_videos(auto_delete=True)
+
+    assert summary['deleted'] == ['people.mp4']
+    assert not (reviewer.backgrounds / 'people.mp4').exists()
+    assert 'people.mp4' not in reviewer.load_manifest()
+
+
+def test_since_uses_saved_verdicts_without_manifest(reviewer, tmp_path):
+    reviewer.review_all_videos(confirm=False)
+    (tmp_path / 'review_manifest.json').unlink()
+
+    summary = reviewer.review_all_videos(confirm=False, since=float('inf'))
+
+    assert reviewer.classifier.calls == 2
+    assert summary['reviewed'] == 0
+    assert summary['rejected'] == ['people.mp4']
+
+
+def test_modified_file_is_reviewed_again(reviewer):
+    reviewer.review_all_videos(confirm=False)
+    (reviewer.backgrounds / 'pexels_1.mp4').write_bytes(b'new content')
+
+    summary = reviewer.review_all_videos(confirm=False)
+
+    assert reviewer.classifier.calls == 3
+    assert summary['reviewed'] == 1
+    assert sorted(summary['acceptable']) == ['pexels_1.mp4']
+
+
+def test_sheet_review_accepts_filter_verdict_for_pexels_id(reviewer):
+    # filter_pexels_videos: رقم الفيديو فقط، تحت اسم النموذج بدون /sheetN
+    reviewer.verdict_store.put('fake-v1', {'description': 'screened before download'}, True, video_id=1)
+
+    result = reviewer.review_video(reviewer.backgrounds / 'pexels_1.mp4')
+
+    assert reviewer.verdict_model == 'fake-v1/sheet9'
+    assert result['cached'] is True
+    assert result['acceptable'] is True
+    assert reviewer.classifier.calls == 0
+
+
+def test_sheet_review_ignores_single_frame_verdict_of_same_file(reviewer):
+    path = reviewer.backgrounds / 'pexels_1.mp4'
+    reviewer.verdict_store.put('fake-v1', {}, True, video_id=1,
+                               file_hash=review_videos.file_hash(path))
+
+    result = reviewer.review_video(path)
+
+    assert result['cached'] is False
+    assert reviewer.classifier.calls == 1
+
+
+def test_contact_sheet_command(reviewer, monkeypatch):
+    commands = []
+
+    def run(cmd, **kwargs):
+        commands.append(cmd)
+        Image.new('RGB', (1080, 1920)).save(cmd[-1])
+
+    monkeypatch.setattr(review_videos.subprocess, 'run', run)
+    reviewer.get_duration = lambda path: 12.0
+
+    sheet = VideoReviewer.extract_contact_sheet(reviewer, reviewer.backgrounds / 'pexels_1.mp4')
+
+    cmd, = commands
+    assert cmd[cmd.index('-i') + 1] == str(reviewer.backgrounds / 'pexels_1.mp4')
+    assert cmd[cmd.index('-vf') + 1] == (
+        f'fps=9/12.000,scale={review_videos.REVIEW_SHEET_TILE_WIDTH}:-2,tile=3x3'
+    )
+    assert cmd[cmd.index('-frames:v') + 1] == '1'
+    assert sheet.mode == 'RGB'
+
+
+def test_provisional_verdicts_never_delete(reviewer):
+    class Provisional(FakeClassifier):
+        model_version = 'provisional-v1'
+        provisional = True
+
+        def classify(self, images, prompt=None):
+            analysis = super().classify(images, prompt)
+            analysis['has_animals'] = None
+            analysis['needs_review'] = not analysis['has_humans']
+            return analysis
+
+    reviewer.classifier = Provisional()
+    reviewer.verdict_model = 'provisional-v1/sheet9'
+
+    summary = reviewer.review_all_videos(auto_delete=True)
+
+    assert summary['acceptable'] == []
+    assert summary['needs_review'] == ['pexels_1.mp4']
+    assert summary['rejected'] == ['people.mp4']
+    assert summary['deleted'] == []
+
+    summary = reviewer.review_all_videos(auto_delete=True)
+    assert summary['needs_review'] == ['pexels_1.mp4']
+    assert (reviewer.backgrounds / 'people.mp4').exists()
+
+
+def test_switching_classifier_reviews_again(reviewer):
+    class Provisional(FakeClassifier):
+        model_version = 'provisional-v1'
+        provisional = True
+
+    fake = reviewer.classifier
+    reviewer.classifier = Provisional()
+    reviewer.verdict_model = 'provisional-v1/sheet9'
+    reviewer.review_all_videos(auto_delete=True)
+
+    reviewer.classifier = fake
+    reviewer.verdict_model = 'fake-v1/sheet9'
+    summary = reviewer.review_all_videos(auto_delete=True)
+
+    assert fake.calls == 2
+    assert summary['reviewed'] == 2
+    assert summary['acceptable'] == ['pexels_1.mp4']
+    assert summary['deleted'] == ['people.mp4']
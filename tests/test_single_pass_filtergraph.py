@@ -0,0 +1,78 @@
+"""
+Smoke tests for the single-pass render graph and command (no FFmpeg needed)
+"""
+
+from pathlib import Path
+
+import final_generator
+from config import VIDEO_FPS
+from encoder_profiles import ENCODER_PROFILES
+from final_generator import FinalVideoGenerator
+
+
+class StubLibrary:
+    def __init__(self, normalized):
+        self.normalized = normalized
+
+    def is_normalized(self, path):
+        return Path(path).name in self.normalized
+
+
+def make_generator(tmp_path, normalized=()):
+    """Generator without API clients; backgrounds and durations are stubbed"""
+    generator = FinalVideoGenerator.__new__(FinalVideoGenerator)
+    generator.temp_dir = tmp_path
+    generator.encoder_profile = ENCODER_PROFILES['x264_veryfast']
+    generator.encode_progress = None
+    generator.background_library = StubLibrary(set(normalized))
+    generator.get_verse_background = lambda i: tmp_path / f"bg{i}.mp4"
+    generator.get_audio_duration = lambda audio: float(Path(audio).stem[-1]) + 0.5
+    return generator
+
+
+def test_filtergraph_shape_for_three_verses():
+    graph = FinalVideoGenerator.build_single_pass_filtergraph(None, [1.5, 2.25, 3.0])
+    chains = graph.split(';\n')
+
+    assert len(chains) == 3 * 2 + 1
+    for i in range(3):
+        assert chains[2 * i].startswith(f'[{2 * i}:v]scale=')
+        assert chains[2 * i].endswith(f'[v{i}]')
+        assert f'fps={VIDEO_FPS}' in chains[2 * i]
+        assert chains[2 * i + 1].startswith(f'[{2 * i + 1}:a]aformat=')
+        assert chains[2 * i + 1].endswith(f'[a{i}]')
+    assert 'trim=duration=2.250' in chains[2]
+    assert chains[-1] == '[v0][a0][v1][a1][v2][a2]concat=n=3:v=1:a=1[outv][outa]'
+
+
+def test_filtergraph_skips_scaling_for_normalized_backgrounds():
+    graph = FinalVideoGenerator.build_single_pass_filtergraph(None, [1.0, 2.0], [True, False])
+    chains = graph.split(';\n')
+
+    assert chains[0] == '[0:v]trim=duration=1.000,setpts=PTS-STARTPTS[v0]'
+    assert chains[2].startswith('[2:v]scale=')
+    assert chains[-1].endswith('concat=n=2:v=1:a=1[outv][outa]')
+
+
+def test_render_single_pass_command(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(final_generator, 'run_ffmpeg',
+                        lambda cmd, on_progress=None, timeout=None: calls.append((cmd, timeout)))
+
+    generator = make_generator(tmp_path, normalized={'bg1.mp4'})
+    audio_files = [tmp_path / 'verse1.mp3', tmp_path / 'verse2.mp3']
+    output = generator.render_single_pass(audio_files, tmp_path / 'final.mp4')
+
+    assert output == tmp_path / 'final.mp4'
+    (cmd, timeout), = calls
+    assert cmd[:2] == ['ffmpeg', '-y']
+    assert cmd.count('-i') == 4
+    assert cmd[cmd.index('-i') + 1] == str(tmp_path / 'bg1.mp4')
+    assert cmd[cmd.index('-filter_complex_script') + 1] == str(tmp_path / 'single_pass_filter.txt')
+    assert cmd[-1] == str(output)
+    assert timeout == 300
+
+    script = (tmp_path / 'single_pass_filter.txt').read_text(encoding='utf-8')
+    assert script.startswith('[0:v]trim=duration=1.500')
+    assert '[2:v]scale=' in script
+    assert script.endswith('concat=n=2:v=1:a=1[outv][outa]')
@@ -0,0 +1,76 @@
+"""
+Smoke tests for the stream-copy verse render commands (no FFmpeg needed)
+"""
+
+import pytest
+
+import final_generator
+from encoder_profiles import ENCODER_PROFILES
+from final_generator import FinalVideoGenerator
+
+ENTRY = {'path': 'pexels_1.mp4', 'duration': 10.0, 'gop': 30, 'fps': 30, 'profile': 'x264_veryfast'}
+
+
+class StubLibrary:
+    def is_normalized(self, path):
+        return True
+
+    def entry_for(self, path):
+        return ENTRY
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    calls = []
+    monkeypatch.setattr(final_generator.subprocess, 'run', lambda cmd, **kwargs: calls.append(cmd))
+    return calls
+
+
+def make_generator(tmp_path, duration):
+    generator = FinalVideoGenerator.__new__(FinalVideoGenerator)
+    generator.temp_dir = tmp_path
+    generator.encoder_profile_name = 'x264_veryfast'
+    generator.encoder_profile = ENCODER_PROFILES['x264_veryfast']
+    generator.encode_progress = None
+    generator.background_library = StubLibrary()
+    generator.get_verse_background = lambda i: tmp_path / 'pexels_1.mp4'
+    generator.get_audio_duration = lambda audio: duration
+    generator.create_individual_verse_video = lambda *args: 're-encoded'
+    return generator
+
+
+def test_copies_whole_gops_and_encodes_tail(tmp_path, commands):
+    generator = make_generator(tmp_path, duration=4.5)
+
+    output = generator.create_stream_copy_verse_video(tmp_path / 'v1.mp3', tmp_path / 'ayah_1.mp4', 1)
+
+    assert output == tmp_path / 'ayah_1.mp4'
+    head, tail, merge = commands
+    assert head[head.index('-t') + 1] == '4.000'
+    assert head[head.index('-c:v') + 1] == 'copy'
+    assert tail[tail.index('-ss') + 1] == '4.000'
+    assert tail[tail.index('-t') + 1] == '0.500'
+    assert tail[tail.index('-c:v') + 1] == 'libx264'
+    assert merge[merge.index('-f') + 1] == 'concat'
+    assert merge[merge.index('-c:v') + 1] == 'copy'
+    assert merge[-1] == str(output)
+
+    segments = (tmp_path / 'ayah_1_segments.txt').read_text(encoding='utf-8').splitlines()
+    assert [line.rsplit('/', 1)[-1] for line in segments] == ["ayah_1_head.mp4'", "ayah_1_tail.mp4'"]
+
+
+def test_gop_aligned_duration_needs_no_tail(tmp_path, commands):
+    make_generator(tmp_path, duration=3.0).create_stream_copy_verse_video(
+        tmp_path / 'v1.mp3', tmp_path / 'ayah_1.mp4', 1)
+
+    assert len(commands) == 2
+    assert commands[0][commands[0].index('-c:v') + 1] == 'copy'
+
+
+@pytest.mark.parametrize('duration, profile', [(12.0, 'x264_veryfast'), (4.0, 'mpeg4')])
+def test_falls_back_to_reencoding(tmp_path, commands, duration, profile):
+    generator = make_generator(tmp_path, duration)
+    generator.encoder_profile_name = profile
+
+    assert generator.create_stream_copy_verse_video(tmp_path / 'v1.mp3', tmp_path / 'ayah_1.mp4', 1) == 're-encoded'
+    assert commands == []
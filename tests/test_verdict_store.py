@@ -0,0 +1,73 @@
+import sqlite3
+
+from verdict_store import VerdictStore, file_hash, pexels_id_from_path
+
+ANALYSIS = {'has_humans': False, 'has_animals': False, 'is_appropriate': True, 'category': 'sky'}
+
+
+def test_hash_match_then_id_fallback(tmp_path):
+    store = VerdictStore(tmp_path / 'verdicts.sqlite3')
+    store.put('gemini', ANALYSIS, True, video_id=123)
+
+    # قبل التحميل: رقم الفيديو فقط
+    assert store.get('gemini', video_id='123')['acceptable'] is True
+    # ملف محلي بدون نتيجة خاصة به: نتيجة الرقم
+    assert store.get('gemini', video_id=123, file_hash='abc')['analysis'] == ANALYSIS
+
+    store.put('gemini', {**ANALYSIS, 'has_humans': True}, False, video_id=123, file_hash='abc')
+    assert store.get('gemini', video_id=123, file_hash='abc')['acceptable'] is False
+    assert store.get('gemini', file_hash='abc')['acceptable'] is False
+    assert store.get('gemini', video_id=123)['acceptable'] is True
+
+
+def test_other_model_does_not_match(tmp_path):
+    store = VerdictStore(tmp_path / 'verdicts.sqlite3')
+    store.put('gemini', ANALYSIS, True, video_id=1, file_hash='abc')
+
+    assert store.get('heuristic-v1-0.3', video_id=1, file_hash='abc') is None
+    assert store.get('gemini', video_id=2, file_hash='def') is None
+
+
+def test_models_do_not_overwrite_each_other(tmp_path):
+    store = VerdictStore(tmp_path / 'verdicts.sqlite3')
+    store.put('gemini', ANALYSIS, True, video_id=1, file_hash='abc')
+    store.put('heuristic-v1-0.3', ANALYSIS, False, video_id=1, file_hash='abc')
+
+    assert store.count() == 2
+    assert store.get('gemini', file_hash='abc')['acceptable'] is True
+    assert store.get('heuristic-v1-0.3', file_hash='abc')['acceptable'] is False
+
+
+def test_migrates_store_keyed_without_model(tmp_path):
+    db_path = tmp_path / 'verdicts.sqlite3'
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE verdicts (video_id TEXT NOT NULL, file_hash TEXT NOT NULL,"
+            " acceptable INTEGER NOT NULL, has_humans INTEGER, has_animals INTEGER,"
+            " is_appropriate INTEGER, category TEXT, model TEXT NOT NULL,"
+            " analysis TEXT NOT NULL, created_at REAL NOT NULL,"
+            " PRIMARY KEY (video_id, file_hash))"
+        )
+        conn.execute("INSERT INTO verdicts VALUES ('7', 'abc', 1, 0, 0, 1, 'sky', 'gemini', '{}', 1.0)")
+
+    store = VerdictStore(db_path)
+    store.put('heuristic-v1-0.3', ANALYSIS, False, video_id=7, file_hash='abc')
+
+    assert store.count() == 2
+    assert store.get('gemini', file_hash='abc') == {'acceptable': True, 'analysis': {}, 'created_at': 1.0}
+    with sqlite3.connect(db_path) as conn:
+        indexes = [row[1] for row in conn.execute("PRAGMA index_list(verdicts)")]
+    assert 'verdicts_hash' in indexes
+
+    # فتح المخزن مرة أخرى لا يعيد الترحيل
+    assert VerdictStore(db_path).count() == 2
+
+
+def test_helpers(tmp_path):
+    path = tmp_path / 'pexels_123.mp4'
+    path.write_bytes(b'video')
+
+    assert file_hash(path) == file_hash(tmp_path / 'pexels_123.mp4')
+    assert len(file_hash(path)) == 40
+    assert pexels_id_from_path(path) == '123'
+    assert pexels_id_from_path(tmp_path / 'sunset.mp4') is None
@@ -0,0 +1,46 @@
+from verse_store import VerseStore
+
+
+class FakeQuranAPI:
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.fetched = []
+
+    def fetch_surah_text(self, surah_number):
+        self.fetched.append(surah_number)
+        if surah_number in self.missing:
+            return None
+        return [(1, f"surah {surah_number} ayah 1"), (2, f"surah {surah_number} ayah 2")]
+
+
+def test_save_and_read_range(tmp_path):
+    store = VerseStore(tmp_path / 'verses.sqlite3')
+    assert store.get_surah(112) == {}
+    assert store.get_range(112, 1, 2) is None
+
+    store.save_surah(112, [(1, 'one'), (2, 'two'), (3, 'three'), (4, 'four')])
+
+    assert store.get_range(112, 2, 3) == ['two', 'three']
+    assert store.get_range(112, 3, 5) is None
+    assert store.count() == 4
+
+
+def test_survives_reopen(tmp_path):
+    VerseStore(tmp_path / 'verses.sqlite3').save_surah(1, [(1, 'bismillah')])
+
+    reopened = VerseStore(tmp_path / 'verses.sqlite3')
+    assert reopened.get_surah(1) == {1: 'bismillah'}
+
+
+def test_build_fetches_only_missing_surahs(tmp_path):
+    store = VerseStore(tmp_path / 'verses.sqlite3')
+    store.save_surah(1, [(1, 'stored')])
+    api = FakeQuranAPI(missing={2})
+
+    total = store.build(api)
+
+    assert 1 not in api.fetched
+    assert 2 in api.fetched
+    assert store.get_surah(1) == {1: 'stored'}
+    assert store.get_surah(2) == {}
+    assert total == 1 + 2 * (len(api.fetched) - 1)
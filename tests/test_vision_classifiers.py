@@ -0,0 +1,66 @@
+from PIL import Image
+import pytest
+
+import filter_pexels_videos
+from filter_pexels_videos import VideoFilterAPI
+from verdict_store import VerdictStore
+from vision_classifiers import HeuristicClassifier, get_classifier, is_acceptable, needs_review
+
+SKY = Image.new('RGB', (320, 568), (70, 130, 220))
+SKIN = Image.new('RGB', (320, 568), (224, 172, 140))
+CLEAR = {'has_humans': False, 'has_animals': False, 'is_appropriate': True}
+
+
+def test_only_explicit_clear_verdict_is_acceptable():
+    assert is_acceptable(CLEAR)
+    assert not is_acceptable({**CLEAR, 'has_animals': True})
+    assert not is_acceptable({**CLEAR, 'is_appropriate': None})
+    assert not is_acceptable({'has_humans': False})
+    assert not is_acceptable({**CLEAR, 'needs_review': True})
+
+
+def test_heuristic_never_accepts():
+    classifier = HeuristicClassifier()
+
+    sky = classifier.classify([SKY])
+    assert sky['has_humans'] is False
+    assert sky['has_animals'] is None and sky['is_appropriate'] is None
+    assert needs_review(sky)
+    assert not is_acceptable(sky)
+
+    skin = classifier.classify([SKY, SKIN])
+    assert skin['has_humans'] is True
+    assert not skin['needs_review']
+    assert not is_acceptable(skin)
+
+
+def test_heuristic_prints_warning(capsys):
+    classifier = get_classifier('heuristic')
+
+    assert classifier.provisional
+    assert 'WARNING' in capsys.readouterr().out
+
+
+@pytest.fixture
+def filter_api(tmp_path, monkeypatch):
+    monkeypatch.setattr(filter_pexels_videos, 'VerdictStore', lambda: VerdictStore(tmp_path / 'verdicts.sqlite3'))
+    api = VideoFilterAPI(api_key='', workers=1, classifier=HeuristicClassifier())
+    api.get_preview_pictures = lambda video: [SKY]
+    return api
+
+
+def test_filter_does_not_accept_heuristic_verdict(filter_api):
+    video = {'id': 42, 'video_files': [{'quality': 'hd', 'width': 1080, 'link': 'https://example.com/42.mp4'}]}
+
+    assert filter_api.is_video_acceptable(video) is False
+
+    verdict = filter_api.verdict_store.get(filter_api.classifier.model_version, video_id=42)
+    assert verdict['acceptable'] is False
+    assert verdict['analysis']['needs_review'] is True
+
+
+def test_explicit_finding_is_not_needs_review():
+    assert needs_review({'has_humans': False, 'has_animals': None, 'is_appropriate': None})
+    assert not needs_review({'has_humans': True, 'has_animals': None, 'is_appropriate': None})
+    assert not needs_review({**CLEAR, 'is_appropriate': False})
+    assert not needs_review(CLEAR)
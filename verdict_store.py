@@ -0,0 +1,169 @@
+"""
+مخزن نتائج فحص الفيديوهات
+Persistent verdict store for AI content screening (SQLite)
+
+- كل فحص ناجح يُحفظ: رقم فيديو Pexels + hash الملف + النتيجة + النموذج
+- filter_pexels_videos و review_videos يراجعان المخزن قبل استخراج أي إطار
+- الملف المتغير (hash مختلف) أو نموذج مختلف = فحص جديد
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+from config import VERDICT_STORE_PATH
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """SHA-1 of a file's content"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pexels_id_from_path(path):
+    """
+    Pexels video id from a file name like pexels_123.mp4
+
+    Returns:
+        Id string or None
+    """
+    match = re.fullmatch(r"pexels_(\d+)", Path(path).stem)
+    return match.group(1) if match else None
+
+
+class VerdictStore:
+    """
+    مخزن نتائج الفحص
+    Screening verdicts keyed by (Pexels video id, file hash, model)
+
+    Verdicts from screening a remote candidate (before download) have an
+    empty file hash; they are matched by video id only.
+    """
+
+    CREATE_TABLE = (
+        "CREATE TABLE IF NOT EXISTS {table} ("
+        " video_id TEXT NOT NULL,"
+        " file_hash TEXT NOT NULL,"
+        " acceptable INTEGER NOT NULL,"
+        " has_humans INTEGER,"
+        " has_animals INTEGER,"
+        " is_appropriate INTEGER,"
+        " category TEXT,"
+        " model TEXT NOT NULL,"
+        " analysis TEXT NOT NULL,"
+        " created_at REAL NOT NULL,"
+        " PRIMARY KEY (video_id, file_hash, model))"
+    )
+
+    def __init__(self, db_path=VERDICT_STORE_PATH):
+        self.db_path = Path(db_path)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(self.CREATE_TABLE.format(table='verdicts'))
+
+            # المخازن القديمة: المفتاح بدون model (نتيجة نموذج تستبدل نتيجة نموذج آخر)
+            primary_key = [row['name'] for row in sorted(
+                (row for row in conn.execute("PRAGMA table_info(verdicts)") if row['pk']),
+                key=lambda row: row['pk']
+            )]
+            if primary_key != ['video_id', 'file_hash', 'model']:
+                self._migrate(conn)
+
+            conn.execute("CREATE INDEX IF NOT EXISTS verdicts_hash ON verdicts (file_hash)")
+
+    def _migrate(self, conn):
+        """Rebuild a verdicts table created with the old (video_id, file_hash) key"""
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DROP TABLE IF EXISTS verdicts_new")
+        conn.execute(self.CREATE_TABLE.format(table='verdicts_new'))
+        conn.execute("INSERT INTO verdicts_new SELECT video_id, file_hash, acceptable, has_humans,"
+                     " has_animals, is_appropriate, category, model, analysis, created_at FROM verdicts")
+        conn.execute("DROP TABLE verdicts")
+        conn.execute("ALTER TABLE verdicts_new RENAME TO verdicts")
+
+    def _connect(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get(self, model, video_id=None, file_hash=None):
+        """
+        Find a stored verdict
+
+        A verdict for the same file content always matches; without one, a
+        verdict recorded for the Pexels id before download is used. A verdict
+        for the same id but different content does not match.
+
+        Args:
+            model: Model name the verdict must come from
+            video_id: Pexels video id (or None)
+            file_hash: Content hash of the local file (or None)
+
+        Returns:
+            Dictionary with 'acceptable' and 'analysis', or None
+        """
+        with self._connect() as conn:
+            row = None
+            if file_hash:
+                row = conn.execute(
+                    "SELECT * FROM verdicts WHERE file_hash = ? AND model = ?"
+                    " ORDER BY created_at DESC LIMIT 1",
+                    (file_hash, model)
+                ).fetchone()
+
+            if row is None and video_id is not None:
+                row = conn.execute(
+                    "SELECT * FROM verdicts WHERE video_id = ? AND file_hash = '' AND model = ?",
+                    (str(video_id), model)
+                ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            'acceptable': bool(row['acceptable']),
+            'analysis': json.loads(row['analysis']),
+            'created_at': row['created_at']
+        }
+
+    def put(self, model, analysis, acceptable, video_id=None, file_hash=None):
+        """
+        Store a verdict
+
+        Args:
+            model: Model name that produced the analysis
+            analysis: Analysis dictionary returned by the model
+            acceptable: Final decision
+            video_id: Pexels video id (or None for non-Pexels files)
+            file_hash: Content hash of the local file (or None before download)
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO verdicts (video_id, file_hash, acceptable,"
+                " has_humans, has_animals, is_appropriate, category, model, analysis, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(video_id) if video_id is not None else '',
+                    file_hash or '',
+                    int(acceptable),
+                    analysis.get('has_humans'),
+                    analysis.get('has_animals'),
+                    analysis.get('is_appropriate'),
+                    analysis.get('category'),
+                    model,
+                    json.dumps(analysis, ensure_ascii=False),
+                    time.time()
+                )
+            )
+
+    def count(self):
+        """Number of stored verdicts"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
@@ -0,0 +1,129 @@
+"""
+مخزن محلي لنصوص الآيات
+Local verse text store (SQLite)
+
+- يُملأ مرة واحدة لكل سورة من api.alquran.cloud (طلب واحد للسورة كاملة)
+- بعدها تُقرأ النصوص بدون أي اتصال بالشبكة
+- لبناء المخزن كاملاً (114 سورة / 6236 آية):
+      python verse_store.py
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from config import VERSE_STORE_PATH, SURAHS
+
+
+class VerseStore:
+    """
+    مخزن نصوص الآيات
+    Read-mostly verse text store backed by SQLite with an in-memory layer
+    """
+
+    def __init__(self, db_path=VERSE_STORE_PATH):
+        self.db_path = Path(db_path)
+        self._surahs = {}
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS verses ("
+                " surah INTEGER NOT NULL,"
+                " ayah INTEGER NOT NULL,"
+                " text TEXT NOT NULL,"
+                " PRIMARY KEY (surah, ayah))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(str(self.db_path), timeout=30)
+
+    def get_surah(self, surah_number):
+        """
+        Get all stored verses of a surah
+
+        Returns:
+            Dictionary {ayah_number: text} (empty if the surah is not stored)
+        """
+        verses = self._surahs.get(surah_number)
+        if verses is not None:
+            return verses
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ayah, text FROM verses WHERE surah = ? ORDER BY ayah",
+                (surah_number,)
+            ).fetchall()
+
+        verses = dict(rows)
+        if verses:
+            with self._lock:
+                self._surahs[surah_number] = verses
+        return verses
+
+    def get_range(self, surah_number, verse_start, verse_end):
+        """
+        Get verse texts for a range
+
+        Returns:
+            List of texts in order, or None if any verse is missing
+        """
+        verses = self.get_surah(surah_number)
+        texts = [verses.get(num) for num in range(verse_start, verse_end + 1)]
+
+        if not texts or None in texts:
+            return None
+        return texts
+
+    def save_surah(self, surah_number, verses):
+        """
+        Store a whole surah
+
+        Args:
+            surah_number: Surah number (1-114)
+            verses: List of (ayah_number, text) tuples
+        """
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO verses (surah, ayah, text) VALUES (?, ?, ?)",
+                [(surah_number, num, text) for num, text in verses]
+            )
+
+        with self._lock:
+            self._surahs[surah_number] = dict(verses)
+
+    def count(self):
+        """Number of stored verses"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM verses").fetchone()[0]
+
+    def build(self, quran_api):
+        """
+        Fill the store with every surah (one request per surah)
+
+        Args:
+            quran_api: QuranAPI instance used to fetch surah texts
+
+        Returns:
+            Number of stored verses
+        """
+        for surah_number in SURAHS:
+            if self.get_surah(surah_number):
+                continue
+
+            verses = quran_api.fetch_surah_text(surah_number)
+            if verses:
+                self.save_surah(surah_number, verses)
+                print(f"✓ Surah {surah_number}: {len(verses)} verses")
+            else:
+                print(f"✗ Surah {surah_number}: fetch failed")
+
+        return self.count()
+
+
+if __name__ == "__main__":
+    from quran_api import QuranAPI
+
+    store = VerseStore()
+    total = store.build(QuranAPI())
+    print(f"\nVerse store ready: {total} verses in {store.db_path}")
@@ -6,24 +6,29 @@ from PIL import Image, ImageDraw, ImageFont
 import textwrap
 from quran_api import QuranAPI
 from pexels_api import PexelsAPI
+from encoder_profiles import resolve_profile, video_codec_args
+from overlay_cache import render_cached
 from config import (
     TEMP_DIR, OUTPUT_DIR, VIDEO_WIDTH, VIDEO_HEIGHT, VIDEO_FPS,
     VIDEO_BITRATE, AUDIO_BITRATE, TEXT_FONT_SIZE, TEXT_COLOR,
-    TEXT_PADDING, ARABIC_FONTS
+    TEXT_OUTLINE_COLOR, TEXT_OUTLINE_WIDTH, TEXT_PADDING, ARABIC_FONTS
 )
 
 
 class VideoGenerator:
     """Generate Quran verse videos with background, audio, and text overlays"""
     
-    def __init__(self):
+    def __init__(self, encoder_profile=None):
         self.quran_api = QuranAPI()
         self.pexels_api = PexelsAPI()
         self.temp_dir = TEMP_DIR
         self.output_dir = OUTPUT_DIR
+        self.font_path = None
         
         # Check FFmpeg availability
         self.check_ffmpeg()
+        
+        self.encoder_profile_name, self.encoder_profile = resolve_profile(encoder_profile)
     
     def check_ffmpeg(self):
         """Check if FFmpeg is available"""
@@ -69,12 +74,41 @@ class VideoGenerator:
         """
         Create an image with Arabic text overlay
         
+        Identical text and style is rendered once and then served from the
+        overlay cache (cropped around the text, still centered).
+        
         Args:
             text: Arabic text to display
             output_path: Where to save the image
             width: Image width
             height: Image height
         
+        Returns:
+            Path to created image
+        """
+        if self.font_path is None:
+            self.font_path = self.find_arabic_font()
+        
+        style = {
+            'renderer': 'video_generator',
+            'font': self.font_path,
+            'size': TEXT_FONT_SIZE,
+            'fill': TEXT_COLOR,
+            'outline': TEXT_OUTLINE_COLOR,
+            'outline_width': TEXT_OUTLINE_WIDTH,
+            'line_spacing': 20,
+            'width': width,
+            'height': height
+        }
+        return render_cached(
+            text, style, output_path,
+            lambda path: self.render_text_overlay(text, path, self.font_path, width, height)
+        )
+    
+    def render_text_overlay(self, text, output_path, font_path, width=VIDEO_WIDTH, height=VIDEO_HEIGHT):
+        """
+        Draw the full-size text overlay (no cache)
+        
         Returns:
             Path to created image
         """
@@ -85,7 +119,6 @@ class VideoGenerator:
         draw = ImageDraw.Draw(img)
         
         # Load Arabic font
-        font_path = self.find_arabic_font()
         try:
             font = ImageFont.truetype(font_path, TEXT_FONT_SIZE)
         except Exception as e:
@@ -118,15 +151,9 @@ class VideoGenerator:
             # Center horizontally
             x_position = (width - line_width) // 2
             
-            # Draw text with outline for better visibility
-            outline_range = 3
-            for adj_x in range(-outline_range, outline_range + 1):
-                for adj_y in range(-outline_range, outline_range + 1):
-                    draw.text((x_position + adj_x, y_position + adj_y), 
-                             line, font=font, fill='black', anchor="mm")
-            
-            # Draw main text
-            draw.text((x_position, y_position), line, font=font, fill='white', anchor="mm")
+            # Draw text with outline for better visibility (one stroked draw)
+            draw.text((x_position, y_position), line, font=font, fill=TEXT_COLOR, anchor="mm",
+                      stroke_width=TEXT_OUTLINE_WIDTH, stroke_fill=TEXT_OUTLINE_COLOR)
             
             y_position += line_height + 20
         
@@ -222,8 +249,7 @@ class VideoGenerator:
             f'[bg][2:v]overlay=(W-w)/2:(H-h)/2[outv]',
             '-map', '[outv]',
             '-map', '1:a',
-            '-c:v', 'mpeg4',  # Use mpeg4 instead of libx264 (available in all FFmpeg builds)
-            '-q:v', '3',  # Quality (1-31, lower is better, 3 is high quality)
+            *video_codec_args(self.encoder_profile),
             '-c:a', 'aac',
             '-b:a', AUDIO_BITRATE,
             '-r', str(VIDEO_FPS),
@@ -0,0 +1,227 @@
+"""
+مُصنِّفات الصور لفحص الفيديوهات
+Pluggable vision classifiers used by filter_pexels_videos and review_videos
+
+- "gemini": Gemini Vision عبر الشبكة (الأدق)
+- "heuristic": فحص محلي حتمي على CPU (نسبة لون البشرة + الألوان السائدة)
+  بدون شبكة: للفحص الأولي لدفعات كبيرة وللاختبارات
+
+الاختيار عبر VISION_CLASSIFIER في config.py (أو متغير البيئة بنفس الاسم).
+كل مُصنِّف يعيد نفس شكل النتيجة:
+    {"has_humans", "has_animals", "is_appropriate", "description",
+     "category", "confidence", "needs_review"}
+
+القيمة None = لا يستطيع المُصنِّف الحكم؛ النتيجة عندها "needs_review" ولا تُقبل أبداً.
+"""
+
+import json
+import os
+from PIL import Image, ImageChops
+from config import VISION_CLASSIFIER, GEMINI_MODEL, HEURISTIC_SKIN_RATIO
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+
+
+def parse_json_response(text):
+    """Extract the JSON object from a model reply (with or without ``` fences)"""
+    text = text.strip()
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0].strip()
+    elif "```" in text:
+        text = text.split("```")[1].split("```")[0].strip()
+    return json.loads(text)
+
+
+def needs_review(analysis):
+    """
+    Check if a verdict is undecided
+
+    True when nothing was found against the clip but the classifier could
+    not judge every criterion; an explicit finding is a plain rejection.
+    """
+    if (analysis.get("has_humans") is True or analysis.get("has_animals") is True
+            or analysis.get("is_appropriate") is False):
+        return False
+    return bool(analysis.get("needs_review")) or any(
+        analysis.get(key) is None for key in ("has_humans", "has_animals", "is_appropriate")
+    )
+
+
+def is_acceptable(analysis):
+    """
+    Final decision for an analysis
+
+    Only an explicit "no humans, no animals, appropriate" is accepted;
+    missing or unknown (None) answers reject.
+    """
+    return (
+        analysis.get("has_humans") is False
+        and analysis.get("has_animals") is False
+        and analysis.get("is_appropriate") is True
+        and not needs_review(analysis)
+    )
+
+
+class GeminiClassifier:
+    """
+    مُصنِّف Gemini Vision
+    Sends the prompt and images to Gemini and parses its JSON reply
+    """
+
+    name = "gemini"
+    provisional = False
+
+    def __init__(self, model_name=GEMINI_MODEL):
+        self.model_name = model_name
+        self.model = None
+
+        if not GEMINI_API_KEY:
+            return
+
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=GEMINI_API_KEY)
+            self.model = genai.GenerativeModel(model_name)
+            print("✓ Gemini AI Vision initialized")
+        except Exception as e:
+            print(f"⚠ Could not initialize Gemini: {e}")
+
+    @property
+    def model_version(self):
+        return self.model_name
+
+    def is_ready(self):
+        return self.model is not None
+
+    def classify(self, images, prompt):
+        """
+        Classify images
+
+        Args:
+            images: List of PIL images (frames of one video)
+            prompt: Instructions asking for the JSON verdict
+
+        Returns:
+            Analysis dictionary or None on failure
+        """
+        if not self.model or not images:
+            return None
+
+        response = self.model.generate_content([prompt, *images])
+        return parse_json_response(response.text)
+
+
+class HeuristicClassifier:
+    """
+    مُصنِّف محلي حتمي
+    Deterministic CPU classifier based on skin-tone coverage and dominant color
+
+    Humans are flagged when the share of skin-tone pixels (YCbCr range) in
+    any frame exceeds HEURISTIC_SKIN_RATIO. It cannot see animals or judge
+    appropriateness, so those come back as None and every clip without
+    skin tones is "needs_review": its verdicts are provisional and never
+    accept a clip. Meant for offline pre-screening (rejecting obvious
+    people) and tests, not as a replacement for the model.
+    """
+
+    name = "heuristic"
+    version = 2
+    provisional = True
+
+    # نطاق لون البشرة في YCbCr (Chai & Ngan)
+    CB_RANGE = (77, 127)
+    CR_RANGE = (133, 173)
+    SAMPLE_WIDTH = 160
+
+    def __init__(self, skin_ratio=HEURISTIC_SKIN_RATIO):
+        self.skin_ratio = skin_ratio
+
+    @property
+    def model_version(self):
+        return f"{self.name}-v{self.version}-{self.skin_ratio}"
+
+    def is_ready(self):
+        return True
+
+    def _band_mask(self, band, low, high):
+        return band.point(lambda v: 255 if low <= v <= high else 0)
+
+    def skin_fraction(self, image):
+        """Share of skin-tone pixels in one image"""
+        width = min(self.SAMPLE_WIDTH, image.width)
+        height = max(1, round(image.height * width / image.width))
+        small = image.convert("RGB").resize((width, height))
+
+        _, cb, cr = small.convert("YCbCr").split()
+        mask = ImageChops.multiply(
+            self._band_mask(cb, *self.CB_RANGE),
+            self._band_mask(cr, *self.CR_RANGE)
+        )
+        return mask.histogram()[255] / (width * height)
+
+    def dominant_category(self, image):
+        """Rough scene category from the average color"""
+        r, g, b = image.convert("RGB").resize((1, 1), Image.BILINEAR).getpixel((0, 0))
+
+        if max(r, g, b) < 50:
+            return "sky"  # night sky / stars
+        if b > r and b >= g:
+            return "water" if g > r else "sky"
+        if g > r and g > b:
+            return "nature"
+        if r > b and g > b:
+            return "mountain"
+        return "other"
+
+    def classify(self, images, prompt=None):
+        """
+        Classify images (the prompt is ignored)
+
+        Returns:
+            Analysis dictionary or None if there are no images
+        """
+        if not images:
+            return None
+
+        skin = max(self.skin_fraction(image) for image in images)
+        has_humans = skin >= self.skin_ratio
+
+        return {
+            "has_humans": has_humans,
+            "has_animals": None,
+            "is_appropriate": None,
+            "description": f"skin-tone pixels {skin:.1%} (local heuristic)",
+            "category": self.dominant_category(images[0]),
+            "confidence": "low",
+            "needs_review": not has_humans
+        }
+
+
+CLASSIFIERS = {
+    GeminiClassifier.name: GeminiClassifier,
+    HeuristicClassifier.name: HeuristicClassifier,
+}
+
+
+def get_classifier(name=None):
+    """
+    Build the configured classifier
+
+    Args:
+        name: Backend name (default: VISION_CLASSIFIER)
+
+    Returns:
+        Classifier instance
+    """
+    name = name or VISION_CLASSIFIER
+    if name not in CLASSIFIERS:
+        raise ValueError(f"Unknown vision classifier '{name}' (available: {', '.join(CLASSIFIERS)})")
+
+    classifier = CLASSIFIERS[name]()
+    if classifier.provisional:
+        print("=" * 60)
+        print(f"⚠ WARNING: '{name}' classifier cannot detect animals or judge content.")
+        print("⚠ It only rejects clips with people; every other clip is marked")
+        print("⚠ NEEDS REVIEW (provisional) and is never accepted or downloaded.")
+        print("=" * 60)
+    return classifier